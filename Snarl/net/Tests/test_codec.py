@@ -0,0 +1,67 @@
+import json
+import os
+import sys
+import unittest
+# The server's modules import each other as scripts run from Snarl/net.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from codec import STRINGS, FIRST_TEXT_BYTE, encode_json, encode_binary, decode, parse_codec_request
+
+UPDATE = {"type": "player-update", "layout": [[0, 1, 2], [1, 1, 1], [2, 1, 0]], "position": [4, 7], \
+    "objects": [{"type": "key", "position": [3, 6]}, {"type": "exit", "position": [5, 8]}], \
+    "actors": [{"type": "zombie", "position": [4, 8]}, {"type": "player", "position": [3, 7]}, \
+        {"type": "ghost", "position": [5, 6]}], "message": None}
+DELTA = {"type": "player-delta", "position": [4, 8], "cells": [[2, 9, 1], [6, 9, 2]], \
+    "objects": [{"type": "exit", "position": [5, 8]}], "actors": [], "message": None}
+
+def as_bytes(encoded):
+    return encoded.encode() if isinstance(encoded, str) else encoded
+
+class TestCodec(unittest.TestCase):
+    def test_json_round_trip_of_every_message(self):
+        messages = STRINGS + [UPDATE, DELTA, {"type": "welcome", "info": "No", "codecs": ["json", "binary"]}, \
+            {"type": "end-game", "scores": [], "won": False}]
+        for msg in messages:
+            self.assertEqual(decode(as_bytes(encode_json(msg))), msg)
+
+    def test_binary_round_trip_of_strings(self):
+        for msg in STRINGS:
+            encoded = encode_binary(msg)
+            self.assertIsInstance(encoded, bytes)
+            self.assertLess(encoded[0], FIRST_TEXT_BYTE)
+            self.assertEqual(decode(encoded), msg)
+
+    def test_binary_round_trip_of_player_update(self):
+        encoded = encode_binary(UPDATE)
+        self.assertIsInstance(encoded, bytes)
+        self.assertLess(encoded[0], FIRST_TEXT_BYTE)
+        self.assertEqual(decode(encoded), UPDATE)
+
+    def test_binary_round_trip_of_player_delta(self):
+        without_entities = {key: value for key, value in DELTA.items() if key not in ("objects", "actors")}
+        without_actors = {key: value for key, value in DELTA.items() if key != "actors"}
+        for msg in [DELTA, without_entities, without_actors]:
+            encoded = encode_binary(msg)
+            self.assertIsInstance(encoded, bytes)
+            self.assertEqual(decode(encoded), msg)
+
+    def test_binary_falls_back_to_json(self):
+        with_message = dict(UPDATE, message="Player 1 was ejected.")
+        messages = [with_message, {"type": "start-level", "level": 2, "players": ["Ty"]}, "unknown string"]
+        for msg in messages:
+            encoded = encode_binary(msg)
+            self.assertEqual(encoded, json.dumps(msg))
+            self.assertEqual(decode(encoded.encode()), msg)
+
+    def test_decode_rejects_unknown_binary_tag(self):
+        with self.assertRaises(ValueError):
+            decode(b"\x07\x00")
+
+    def test_parse_codec_request(self):
+        self.assertEqual(parse_codec_request(json.dumps({"type": "codec", "codec": "binary"})), "binary")
+        self.assertEqual(parse_codec_request(json.dumps({"type": "codec", "codec": "morse"})), "json")
+        self.assertIsNone(parse_codec_request("Ty"))
+        self.assertIsNone(parse_codec_request("\"Ty\""))
+        self.assertIsNone(parse_codec_request(json.dumps({"type": "move", "to": None})))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import socket
+import sys
+import unittest
+# The server's modules import each other as scripts run from Snarl/net.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from netutils import HEADER, MAX_FRAME_SIZE, FrameDecoder, encode_frame, send, receive, receive_payload
+
+class TestNetutils(unittest.TestCase):
+    def test_encode_frame_prefixes_length(self):
+        self.assertEqual(encode_frame("\"move\""), b"\x00\x00\x00\x06\"move\"")
+        self.assertEqual(encode_frame(b"\x03\x00"), b"\x00\x00\x00\x02\x03\x00")
+
+    def test_encode_frame_rejects_too_long_message(self):
+        with self.assertRaises(ValueError):
+            encode_frame(b"x" * (MAX_FRAME_SIZE + 1))
+
+    def test_decoder_joins_frame_split_across_reads(self):
+        decoder = FrameDecoder()
+        frame = encode_frame("{\"type\": \"end-game\"}")
+        for i in range(len(frame) - 1):
+            decoder.feed(frame[i:i + 1])
+            self.assertIsNone(decoder.next_payload())
+        decoder.feed(frame[-1:])
+        self.assertEqual(decoder.next_payload(), b"{\"type\": \"end-game\"}")
+        self.assertIsNone(decoder.next_payload())
+
+    def test_decoder_splits_several_frames_in_one_read(self):
+        decoder = FrameDecoder()
+        third = encode_frame("\"Key\"")
+        decoder.feed(encode_frame("\"name\"") + encode_frame("") + third[:3])
+        self.assertEqual(decoder.next_payload(), b"\"name\"")
+        self.assertEqual(decoder.next_payload(), b"")
+        self.assertIsNone(decoder.next_payload())
+        decoder.feed(third[3:])
+        self.assertEqual(decoder.next_payload(), b"\"Key\"")
+
+    def test_decoder_rejects_too_long_frame(self):
+        decoder = FrameDecoder()
+        with self.assertRaises(ValueError):
+            decoder.feed(HEADER.pack(MAX_FRAME_SIZE + 1))
+
+    def test_receive_keeps_frames_read_past_the_first(self):
+        sock1, sock2 = socket.socketpair()
+        sock1.sendall(encode_frame("\"move\"") + encode_frame("\"OK\""))
+        send(sock1, b"\x03\x02")
+        sock1.close()
+        self.assertEqual(receive(sock2), "\"move\"")
+        self.assertEqual(receive(sock2), "\"OK\"")
+        self.assertEqual(receive_payload(sock2), b"\x03\x02")
+        self.assertEqual(receive(sock2), "")
+        sock2.close()
+
+if __name__ == '__main__':
+    unittest.main()
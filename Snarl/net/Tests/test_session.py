@@ -0,0 +1,553 @@
+import asyncio
+import json
+import os
+import sys
+import time
+import unittest
+# The server's modules import each other as scripts run from Snarl/net.
+NET_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, NET_DIR)
+from session import KEYFRAME_INTERVAL, MAX_NAME_LENGTH, VIEW_DELTA, VIEW_UPDATE, Connection, GameAbandoned, \
+    GameSession, Lobby, PlayerOut, SharedFrames, TurnTimer, make_player_input
+from clientview import ClientView
+from codec import decode
+from netutils import HEADER, encode_frame
+from Snarl.src.Game.gamemanager import Gamemanager
+from Snarl.src.Game.player_impl import Player
+from Snarl.src.Game.tile import Tile
+from Snarl.tests.parseJson import create_level_from_json
+
+def read_level_jsons(path):
+    """Reads the number of levels and the JSON of each level from a levels file.
+    """
+    with open(path) as f:
+        text = f.read()
+    decoder = json.JSONDecoder()
+    level_jsons = []
+    index = 0
+    while index < len(text):
+        if text[index].isspace():
+            index += 1
+            continue
+        obj, index = decoder.raw_decode(text, index)
+        level_jsons.append(obj)
+    return level_jsons
+
+LEVEL_JSONS = read_level_jsons(os.path.join(NET_DIR, "snarl.levels"))
+
+def start_walk(outputs):
+    """Starts a game of the first level with a single player, whose notifications are written to
+    each of the given outputs. Returns a function that moves the player the given step of a walk
+    back and forth between the first two rooms, then updates the player.
+    """
+    player = Player("Ty", "Ty", out = BothOutputs(outputs), input_func = lambda: "skip")
+    gm = Gamemanager(1)
+    gm.add_player(player)
+    gm.start_game(create_level_from_json(LEVEL_JSONS[1]))
+    # Down the hallway below the first room to the door of the next, where the zombie waits. The
+    # player may have been spawned where the zombie is moved to.
+    start = gm.game_state.get_entity_location(player.entity)
+    gm.game_state.move(gm.enemy_list[0].entity, Tile(6, 11) if (start.x, start.y) == (6, 12) else Tile(6, 12))
+    path = [Tile(2, y) for y in range(4, 13)] + [Tile(3, 12), Tile(4, 12)]
+    walk = path + path[-2:0:-1]
+    def step(i):
+        gm.game_state.move(player.entity, walk[i % len(walk)])
+        gm._update_player(player)
+    return step
+
+class TestPlayerOut(unittest.TestCase):
+    def play_walk(self, steps):
+        """Walks the player for the given number of steps, and returns the messages sent for each
+        update by a PlayerOut sending deltas and by one sending full updates.
+        """
+        delta_connection, full_connection = FakeConnection(), FakeConnection()
+        step = start_walk([PlayerOut(delta_connection, deltas = True), PlayerOut(full_connection)])
+        for i in range(steps):
+            step(i)
+        return delta_connection.sent_messages(), full_connection.sent_messages()
+
+    def test_first_update_is_keyframe(self):
+        deltas, fulls = self.play_walk(2)
+        self.assertEqual(deltas[0], fulls[0])
+        self.assertEqual(deltas[0]["type"], "player-update")
+        self.assertEqual(deltas[1]["type"], "player-delta")
+
+    def test_keyframe_sent_after_interval(self):
+        deltas, fulls = self.play_walk(2 * KEYFRAME_INTERVAL + 3)
+        keyframes = [i for i, msg in enumerate(deltas) if msg["type"] == "player-update"]
+        self.assertEqual(keyframes, [0, KEYFRAME_INTERVAL + 1, 2 * KEYFRAME_INTERVAL + 2])
+        for i in keyframes:
+            self.assertEqual(deltas[i], fulls[i])
+
+    def test_keyframe_sent_while_view_is_queued(self):
+        connection, full_connection = FakeConnection(), FakeConnection()
+        step = start_walk([PlayerOut(connection, deltas = True), PlayerOut(full_connection)])
+        step(0)
+        step(1)
+        connection.queued_view = True
+        step(2)
+        connection.queued_view = False
+        step(3)
+        self.assertEqual([msg["type"] for msg in connection.sent_messages()], \
+            ["player-update", "player-delta", "player-update", "player-delta"])
+        self.assertEqual(connection.sent_messages()[2], full_connection.sent_messages()[2])
+
+    def test_start_level_forces_keyframe(self):
+        connection = FakeConnection()
+        out = PlayerOut(connection, deltas = True)
+        out.last_view = {"cells": {}, "objects": [], "actors": []}
+        out.write({"type": "start-level", "level": 1, "players": ["Ty"]})
+        self.assertIsNone(out.last_view)
+
+    def test_client_rebuilds_full_updates_from_deltas(self):
+        deltas, fulls = self.play_walk(2 * KEYFRAME_INTERVAL + 3)
+        sent_deltas = [msg for msg in deltas if msg["type"] == "player-delta"]
+        self.assertTrue(any(msg["cells"] for msg in sent_deltas))
+        self.assertTrue(any("actors" in msg for msg in sent_deltas))
+        self.assertTrue(any("actors" not in msg for msg in sent_deltas))
+        view = ClientView()
+        for delta, full in zip(deltas, fulls):
+            msg = view.apply_delta(delta) if delta["type"] == "player-delta" else delta
+            self.assertEqual(msg, full)
+            view.remember(msg["layout"], msg["position"], msg["objects"], msg["actors"])
+
+class TestSharedFrames(unittest.TestCase):
+    def test_message_to_every_player_is_encoded_once_per_codec(self):
+        connections = [FakeConnection(), FakeConnection(), FakeConnection()]
+        connections[2].codec = "binary"
+        shared = SharedFrames()
+        outputs = [PlayerOut(connection, shared = shared) for connection in connections]
+        start = {"type": "start-level", "level": 1, "players": ["Ty", "Al", "Jo"]}
+        for output in outputs:
+            output.write(start)
+        self.assertIs(connections[0].frames[0], connections[1].frames[0])
+        self.assertEqual(shared.frames, {"json": connections[0].frames[0], "binary": connections[2].frames[0]})
+        for connection in connections:
+            self.assertEqual(connection.sent_messages(), [start])
+        end = {"type": "end-game", "scores": [], "won": True}
+        for output in outputs:
+            output.write(end)
+        self.assertIs(connections[0].frames[1], connections[1].frames[1])
+        self.assertIsNot(connections[0].frames[1], connections[0].frames[0])
+        for connection in connections:
+            self.assertEqual(connection.sent_messages()[1], {"type": "end-game", "scores": [], "game-won": True})
+
+    def test_equal_message_sent_again_is_encoded_again(self):
+        shared = SharedFrames()
+        first = shared.frame({"type": "end-level"}, "json", {"type": "end-level"})
+        msg = {"type": "end-level"}
+        self.assertIsNot(shared.frame(msg, "json", msg), first)
+        self.assertIs(shared.frame(msg, "json", msg), shared.frame(msg, "json", msg))
+
+class TestConnection(unittest.IsolatedAsyncioTestCase):
+    async def test_update_drops_queued_views_only(self):
+        writer = FakeWriter()
+        connection = Connection(None, writer)
+        connection.send_frame(b"update1", VIEW_UPDATE)
+        connection.send_frame(b"delta1", VIEW_DELTA)
+        connection.send_frame(b"end-level")
+        self.assertTrue(connection.has_queued_view())
+        connection.send_frame(b"update2", VIEW_UPDATE)
+        self.assertEqual(list(connection.queue), [(None, b"end-level"), (VIEW_UPDATE, b"update2")])
+        self.assertEqual(connection.queued_bytes, len(b"end-level") + len(b"update2"))
+        await asyncio.sleep(0)
+        self.assertEqual(writer.written, [b"end-level", b"update2"])
+        self.assertFalse(connection.has_queued_view())
+
+    async def test_disconnects_client_over_send_limit(self):
+        writer = FakeWriter()
+        connection = Connection(None, writer, send_limit = 10)
+        connection.send_frame(b"x" * 6)
+        self.assertFalse(connection.closed)
+        connection.send_frame(b"y" * 6)
+        self.assertTrue(connection.closed)
+        self.assertTrue(writer.transport.aborted)
+        self.assertEqual(len(connection.queue), 0)
+        connection.send_frame(b"z")
+        await asyncio.sleep(0)
+        self.assertEqual(writer.written, [])
+
+    async def test_disconnects_stalled_client_once_its_queue_is_over_the_limit(self):
+        writer = FakeWriter()
+        writer.stalled = asyncio.get_running_loop().create_future()
+        connection = Connection(None, writer, send_limit = 10)
+        connection.send_frame(b"a" * 8)
+        await asyncio.sleep(0)
+        self.assertEqual(writer.written, [b"a" * 8])
+        # Updates replace one another while the client is not receiving.
+        for _ in range(5):
+            connection.send_frame(b"u" * 8, VIEW_UPDATE)
+        self.assertFalse(connection.closed)
+        connection.send_frame(b"b" * 3)
+        self.assertTrue(connection.closed)
+        self.assertTrue(writer.transport.aborted)
+        writer.stalled.set_result(None)
+        await asyncio.sleep(0)
+        self.assertEqual(writer.written, [b"a" * 8])
+
+    async def test_close_sends_queued_frames_first(self):
+        writer = FakeWriter()
+        connection = Connection(None, writer)
+        connection.send_frame(b"one")
+        connection.send_frame(b"two")
+        await connection.close()
+        self.assertEqual(writer.written, [b"one", b"two"])
+        self.assertTrue(writer.closed)
+        self.assertFalse(writer.transport.aborted)
+
+    async def test_slow_client_is_sent_latest_view_only(self):
+        writer = FakeWriter()
+        writer.stalled = asyncio.get_running_loop().create_future()
+        connection = Connection(None, writer)
+        full_connection = FakeConnection()
+        step = start_walk([PlayerOut(connection, deltas = True), PlayerOut(full_connection)])
+        for i in range(8):
+            step(i)
+            await asyncio.sleep(0)
+            self.assertLessEqual(len(connection.queue), 1)
+        writer.stalled.set_result(None)
+        await asyncio.sleep(0)
+        received = [decode(frame[HEADER.size:]) for frame in writer.written]
+        fulls = full_connection.sent_messages()
+        # The first update was written before the client stalled, and every later one but the
+        # last was dropped from the queue while it waited.
+        self.assertEqual(received, [fulls[0], fulls[-1]])
+
+class TestConnectionReceive(unittest.IsolatedAsyncioTestCase):
+    async def test_receive_times_out_and_drops_late_answer(self):
+        reader = asyncio.StreamReader()
+        connection = Connection(reader, FakeWriter())
+        reader.feed_data(encode_frame("[4, 2]")[:5])
+        self.assertIsNone(await connection.receive(0.02))
+        reader.feed_data(encode_frame("[4, 2]")[5:] + encode_frame("[4, 3]"))
+        self.assertEqual(await connection.receive(1), "[4, 3]")
+        self.assertEqual(connection.late_answers, 0)
+
+    async def test_receive_keeps_waiting_after_late_answer(self):
+        reader = asyncio.StreamReader()
+        connection = Connection(reader, FakeWriter())
+        self.assertIsNone(await connection.receive(0.02))
+        self.assertIsNone(await connection.receive(0.02))
+        reader.feed_data(encode_frame("[4, 2]") + encode_frame("[4, 3]") + encode_frame("[5, 3]"))
+        self.assertEqual(await connection.receive(1), "[5, 3]")
+
+    async def test_receive_after_late_answer_sees_disconnect(self):
+        reader = asyncio.StreamReader()
+        connection = Connection(reader, FakeWriter())
+        self.assertIsNone(await connection.receive(0.02))
+        reader.feed_data(encode_frame("[4, 2]"))
+        reader.feed_eof()
+        self.assertEqual(await connection.receive(1), "")
+        self.assertTrue(connection.closed)
+
+class TestTurnTimer(unittest.TestCase):
+    def test_turn_keeps_its_deadline_until_stopped(self):
+        timer = TurnTimer(10)
+        timer.start()
+        deadline = timer.deadline
+        self.assertLessEqual(timer.time_left(), 10)
+        self.assertGreater(timer.time_left(), 9)
+        timer.start()
+        self.assertEqual(timer.deadline, deadline)
+        timer.stop()
+        self.assertIsNone(timer.deadline)
+
+    def test_prompt_sends_time_left_and_result_ends_turn(self):
+        connection = FakeConnection()
+        timer = TurnTimer(10)
+        out = PlayerOut(connection, turn_timer = timer)
+        out.write("move")
+        self.assertEqual(connection.sent_messages()[0]["type"], "move")
+        self.assertGreater(connection.sent_messages()[0]["time-left"], 9)
+        self.assertIsNotNone(timer.deadline)
+        out.write({"type": "move-result", "result": FakeResult("OK")})
+        self.assertIsNone(timer.deadline)
+        self.assertEqual(connection.sent_messages()[1], "OK")
+
+    def test_turn_skipped_once_deadline_passes(self):
+        session = GameSession(0, LEVEL_JSONS, 1)
+        connection = FakeConnection(None)
+        session.add_player("Ty", connection)
+        timer = TurnTimer(0.05)
+        timer.start()
+        input_func = make_player_input(connection, session, timer)
+        self.assertEqual(input_func(), "skip")
+        self.assertIsNone(timer.deadline)
+        self.assertFalse(connection.closed)
+
+    def test_move_in_time_is_returned(self):
+        session = GameSession(0, LEVEL_JSONS, 1)
+        connection = FakeConnection("[4, 2]")
+        session.add_player("Ty", connection)
+        timer = TurnTimer(10)
+        timer.start()
+        self.assertEqual(make_player_input(connection, session, timer)(), "[4, 2]")
+        self.assertIsNotNone(timer.deadline)
+
+class TestGameSession(unittest.TestCase):
+    def test_add_player_registers_name(self):
+        session = GameSession(0, LEVEL_JSONS, 2)
+        connection = FakeConnection()
+        session.add_player("Ty", connection)
+        self.assertTrue(session.has_player("Ty"))
+        self.assertFalse(session.has_player("Al"))
+        self.assertIs(session.connections["Ty"], connection)
+        self.assertFalse(session.is_full())
+
+    def test_add_player_rejects_duplicate_name(self):
+        session = GameSession(0, LEVEL_JSONS, 2)
+        session.add_player("Ty", FakeConnection())
+        with self.assertRaises(ValueError):
+            session.add_player("Ty", FakeConnection())
+        self.assertEqual(list(session.connections), ["Ty"])
+
+    def test_add_player_rejects_full_session(self):
+        session = GameSession(0, LEVEL_JSONS, 1)
+        session.add_player("Ty", FakeConnection())
+        self.assertTrue(session.is_full())
+        with self.assertRaises(RuntimeError):
+            session.add_player("Al", FakeConnection())
+
+    def test_player_input_skips_for_disconnected_client(self):
+        session = GameSession(0, LEVEL_JSONS, 2)
+        gone, playing = FakeConnection(), FakeConnection("{\"type\": \"move\", \"to\": null}")
+        session.add_player("Ty", gone)
+        session.add_player("Al", playing)
+        self.assertEqual(make_player_input(playing, session)(), "{\"type\": \"move\", \"to\": null}")
+        self.assertEqual(make_player_input(gone, session)(), "skip")
+        self.assertEqual(make_player_input(gone, session)(), "skip")
+
+    def test_player_input_stops_abandoned_game(self):
+        session = GameSession(0, LEVEL_JSONS, 2)
+        first, second = FakeConnection(), FakeConnection()
+        session.add_player("Ty", first)
+        session.add_player("Al", second)
+        self.assertEqual(make_player_input(first, session)(), "skip")
+        with self.assertRaises(GameAbandoned):
+            make_player_input(second, session)()
+
+class TestGameSessionRun(unittest.IsolatedAsyncioTestCase):
+    async def test_run_plays_in_thread_and_closes_connections_once_abandoned(self):
+        session = GameSession(0, LEVEL_JSONS, 2)
+        connections = [FakeConnection(), FakeConnection()]
+        session.add_player("Ty", connections[0])
+        session.add_player("Al", connections[1])
+        await asyncio.wait_for(session.run(), 10)
+        self.assertTrue(session.started)
+        for connection in connections:
+            self.assertTrue(connection.closed)
+            self.assertTrue(connection.was_closed)
+            self.assertEqual(connection.sent_messages()[0]["type"], "player-update")
+
+    async def test_run_closes_connections_when_game_fails(self):
+        session = GameSession(0, [1, {"type": "level"}], 1)
+        connection = FakeConnection()
+        session.add_player("Ty", connection)
+        with self.assertRaises(Exception):
+            await asyncio.wait_for(session.run(), 10)
+        self.assertTrue(connection.was_closed)
+
+class TestLobby(unittest.IsolatedAsyncioTestCase):
+    def make_lobby(self, max_players, max_games = None, handshake_timeout = None):
+        self.sessions = []
+        def make_session(session_id):
+            session = GameSession(session_id, LEVEL_JSONS, max_players)
+            self.sessions.append(session)
+            return session
+        lobby = Lobby(make_session, 60, max_games, handshake_timeout = handshake_timeout)
+        self.addCleanup(lambda: lobby.timer is not None and lobby.timer.cancel())
+        return lobby
+
+    async def test_handle_welcomes_client_and_registers_name(self):
+        lobby = self.make_lobby(2)
+        connection = FakeConnection("Ty")
+        await lobby.handle(connection)
+        self.assertEqual(json.loads(connection.sent[0]), {"type": "welcome", "info": "No", "codecs": ["json", "binary"]})
+        self.assertEqual(connection.sent[1], "\"name\"")
+        self.assertEqual(len(self.sessions), 1)
+        self.assertTrue(self.sessions[0].has_player("Ty"))
+        self.assertFalse(self.sessions[0].started)
+        self.assertIsNotNone(lobby.timer)
+
+    async def test_handle_asks_again_for_duplicate_name(self):
+        lobby = self.make_lobby(3)
+        await lobby.handle(FakeConnection("Ty"))
+        connection = FakeConnection("Ty", "Al")
+        await lobby.handle(connection)
+        self.assertEqual(connection.sent.count("\"name\""), 2)
+        self.assertEqual(list(self.sessions[0].connections), ["Ty", "Al"])
+
+    async def test_handle_asks_again_for_too_long_name(self):
+        lobby = self.make_lobby(2)
+        connection = FakeConnection("T" * (MAX_NAME_LENGTH + 1), "T" * MAX_NAME_LENGTH)
+        await lobby.handle(connection)
+        self.assertEqual(connection.sent.count("\"name\""), 2)
+        self.assertEqual(list(self.sessions[0].connections), ["T" * MAX_NAME_LENGTH])
+
+    async def test_handle_takes_codec_request_before_name(self):
+        lobby = self.make_lobby(2)
+        connection = FakeConnection(json.dumps({"type": "codec", "codec": "binary"}), "Ty")
+        await lobby.handle(connection)
+        self.assertEqual(connection.codec, "binary")
+        self.assertTrue(self.sessions[0].has_player("Ty"))
+
+    async def test_handle_disconnects_client_that_gives_no_name_in_time(self):
+        lobby = self.make_lobby(2, handshake_timeout = 0.05)
+        connection = FakeConnection(None)
+        await asyncio.wait_for(lobby.handle(connection), 1)
+        self.assertTrue(connection.was_closed)
+        self.assertEqual(connection.sent.count("\"name\""), 1)
+        self.assertEqual(self.sessions, [])
+
+    async def test_handshake_timeout_covers_codec_request_and_retries(self):
+        lobby = self.make_lobby(3, handshake_timeout = 0.05)
+        await lobby.handle(FakeConnection("Ty"))
+        connection = FakeConnection(json.dumps({"type": "codec", "codec": "binary"}), "Ty", None)
+        await asyncio.wait_for(lobby.handle(connection), 1)
+        self.assertTrue(connection.was_closed)
+        self.assertEqual(connection.sent.count("\"name\""), 2)
+        self.assertEqual(list(self.sessions[0].connections), ["Ty"])
+
+    async def test_handle_drops_client_that_disconnects_before_naming(self):
+        lobby = self.make_lobby(2)
+        connection = FakeConnection()
+        await lobby.handle(connection)
+        self.assertTrue(connection.was_closed)
+        self.assertEqual(self.sessions, [])
+
+    async def test_game_starts_once_lobby_is_full(self):
+        lobby = self.make_lobby(2, max_games = 1)
+        connections = [FakeConnection("Ty"), FakeConnection("Al")]
+        await lobby.handle(connections[0])
+        self.assertEqual(lobby.games_started, 0)
+        await lobby.handle(connections[1])
+        self.assertEqual(lobby.games_started, 1)
+        self.assertIsNone(lobby.open_session)
+        self.assertIsNone(lobby.timer)
+        self.assertFalse(lobby.is_accepting())
+        # Both clients disconnect as soon as the game asks for a move, which ends it.
+        await asyncio.wait_for(lobby.wait_closed(), 10)
+        self.assertTrue(self.sessions[0].started)
+        self.assertEqual(lobby.running, set())
+        for connection in connections:
+            self.assertTrue(connection.was_closed)
+            self.assertEqual(connection.sent_messages()[2]["type"], "player-update")
+
+    async def test_lobby_turns_away_clients_after_last_game(self):
+        lobby = self.make_lobby(1, max_games = 1)
+        await lobby.handle(FakeConnection("Ty"))
+        late = FakeConnection("Al")
+        await lobby.handle(late)
+        self.assertTrue(late.was_closed)
+        self.assertEqual(late.sent, [])
+        await asyncio.wait_for(lobby.wait_closed(), 10)
+
+class FakeConnection:
+    """Stands in for the Connection of a client, which answers with the given messages in order
+    and disconnects once they run out. A client given None as its next message never answers.
+    """
+    def __init__(self, *messages):
+        self.messages = list(messages)
+        self.address = ("127.0.0.1", 45678)
+        self.sent = []
+        self.frames = []
+        self.closed = False
+        self.was_closed = False
+        self.codec = "json"
+        self.queued_view = False
+
+    async def receive(self, timeout = None) -> str:
+        if self.messages and self.messages[0] is None:
+            if timeout is None:
+                await asyncio.get_running_loop().create_future()
+            await asyncio.sleep(timeout)
+            return None
+        return self.receive_threadsafe()
+
+    def receive_threadsafe(self, timeout = None) -> str:
+        if self.messages and self.messages[0] is None:
+            if timeout is None:
+                raise RuntimeError("Would wait forever for a client that never answers.")
+            time.sleep(timeout)
+            return None
+        if self.closed or not self.messages:
+            self.closed = True
+            return ""
+        return self.messages.pop(0)
+
+    def send(self, msg):
+        if not self.closed:
+            self.sent.append(msg)
+
+    def send_threadsafe(self, msg, kind = None):
+        self.send(msg)
+
+    def send_frame(self, frame, kind = None):
+        if not self.closed:
+            self.frames.append(frame)
+            self.sent.append(frame[HEADER.size:])
+
+    def send_frame_threadsafe(self, frame, kind = None):
+        self.send_frame(frame)
+
+    def has_queued_view(self) -> bool:
+        return self.queued_view
+
+    def sent_messages(self) -> list:
+        return [decode(msg.encode() if isinstance(msg, str) else msg) for msg in self.sent]
+
+    async def close(self):
+        self.closed = True
+        self.was_closed = True
+
+class FakeResult:
+    """Stands in for the result of a move, which is sent to the client as its value.
+    """
+    def __init__(self, value):
+        self.value = value
+
+class BothOutputs:
+    """Writes everything written to it to each of the given outputs.
+    """
+    def __init__(self, outputs):
+        self.outputs = outputs
+
+    def write(self, arg):
+        for output in self.outputs:
+            output.write(arg)
+
+class FakeWriter:
+    """Stands in for the asyncio StreamWriter of a client, keeping the frames written to it. Its
+    drain waits on stalled, if set, as it would for a client that is not receiving.
+    """
+    def __init__(self):
+        self.written = []
+        self.transport = FakeTransport()
+        self.closed = False
+        self.stalled = None
+
+    def get_extra_info(self, name):
+        return ("127.0.0.1", 45678) if name == "peername" else None
+
+    def writelines(self, frames):
+        self.written.extend(frames)
+
+    async def drain(self):
+        if self.stalled is not None:
+            await self.stalled
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        pass
+
+class FakeTransport:
+    def __init__(self):
+        self.aborted = False
+
+    def abort(self):
+        self.aborted = True
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import os
+import socket
+import sys
+import unittest
+# The server's modules import each other as scripts run from Snarl/net.
+NET_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, NET_DIR)
+from netutils import FrameDecoder, READ_SIZE
+from session import Connection
+from supervisor import CONTROL_SIZE, RemoteSession, Supervisor, _serve_worker, receive_control, send_control
+from Snarl.tests.parseJson import load_level_jsons
+
+LEVEL_JSONS = load_level_jsons(os.path.join(NET_DIR, "snarl.levels"))
+
+def control_pair():
+    return socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+
+def open_fds() -> int:
+    return len(os.listdir("/proc/self/fd"))
+
+class TestControlMessages(unittest.TestCase):
+    def test_message_and_socket_round_trip(self):
+        sender, receiver = control_pair()
+        client, other = socket.socketpair()
+        send_control(sender, {"type": "join", "session": 3, "name": "Ty"}, [client.fileno()])
+        msg, fds = receive_control(receiver)
+        self.assertEqual(msg, {"type": "join", "session": 3, "name": "Ty"})
+        self.assertEqual(len(fds), 1)
+        with socket.socket(fileno = fds[0]) as passed:
+            passed.sendall(b"hello")
+            self.assertEqual(other.recv(5), b"hello")
+        for sock in [sender, receiver, client, other]:
+            sock.close()
+
+    def test_closed_control_socket_gives_none(self):
+        sender, receiver = control_pair()
+        sender.close()
+        self.assertEqual(receive_control(receiver), (None, []))
+        receiver.close()
+
+    def test_too_long_message_is_rejected_and_its_sockets_closed(self):
+        sender, receiver = control_pair()
+        client, other = socket.socketpair()
+        before = open_fds()
+        send_control(sender, {"type": "join", "name": "T" * CONTROL_SIZE}, [client.fileno()])
+        with self.assertRaises(ValueError):
+            receive_control(receiver)
+        self.assertEqual(open_fds(), before)
+        for sock in [sender, receiver, client, other]:
+            sock.close()
+
+    def test_undecodable_message_is_rejected(self):
+        sender, receiver = control_pair()
+        sender.send(b"{\"type\": ")
+        with self.assertRaises(ValueError):
+            receive_control(receiver)
+        sender.close()
+        receiver.close()
+
+class TestServeWorker(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.supervisor_end, worker_end = control_pair()
+        self.supervisor_end.settimeout(10)
+        self.worker = asyncio.get_running_loop().create_task(_serve_worker(worker_end, LEVEL_JSONS, 1, {}))
+
+    async def asyncTearDown(self):
+        self.supervisor_end.close()
+        await asyncio.wait_for(self.worker, 10)
+
+    async def receive(self) -> dict:
+        msg, _ = await asyncio.get_running_loop().run_in_executor(None, receive_control, self.supervisor_end)
+        return msg
+
+    async def test_join_without_socket_is_skipped(self):
+        send_control(self.supervisor_end, {"type": "join", "session": 0, "name": "Ty", "codec": "json", \
+            "send_limit": 1024})
+        send_control(self.supervisor_end, {"type": "start", "session": 0})
+        self.assertEqual(await self.receive(), {"type": "finished", "session": 0, \
+            "error": "No players of game 0 reached its worker."})
+        self.assertFalse(self.worker.done())
+
+    async def test_plays_game_of_handed_over_client(self):
+        client, server_side = socket.socketpair()
+        send_control(self.supervisor_end, {"type": "join", "session": 5, "name": "Ty", "codec": "json", \
+            "send_limit": 1024 * 1024}, [server_side.fileno()])
+        server_side.close()
+        send_control(self.supervisor_end, {"type": "start", "session": 5})
+        # The player is shown the level, and the game is over once it disconnects.
+        payload = await read_payload(client)
+        self.assertEqual(json.loads(payload)["type"], "player-update")
+        client.close()
+        self.assertEqual(await self.receive(), {"type": "finished", "session": 5, "error": None})
+
+class TestSupervisor(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.supervisor = Supervisor(2, LEVEL_JSONS, 1)
+        self.addAsyncCleanup(self.stop_workers)
+
+    async def stop_workers(self):
+        processes = [worker.process for worker in self.supervisor.workers]
+        self.supervisor.close()
+        for process in processes:
+            await asyncio.get_running_loop().run_in_executor(None, process.join, 10)
+
+    async def test_sessions_go_to_least_busy_worker(self):
+        first, second = self.supervisor.make_session(0), self.supervisor.make_session(1)
+        self.assertIsInstance(first, RemoteSession)
+        first_client = await add_client(first, "Ty")
+        second_client = await add_client(second, "Al")
+        self.assertIsNot(first.worker, second.worker)
+        self.assertEqual(first.worker.sessions, {0})
+        first_client.close()
+        second_client.close()
+
+    async def test_worker_plays_session_until_client_leaves(self):
+        session = self.supervisor.make_session(0)
+        client = await add_client(session, "Ty")
+        game = asyncio.get_running_loop().create_task(session.run())
+        payload = await read_payload(client)
+        self.assertEqual(json.loads(payload)["type"], "player-update")
+        client.close()
+        await asyncio.wait_for(game, 10)
+        self.assertTrue(session.started)
+        self.assertEqual(session.worker.sessions, set())
+
+    async def test_stopped_worker_is_replaced_and_its_games_fail(self):
+        session = self.supervisor.make_session(0)
+        client = await add_client(session, "Ty")
+        worker = session.worker
+        game = asyncio.get_running_loop().create_task(session.run())
+        await read_payload(client)
+        worker.process.kill()
+        with self.assertRaises(RuntimeError):
+            await asyncio.wait_for(game, 10)
+        self.assertFalse(worker.alive)
+        self.assertNotIn(worker, self.supervisor.workers)
+        self.assertEqual(len(self.supervisor.workers), 2)
+        # A session that had lost its worker starts over on a new one.
+        session = self.supervisor.make_session(1)
+        session.worker = worker
+        other = await add_client(session, "Al")
+        self.assertIn(session.worker, self.supervisor.workers)
+        client.close()
+        other.close()
+
+async def add_client(session: RemoteSession, name: str) -> socket.socket:
+    """Connects a client to the server side of a socket pair, and adds it to the given session.
+    Returns the client's socket.
+    """
+    client, server_side = socket.socketpair()
+    reader, writer = await asyncio.open_connection(sock = server_side)
+    session.add_player(name, Connection(reader, writer))
+    return client
+
+async def read_payload(client: socket.socket) -> bytes:
+    """Reads the payload of the next frame sent to the given client.
+    """
+    decoder = FrameDecoder()
+    client.setblocking(False)
+    loop = asyncio.get_running_loop()
+    payload = None
+    while payload is None:
+        data = await asyncio.wait_for(loop.sock_recv(client, READ_SIZE), 10)
+        if not data:
+            raise ConnectionError("The server closed the connection.")
+        decoder.feed(data)
+        payload = decoder.next_payload()
+    return payload
+
+if __name__ == '__main__':
+    unittest.main()
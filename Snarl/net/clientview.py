@@ -0,0 +1,38 @@
+"""This file holds the view of the dungeon kept by a SNARL client, so that the player-delta
+messages sent by a server in delta mode can be turned back into full player-update messages.
+"""
+
+class ClientView:
+    """Represents the last view of the dungeon the client was shown: its cells by their absolute
+    [y, x] coordinates, its objects and its actors.
+    """
+    def __init__(self):
+        self.size = 0
+        self.cells = {}
+        self.objects = []
+        self.actors = []
+
+    def remember(self, layout, position, objects, actors):
+        """Keep the given view, which is centered on the given position, so that the player-delta
+        messages that follow it can be applied.
+        """
+        self.size = len(layout)
+        top, left = position[0] - self.size // 2, position[1] - self.size // 2
+        self.cells = {(top + row, left + col): tile for row, tiles in enumerate(layout) \
+            for col, tile in enumerate(tiles)}
+        self.objects = objects
+        self.actors = actors
+
+    def apply_delta(self, msg) -> dict:
+        """Given a player-delta message, returns the player-update message it stands for. The view
+        is not changed until that update is remembered.
+        """
+        cells = self.cells.copy()
+        for y, x, tile in msg["cells"]:
+            cells[(y, x)] = tile
+        position = msg["position"]
+        top, left = position[0] - self.size // 2, position[1] - self.size // 2
+        layout = [[cells[(top + row, left + col)] for col in range(self.size)] for row in range(self.size)]
+        return {"type": "player-update", "layout": layout, "position": position, \
+            "objects": msg.get("objects", self.objects), "actors": msg.get("actors", self.actors), \
+            "message": msg["message"]}
@@ -0,0 +1,143 @@
+"""This file holds the codecs that messages from the SNARL server to its clients may be encoded
+with. Every client understands JSON. A client may ask for the binary codec during the welcome
+handshake, by sending {"type": "codec", "codec": "binary"} before its name, after which the
+messages sent most often are packed with struct instead:
+
+    player-update   tag, position, layout size, a byte per layout cell, then objects and actors
+    player-delta    tag, position, changed cells, then objects and actors if they changed
+    string          tag, then the index of the string in STRINGS, for "move", "OK", and so on
+
+Positions and cells are big-endian signed 16 bit [y, x] pairs. Every binary payload starts with a
+tag byte below FIRST_TEXT_BYTE, which no JSON text starts with, so each received payload can be
+decoded without knowing which codec was used for it. Messages the binary codec has no format for
+are sent as JSON.
+"""
+import json
+import struct
+
+TAG_PLAYER_UPDATE = 0x01
+TAG_PLAYER_DELTA = 0x02
+TAG_STRING = 0x03
+# JSON text never starts with a byte below this one, which is the tab character.
+FIRST_TEXT_BYTE = 0x09
+
+# The strings sent on their own by the server.
+STRINGS = ["move", "name", "OK", "Key", "Exit", "Eject", "Invalid"]
+OBJECT_TYPES = ["key", "exit"]
+ACTOR_TYPES = ["player", "zombie", "ghost"]
+
+STRING_MSG = struct.Struct("!BB")
+UPDATE_HEADER = struct.Struct("!BhhHH")
+DELTA_HEADER = struct.Struct("!BhhHB")
+CELL = struct.Struct("!hhB")
+ENTITY = struct.Struct("!Bhh")
+COUNT = struct.Struct("!H")
+# Bits of the flags of a player-delta, telling whether it holds objects and actors.
+HAS_OBJECTS = 0x01
+HAS_ACTORS = 0x02
+
+def encode_json(msg) -> str:
+    """Encode the given message as JSON.
+    """
+    return json.dumps(msg)
+
+def encode_binary(msg):
+    """Encode the given message with the binary codec, or as JSON if the binary codec has no format
+    for it. Returns bytes for binary messages and a string for JSON.
+    """
+    try:
+        if isinstance(msg, str) and msg in STRINGS:
+            return STRING_MSG.pack(TAG_STRING, STRINGS.index(msg))
+        if isinstance(msg, dict) and msg.get("message") is None:
+            if msg.get("type") == "player-update":
+                return _encode_update(msg)
+            if msg.get("type") == "player-delta":
+                return _encode_delta(msg)
+    except (struct.error, ValueError):
+        pass
+    return encode_json(msg)
+
+def _encode_update(msg) -> bytes:
+    layout = msg["layout"]
+    rows, cols = len(layout), len(layout[0]) if layout else 0
+    y, x = msg["position"]
+    return b"".join([UPDATE_HEADER.pack(TAG_PLAYER_UPDATE, y, x, rows, cols), \
+        bytes(tile for row in layout for tile in row), \
+        _encode_entities(msg["objects"], OBJECT_TYPES), _encode_entities(msg["actors"], ACTOR_TYPES)])
+
+def _encode_delta(msg) -> bytes:
+    y, x = msg["position"]
+    flags = (HAS_OBJECTS if "objects" in msg else 0) | (HAS_ACTORS if "actors" in msg else 0)
+    parts = [DELTA_HEADER.pack(TAG_PLAYER_DELTA, y, x, len(msg["cells"]), flags)]
+    parts.extend(CELL.pack(cell_y, cell_x, tile) for cell_y, cell_x, tile in msg["cells"])
+    if "objects" in msg:
+        parts.append(_encode_entities(msg["objects"], OBJECT_TYPES))
+    if "actors" in msg:
+        parts.append(_encode_entities(msg["actors"], ACTOR_TYPES))
+    return b"".join(parts)
+
+def _encode_entities(entities: list, types: list) -> bytes:
+    """Packs a list of objects or actors, each a dictionary of a type from the given types and a
+    position.
+    """
+    return COUNT.pack(len(entities)) + b"".join(ENTITY.pack(types.index(entity["type"]), *entity["position"]) \
+        for entity in entities)
+
+def decode(payload: bytes):
+    """Decode a payload received from the server, encoded with either codec, into the message it
+    holds, as json.loads would have returned it.
+    """
+    if payload and payload[0] < FIRST_TEXT_BYTE:
+        return _decode_binary(payload)
+    return json.loads(payload.decode('utf-8'))
+
+def _decode_binary(payload: bytes):
+    tag = payload[0]
+    if tag == TAG_STRING:
+        return STRINGS[STRING_MSG.unpack_from(payload)[1]]
+    if tag == TAG_PLAYER_UPDATE:
+        _, y, x, rows, cols = UPDATE_HEADER.unpack_from(payload)
+        offset = UPDATE_HEADER.size
+        layout = [list(payload[offset + row * cols:offset + (row + 1) * cols]) for row in range(rows)]
+        offset += rows * cols
+        objects, offset = _decode_entities(payload, offset, OBJECT_TYPES)
+        actors, offset = _decode_entities(payload, offset, ACTOR_TYPES)
+        return {"type": "player-update", "layout": layout, "position": [y, x], \
+            "objects": objects, "actors": actors, "message": None}
+    if tag == TAG_PLAYER_DELTA:
+        _, y, x, num_of_cells, flags = DELTA_HEADER.unpack_from(payload)
+        offset = DELTA_HEADER.size
+        cells = [list(cell) for cell in CELL.iter_unpack(payload[offset:offset + num_of_cells * CELL.size])]
+        offset += num_of_cells * CELL.size
+        msg = {"type": "player-delta", "position": [y, x], "cells": cells, "message": None}
+        if flags & HAS_OBJECTS:
+            msg["objects"], offset = _decode_entities(payload, offset, OBJECT_TYPES)
+        if flags & HAS_ACTORS:
+            msg["actors"], offset = _decode_entities(payload, offset, ACTOR_TYPES)
+        return msg
+    raise ValueError(f"Unknown binary message tag {tag}.")
+
+def _decode_entities(payload: bytes, offset: int, types: list):
+    """Unpacks a list of objects or actors starting at the given offset. Returns the list and the
+    offset just past it.
+    """
+    (count,) = COUNT.unpack_from(payload, offset)
+    offset += COUNT.size
+    entities = [{"type": types[kind], "position": [y, x]} for kind, y, x in \
+        ENTITY.iter_unpack(payload[offset:offset + count * ENTITY.size])]
+    return entities, offset + count * ENTITY.size
+
+# The encoder of each codec a client may ask for.
+ENCODERS = {"json": encode_json, "binary": encode_binary}
+
+def parse_codec_request(msg: str):
+    """If the given message from a client asks for a codec, returns the name of the codec to use
+    for it, which is JSON if the client asked for one that is not known. Otherwise returns None.
+    """
+    try:
+        request = json.loads(msg)
+    except ValueError:
+        return None
+    if not isinstance(request, dict) or request.get("type") != "codec":
+        return None
+    return request.get("codec") if request.get("codec") in ENCODERS else "json"
@@ -1,16 +1,102 @@
-import time
+"""This file holds the framing used for every message sent between the SNARL server and its
+clients. Each message is sent as a frame: a 4 byte big-endian length, followed by that many bytes
+of the UTF-8 encoded message. Frames may be split across reads or several may arrive in a single
+read, so received bytes are collected by a FrameDecoder until whole frames are available.
+"""
+import asyncio
+import struct
+import weakref
+from collections import deque
+
+HEADER = struct.Struct("!I")
+# Frames longer than this are rejected rather than buffered.
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+# The most bytes read from a socket at once.
+READ_SIZE = 65536
+
+def encode_frame(msg) -> bytes:
+    """Encode the given message, either a string or bytes, as a single frame.
+    """
+    payload = msg.encode() if isinstance(msg, str) else bytes(msg)
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ValueError(f"Message of {len(payload)} bytes is too long to send.")
+    return HEADER.pack(len(payload)) + payload
+
+class FrameDecoder:
+    """Splits a stream of received bytes into the payloads of the frames it holds.
+    """
+    def __init__(self):
+        self.buffer = bytearray()
+        self.payloads = deque()
+
+    def feed(self, data: bytes):
+        """Adds received bytes to the decoder, and keeps the payload of every frame they complete.
+        """
+        self.buffer += data
+        start = 0
+        while len(self.buffer) - start >= HEADER.size:
+            (length,) = HEADER.unpack_from(self.buffer, start)
+            if length > MAX_FRAME_SIZE:
+                raise ValueError(f"Received a frame of {length} bytes, which is too long.")
+            end = start + HEADER.size + length
+            if len(self.buffer) < end:
+                break
+            self.payloads.append(bytes(self.buffer[start + HEADER.size:end]))
+            start = end
+        del self.buffer[:start]
+
+    def next_payload(self):
+        """Returns the payload of the oldest complete frame that has not been returned yet, or
+        None if there is none.
+        """
+        return self.payloads.popleft() if self.payloads else None
+
+# The decoder of every socket that has been received from, so that bytes read past the end of
+# one frame are kept for the next call to receive.
+_decoders = weakref.WeakKeyDictionary()
 
 def send(conn, msg):
     """Encode the given message and send it over the given connection.
     """
-    conn.sendall(msg.encode())
-    # This solves an intermittent bug with concatenation of server messages.
-    # Yes, it's bad, but fine for this application.
-    time.sleep(0.0001)
+    conn.sendall(encode_frame(msg))
 
 def receive(conn):
-    """Receive and decode a message from the given connection.
+    """Receive and decode a message from the given connection. Blocks until a whole message has
+    arrived. Returns an empty string if the connection was closed.
+    """
+    return receive_payload(conn).decode('utf-8')
+
+def receive_payload(conn) -> bytes:
+    """Receive the payload of a message from the given connection, without decoding it. Blocks
+    until a whole message has arrived. Returns empty bytes if the connection was closed.
+    """
+    decoder = _decoders.get(conn)
+    if decoder is None:
+        decoder = _decoders[conn] = FrameDecoder()
+    payload = decoder.next_payload()
+    while payload is None:
+        data = conn.recv(READ_SIZE)
+        if not data:
+            return b""
+        decoder.feed(data)
+        payload = decoder.next_payload()
+    return payload
+
+async def read_message(reader):
+    """Receive and decode a message from the given asyncio StreamReader. Returns an empty string
+    if the connection was closed.
+    """
+    try:
+        header = await reader.readexactly(HEADER.size)
+        (length,) = HEADER.unpack(header)
+        if length > MAX_FRAME_SIZE:
+            raise ValueError(f"Received a frame of {length} bytes, which is too long.")
+        payload = await reader.readexactly(length)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return ""
+    return payload.decode('utf-8')
+
+def write_message(writer, msg):
+    """Encode the given message and queue it to be sent by the given asyncio StreamWriter.
     """
-    packet = conn.recv(4096)
-    msg = packet.decode('utf-8')
-    return msg
\ No newline at end of file
+    writer.write(encode_frame(msg))
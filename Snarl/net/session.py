@@ -0,0 +1,654 @@
+"""This file holds the parts of the SNARL server that run games: the Connection to each client,
+the output object used by each network player, the GameSession that runs a Gamemanager for a
+group of clients, and the Lobby that groups connecting clients into sessions.
+
+Connections are read and written on the server's asyncio event loop. Each started GameSession
+runs its Gamemanager in its own thread, which waits on the event loop whenever it needs a move
+from a player, so a game waiting on its players never holds up the turns of another game.
+"""
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+from collections import deque
+from netutils import read_message, encode_frame
+from codec import ENCODERS, parse_codec_request
+from Snarl.src.Game.gamemanager import Gamemanager
+from Snarl.src.Game.player_impl import Player
+from Snarl.src.Game.observer_impl import Observer
+from Snarl.src.Game.occupants import LevelKey, Character, Zombie, Door
+from Snarl.src.Game.viewport import Viewport
+from Snarl.tests.parseJson import create_level_from_json
+
+# When sending deltas, the most player-delta messages sent in a row before a full player-update.
+KEYFRAME_INTERVAL = 20
+# The most bytes that may wait to be sent to a client before it is disconnected for falling too
+# far behind.
+SEND_LIMIT = 1024 * 1024
+# The most seconds spent sending what is left to a client once its connection is closed.
+CLOSE_TIMEOUT = 10
+# The most characters in a player's name.
+MAX_NAME_LENGTH = 64
+
+# The kinds of frames sent to a client that hold the player's view. A player-update replaces
+# every view queued before it, while a player-delta only makes sense after the views before it.
+VIEW_UPDATE = "update"
+VIEW_DELTA = "delta"
+
+def tile_to_num(tile):
+    """Transforms the given tile into a number 0, 1, 2, as specified by assignment.
+    """
+    if tile.has_block():
+        return 0
+    elif tile.has_occupant(Door):
+        return 2
+    else:
+        return 1
+
+def transform_layout(tile_grid):
+    """Given a tile grid and a center position, transform the grid into a 5x5 grid of 0,1,2
+    as per the assignment spec.
+    """
+    number_layout = []
+    for row in tile_grid:
+        number_row = []
+        for tile in row:
+            number_row.append(tile_to_num(tile))
+        number_layout.append(number_row)
+    return number_layout
+
+class Connection:
+    """Represents a client connected to the server. The coroutines and send must be called on
+    the event loop; a game running in its own thread uses the threadsafe methods instead.
+
+    Frames sent to the client wait in the connection's own queue until its writer task hands them
+    to the socket, as fast as the client receives them, so a slow client never holds up the game.
+    A queued view of the dungeon is dropped once a player-update is queued after it, and a client
+    with more than send_limit bytes waiting is disconnected.
+    """
+    def __init__(self, reader, writer, send_limit: int = SEND_LIMIT):
+        self.reader = reader
+        self.writer = writer
+        self.loop = asyncio.get_running_loop()
+        self.address = writer.get_extra_info("peername")
+        self.closed = False
+        # The name of the codec that game messages to the client are encoded with.
+        self.codec = "json"
+        self.send_limit = send_limit
+        # (kind, frame) pairs waiting to be written, their size, and how many of them are views.
+        self.queue = deque()
+        self.queued_bytes = 0
+        self.queued_views = 0
+        self.closing = False
+        self.wakeup = asyncio.Event()
+        self.writer_task = None
+        # The read of the client's next message, kept when a receive times out so that no message
+        # is cut short, and the number of answers still owed for prompts that timed out.
+        self.reading = None
+        self.late_answers = 0
+
+    async def receive(self, timeout: float = None) -> str:
+        """Receive a message from the client. Returns an empty string once the client has
+        disconnected, or None if no message arrived within the given number of seconds. A client
+        answers every prompt, so once a receive times out the next message from the client is a
+        late answer to a prompt that has already been dealt with, and is dropped.
+        """
+        deadline = self.loop.time() + timeout if timeout is not None else None
+        while not self.closed:
+            if self.reading is None:
+                self.reading = self.loop.create_task(read_message(self.reader))
+            try:
+                remaining = max(0, deadline - self.loop.time()) if deadline is not None else None
+                msg = await asyncio.wait_for(asyncio.shield(self.reading), remaining)
+            except asyncio.TimeoutError:
+                self.late_answers += 1
+                return None
+            self.reading = None
+            if msg == "":
+                self.closed = True
+            elif self.late_answers > 0:
+                self.late_answers -= 1
+            else:
+                return msg
+        return ""
+
+    def send(self, msg):
+        """Queue a message to be sent to the client.
+        """
+        self.send_frame(encode_frame(msg))
+
+    def send_frame(self, frame: bytes, kind: str = None):
+        """Queue an already encoded frame to be sent to the client. The same frame may be sent to
+        any number of clients. The kind is VIEW_UPDATE or VIEW_DELTA if the frame holds the
+        player's view, and None otherwise.
+        """
+        if self.closed:
+            return
+        if kind == VIEW_UPDATE and self.queued_views > 0:
+            self._drop_queued_views()
+        self.queue.append((kind, frame))
+        self.queued_bytes += len(frame)
+        if kind is not None:
+            self.queued_views += 1
+        if self.queued_bytes > self.send_limit:
+            print(f"Disconnecting {self.address[0]}:{self.address[1]}, which fell too far behind.")
+            self._abort()
+            return
+        self.wakeup.set()
+        if self.writer_task is None:
+            self.writer_task = self.loop.create_task(self._write_queued())
+
+    def send_threadsafe(self, msg, kind: str = None):
+        """Queue a message to be sent to the client from a thread other than the event loop's. The
+        message is encoded by the calling thread.
+        """
+        self.send_frame_threadsafe(encode_frame(msg), kind)
+
+    def send_frame_threadsafe(self, frame: bytes, kind: str = None):
+        """Queue an already encoded frame to be sent to the client from a thread other than the
+        event loop's.
+        """
+        self.loop.call_soon_threadsafe(self.send_frame, frame, kind)
+
+    def has_queued_view(self) -> bool:
+        """Is a frame holding the player's view waiting to be written? May be called from any
+        thread, in which case the answer may already be out of date.
+        """
+        return self.queued_views > 0
+
+    def _drop_queued_views(self):
+        """Drops every queued frame that holds the player's view.
+        """
+        self.queue = deque(entry for entry in self.queue if entry[0] is None)
+        self.queued_bytes = sum(len(frame) for _, frame in self.queue)
+        self.queued_views = 0
+
+    async def _write_queued(self):
+        """Writes queued frames to the client as fast as it receives them, until the connection
+        is closing and nothing is left in the queue.
+        """
+        try:
+            while not self.closed and (self.queue or not self.closing):
+                if not self.queue:
+                    self.wakeup.clear()
+                    await self.wakeup.wait()
+                    continue
+                frames = [frame for _, frame in self.queue]
+                self.queue.clear()
+                self.queued_bytes = 0
+                self.queued_views = 0
+                self.writer.writelines(frames)
+                await self.writer.drain()
+        except ConnectionError:
+            self.closed = True
+
+    def _abort(self):
+        """Drops the connection at once, along with everything waiting to be sent.
+        """
+        self.closed = True
+        self.queue.clear()
+        self.queued_bytes = 0
+        self.queued_views = 0
+        self.wakeup.set()
+        self.writer.transport.abort()
+
+    def receive_threadsafe(self, timeout: float = None) -> str:
+        """Block the calling thread, which must not be the event loop's, until a message is
+        received from the client or the given number of seconds has passed.
+        """
+        return asyncio.run_coroutine_threadsafe(self.receive(timeout), self.loop).result()
+
+    def detach(self) -> socket.socket:
+        """Stops using this connection and returns a duplicate of its socket, so that the client
+        can be handed over to another process. Everything sent so far must already have been
+        received by the client.
+        """
+        if self.queue:
+            raise RuntimeError("Cannot hand over a connection that still has frames to send.")
+        duplicate = socket.socket(fileno=os.dup(self.writer.get_extra_info("socket").fileno()))
+        self.closed = True
+        self.wakeup.set()
+        self.writer.close()
+        return duplicate
+
+    async def close(self):
+        """Send anything still queued for the client, for at most CLOSE_TIMEOUT seconds, then
+        close the connection.
+        """
+        self.closing = True
+        self.wakeup.set()
+        try:
+            if self.writer_task is not None:
+                await asyncio.wait_for(self.writer_task, CLOSE_TIMEOUT)
+            self.closed = True
+            self.writer.close()
+            await self.writer.wait_closed()
+        except (ConnectionError, asyncio.TimeoutError):
+            self.closed = True
+            self.writer.transport.abort()
+
+class SharedFrames:
+    """Keeps the encoded frames of the last message sent to several players, one frame per codec,
+    so that a message sent to every player in a game is only encoded once for each codec used.
+    Messages are told apart by identity, as the Gamemanager notifies every player with the same
+    message object, which must not be changed once sent.
+    """
+    def __init__(self):
+        self.msg = None
+        self.frames = {}
+
+    def frame(self, msg, codec: str, client_msg) -> bytes:
+        """Returns the frame of the given message for the given codec, which is client_msg, the
+        message as sent to clients, encoded with that codec.
+        """
+        if msg is not self.msg:
+            self.msg = msg
+            self.frames = {}
+        frame = self.frames.get(codec)
+        if frame is None:
+            frame = self.frames[codec] = encode_frame(ENCODERS[codec](client_msg))
+        return frame
+
+class TurnTimer:
+    """Keeps the deadline of a player's turns. A turn starts when the player is first asked for a
+    move, and ends once one of its moves is accepted, so the player is asked again after an
+    invalid move with only the time that was left.
+    """
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.deadline = None
+
+    def start(self):
+        """Starts the player's turn, unless it has already started.
+        """
+        if self.deadline is None:
+            self.deadline = time.monotonic() + self.seconds
+
+    def time_left(self) -> float:
+        """Returns the seconds left in the player's turn, which must have started.
+        """
+        return max(0.0, self.deadline - time.monotonic())
+
+    def stop(self):
+        """Ends the player's turn.
+        """
+        self.deadline = None
+
+class PlayerOut:
+    def __init__(self, connection: Connection, deltas: bool = False, shared: SharedFrames = None, \
+        turn_timer: TurnTimer = None):
+        """Instantiate instance of this output object, with a connection object to use. If deltas
+        is True, updates only send what changed since the last update sent to the client. The
+        frames of messages sent to every player are kept in shared, which should be given to the
+        output of every player in the game. If the player's turns have a deadline, it is kept by
+        turn_timer, and the time left is sent with every move prompt.
+        """
+        self.connection = connection
+        self.deltas = deltas
+        self.turn_timer = turn_timer
+        self.encode = ENCODERS[connection.codec]
+        self.shared = shared if shared is not None else SharedFrames()
+        # The last view sent to the client, as a dictionary of its cells by absolute [y, x]
+        # coordinates, its objects and its actors. None if the next update must be sent in full.
+        self.last_view = None
+        self.deltas_since_keyframe = 0
+
+    def write(self, arg):
+        """Write the argument, properly formatted, to this output's connection.
+        """
+        if type(arg) is dict:
+            if "error" in arg and arg["error"] is not None:
+                self._send_error(arg)
+            if arg["type"] == "update":
+                self._send_update(arg)
+            elif arg["type"] == "move-result":
+                self._send_result(arg)
+            elif arg["type"] == "start-level":
+                self.last_view = None
+                self._send_shared(arg, arg)
+            elif arg["type"] == "end-level":
+                self.last_view = None
+                self._send_shared(arg, arg)
+            elif arg["type"] == "end-game":
+                self._send_end(arg)
+            elif arg["type"] == "error":
+                self._send_error(arg)
+        elif arg == "move" and self.turn_timer is not None:
+            self._send_prompt()
+        else:
+            self._send_arg(arg)
+
+    def _send_arg(self, arg):
+        """Sends the serialized argument.
+        """
+        self.connection.send_threadsafe(self.encode(arg))
+
+    def _send_prompt(self):
+        """Asks the player for a move, telling it how many seconds it has left to give one.
+        """
+        self.turn_timer.start()
+        self.connection.send_threadsafe(self.encode({"type": "move", "time-left": round(self.turn_timer.time_left(), 1)}))
+
+    def _send_shared(self, arg, client_msg):
+        """Sends client_msg, the form of the given message that is sent to clients, where the
+        message is one sent to every player, so that it is only encoded once per codec.
+        """
+        self.connection.send_frame_threadsafe(self.shared.frame(arg, self.connection.codec, client_msg))
+
+    def _send_error(self, arg):
+        err = arg["error"]
+        self.connection.send_threadsafe(self.encode({"error": str(err) }))
+
+    def _send_end(self, arg):
+        """Sends the endgame info.
+        """
+        won = arg["won"]
+        client_msg = {"type": "end-game", "scores": arg["scores"], "game-won": won}
+        self._send_shared(arg, client_msg)
+
+    def _send_result(self, arg):
+        """Sends an update notifcation when the player EXITS, IS EJECTED, or LANDS ON THE KEY.
+        Otherwise, will send nothing.
+        """
+        result = arg["result"]
+        if self.turn_timer is not None:
+            self.turn_timer.stop()
+        self.connection.send_threadsafe(self.encode(result.value))
+
+    def _send_update(self, arg):
+        """Sends an update notification. This will show the player's current position as well as
+        the player's surroundings.
+        """
+        layout = transform_layout(arg["layout"])
+        position = [arg["position"].y, arg["position"].x]
+        objects = list(map(lambda x: {"type": "key" if isinstance(x[1], LevelKey) else "exit", "position": \
+                [x[0].y, x[0].x]}, arg["objects"]))
+        actors = list(map(lambda x: {"type": "player" if isinstance(x[1], Character) else "zombie" if \
+                isinstance(x[1], Zombie) else "ghost", "position": [x[0].y, x[0].x]}, arg["actors"]))
+        if self.deltas:
+            self._send_delta(arg["layout"], layout, position, objects, actors)
+            return
+        update_msg = {"type": "player-update", "layout": layout, "position": position, \
+            "objects": objects, "actors": actors, "message": None}
+        self.connection.send_threadsafe(self.encode(update_msg), VIEW_UPDATE)
+
+    def _send_delta(self, grid, layout, position, objects, actors):
+        """Sends the given update as a player-delta holding only what changed since the last view
+        sent to the client. Cells are compared by their absolute coordinates, so the cells that
+        stay in view as the player moves are not sent again. A full player-update is sent instead
+        every KEYFRAME_INTERVAL updates, after a level starts or ends, whenever the layout is
+        not a Viewport around the player, and while an earlier view is still waiting to be sent to
+        a slow client, so that the connection can drop the views it replaces.
+        """
+        cells = None
+        if isinstance(grid, Viewport):
+            cells = {(grid.min_y + row, grid.min_x + col): tile for row, tiles in enumerate(layout) \
+                for col, tile in enumerate(tiles)}
+        if cells is None or self.last_view is None or self.deltas_since_keyframe >= KEYFRAME_INTERVAL or \
+            self.connection.has_queued_view():
+            update_msg = {"type": "player-update", "layout": layout, "position": position, \
+                "objects": objects, "actors": actors, "message": None}
+            kind = VIEW_UPDATE
+            self.deltas_since_keyframe = 0
+        else:
+            last_cells = self.last_view["cells"]
+            changed = [[y, x, tile] for (y, x), tile in cells.items() if last_cells.get((y, x)) != tile]
+            update_msg = {"type": "player-delta", "position": position, "cells": changed, "message": None}
+            if objects != self.last_view["objects"]:
+                update_msg["objects"] = objects
+            if actors != self.last_view["actors"]:
+                update_msg["actors"] = actors
+            kind = VIEW_DELTA
+            self.deltas_since_keyframe += 1
+        self.last_view = {"cells": cells, "objects": objects, "actors": actors} if cells is not None else None
+        self.connection.send_threadsafe(self.encode(update_msg), kind)
+
+class GameAbandoned(BaseException):
+    """Raised to stop a game once every one of its players has disconnected. This is not an
+    Exception, since the Gamemanager retries any move that raises one.
+    """
+
+def make_player_input(connection: Connection, session, turn_timer: TurnTimer = None):
+    """Given a client connection and the session it plays in, return a function that can be called
+    to receive player input. A player whose client has disconnected skips every turn, until every
+    player in the session has disconnected. If the player's turns have a deadline, kept by
+    turn_timer, a player that has not moved by then skips its turn.
+    """
+    def input_func():
+        """This function is the input function for a Player object. Call it to get a message from the player.
+        """
+        msg = connection.receive_threadsafe(turn_timer.time_left() if turn_timer is not None else None)
+        if msg is None:
+            turn_timer.stop()
+            return "skip"
+        if msg != "":
+            return msg
+        if session.is_abandoned():
+            raise GameAbandoned()
+        return "skip"
+    return input_func
+
+class GameSession:
+    """Represents a single game of SNARL played by a group of connected clients. Clients join
+    the session while it is open, and the game is played once the session is started.
+    """
+    def __init__(self, session_id: int, level_jsons: list, max_players: int, observe: bool = False, \
+        deltas: bool = False, turn_timeout: float = None):
+        """Creates an open session.
+
+        Arguments:
+            session_id (int): the id of this session, unique within the server.
+            level_jsons (list): the number of levels in the game followed by the JSON of each
+                level. Every session builds its own levels from these.
+            max_players (int): the most players that may join this session.
+            observe (bool): should an Observer print the game as it is played?
+            deltas (bool): should players be sent player-delta messages rather than full updates?
+            turn_timeout (float): the seconds a player has to move before its turn is skipped, or
+                None to wait forever.
+        """
+        self.session_id = session_id
+        self.level_jsons = level_jsons
+        self.max_players = max_players
+        self.observe = observe
+        self.deltas = deltas
+        self.turn_timeout = turn_timeout
+        self.connections = {}
+        self.started = False
+
+    def is_full(self) -> bool:
+        """Have as many players as possible joined this session?
+        """
+        return len(self.connections) >= self.max_players
+
+    def has_player(self, name: str) -> bool:
+        """Has a player with the given name already joined this session?
+        """
+        return name in self.connections
+
+    def is_abandoned(self) -> bool:
+        """Have all the players in this session disconnected?
+        """
+        return all(connection.closed for connection in self.connections.values())
+
+    def add_player(self, name: str, connection: Connection):
+        """Adds the client with the given connection to this session as the player with the given name.
+        """
+        if self.started or self.is_full():
+            raise RuntimeError("Cannot join a game that is full or has already started.")
+        if self.has_player(name):
+            raise ValueError(f"A player named {name} is already in this game.")
+        self.connections[name] = connection
+
+    async def run(self):
+        """Plays the game in its own thread, then closes the connection of every player.
+        """
+        self.started = True
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        def finish(exception):
+            if done.done():
+                return
+            if exception is not None:
+                done.set_exception(exception)
+            else:
+                done.set_result(None)
+        def play():
+            try:
+                self._play()
+            except GameAbandoned:
+                loop.call_soon_threadsafe(finish, None)
+            except BaseException as e:
+                loop.call_soon_threadsafe(finish, e)
+            else:
+                loop.call_soon_threadsafe(finish, None)
+        threading.Thread(target=play, name=f"snarl-game-{self.session_id}", daemon=True).start()
+        try:
+            await done
+        finally:
+            await asyncio.gather(*[connection.close() for connection in self.connections.values()])
+
+    def _play(self):
+        """Builds a Gamemanager for this session's players and runs it to the end of the game.
+        """
+        num_of_levels = self.level_jsons[0]
+        levels = list(map(create_level_from_json, self.level_jsons[1:]))
+        first_level = levels.pop(0)
+        gm = Gamemanager(self.max_players, num_of_levels = num_of_levels, levels = levels)
+        if self.observe:
+            gm.register_observer(Observer())
+        shared = SharedFrames()
+        for name, connection in self.connections.items():
+            turn_timer = TurnTimer(self.turn_timeout) if self.turn_timeout is not None else None
+            player = Player(name, name, out=PlayerOut(connection, self.deltas, shared, turn_timer), \
+                input_func=make_player_input(connection, self, turn_timer))
+            gm.add_player(player)
+        gm.start_game(first_level)
+        gm.run()
+
+class Lobby:
+    """Greets connecting clients and groups them into GameSessions. A session is started once it
+    is full, or once no player has joined it for a while. Every client is greeted in its own task,
+    so clients slow to give their names never hold up one another.
+    """
+    def __init__(self, make_session, wait: float, max_games: int = None, welcome: dict = None, \
+        handshake_timeout: float = None):
+        """Creates a lobby with no open session.
+
+        Arguments:
+            make_session (function): given a session id, returns a new GameSession.
+            wait (float): the seconds to wait for another player to join an open session before
+                starting it.
+            max_games (int): the number of games to host before closing, or None to keep hosting.
+            welcome (dict): fields added to the welcome message, telling clients about the
+                protocol options used by the server's games.
+            handshake_timeout (float): the seconds a client has to give a name that is not
+                taken, after which it is disconnected, or None to wait forever.
+        """
+        self.make_session = make_session
+        self.wait = wait
+        self.max_games = max_games
+        self.welcome = {"type": "welcome", "info": "No", "codecs": list(ENCODERS)}
+        self.welcome.update(welcome if welcome is not None else {})
+        self.handshake_timeout = handshake_timeout
+        self.open_session = None
+        self.timer = None
+        self.games_started = 0
+        self.running = set()
+        self.done = asyncio.Event()
+
+    def is_accepting(self) -> bool:
+        """Can more clients join games in this lobby?
+        """
+        return self.max_games is None or self.games_started < self.max_games
+
+    async def handle(self, connection: Connection):
+        """Welcomes the client, asks for its name until it picks one that is not taken in the
+        open session and is at most MAX_NAME_LENGTH characters long, and adds it to that session.
+        The client is disconnected if it has not done so within the handshake timeout.
+        """
+        if not self.is_accepting():
+            await connection.close()
+            return
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.handshake_timeout if self.handshake_timeout is not None else None
+        connection.send(json.dumps(self.welcome))
+        while True:
+            connection.send("\"name\"")
+            try:
+                name = await self._receive_by(connection, deadline)
+                # The client may ask for a codec before giving its name.
+                codec = parse_codec_request(name)
+                if codec is not None:
+                    connection.codec = codec
+                    name = await self._receive_by(connection, deadline)
+            except asyncio.TimeoutError:
+                print(f"{connection.address[0]}:{connection.address[1]} did not give a name in time.")
+                await connection.close()
+                return
+            if connection.closed or not self.is_accepting():
+                await connection.close()
+                return
+            if len(name) > MAX_NAME_LENGTH:
+                continue
+            session = self._get_open_session()
+            if not session.has_player(name):
+                break
+        session.add_player(name, connection)
+        if session.is_full():
+            self._start_open_session()
+        else:
+            self._restart_timer()
+
+    async def _receive_by(self, connection: Connection, deadline: float) -> str:
+        """Receives a message from the client, raising asyncio.TimeoutError if none has arrived by
+        the given event loop time. A deadline of None never passes.
+        """
+        if deadline is None:
+            return await connection.receive()
+        return await asyncio.wait_for(connection.receive(), max(0, deadline - asyncio.get_running_loop().time()))
+
+    async def wait_closed(self):
+        """Waits until this lobby has hosted its last game, which never happens if it has no
+        maximum number of games.
+        """
+        await self.done.wait()
+
+    def _get_open_session(self) -> GameSession:
+        """Returns the session that new players join, opening one if there is none.
+        """
+        if self.open_session is None:
+            self.open_session = self.make_session(self.games_started)
+        return self.open_session
+
+    def _restart_timer(self):
+        """Starts the open session after the wait time, unless another player joins it first.
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = asyncio.get_running_loop().call_later(self.wait, self._start_open_session)
+
+    def _start_open_session(self):
+        """Starts the open session in its own task.
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        session = self.open_session
+        self.open_session = None
+        if session is None or session.connections == {}:
+            return
+        self.games_started += 1
+        task = asyncio.get_running_loop().create_task(session.run())
+        self.running.add(task)
+        task.add_done_callback(self._game_finished)
+
+    def _game_finished(self, task):
+        """Forgets a finished game, and marks the lobby as done once its last game is over.
+        """
+        self.running.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"A game ended with an error: {task.exception()!r}")
+        if not self.is_accepting() and not self.running:
+            self.done.set()
@@ -3,20 +3,28 @@ import socket
 import argparse
 import json
 import time
-from netutils import send, receive
+from netutils import send, receive_payload
+from codec import decode
+from clientview import ClientView
 from Snarl.src.Game.utils import grid_to_string
 
 parser = argparse.ArgumentParser(description = "socket connection info")
 parser.add_argument("--address", type = str, nargs = 1)
 parser.add_argument("--port", type = int, nargs = 1)
+parser.add_argument("--codec", type = str, nargs = 1, choices = ["json", "binary"])
 args = parser.parse_args()
 
 args.address = args.address[0] if not args.address == None else "127.0.0.1"
 args.port = args.port[0] if not args.port == None else 45678
+# The binary codec is asked for by default, and only used if the server offers it.
+args.codec = args.codec[0] if not args.codec == None else "binary"
 
 sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
 sock.connect((args.address, args.port))
 
+# The last view of the dungeon received from the server, which player-delta messages change.
+view = ClientView()
+
 def process_move():
     """ Verify that a user-entered move has valid syntax before sending it to the server.
     """
@@ -118,8 +126,7 @@ def print_layout(layout, objects, actors, position):
         dx = position[1] - 2
         new_y = absolute_posn[0] - dy
         new_x = absolute_posn[1] - dx
-        o["position"] = [new_y, new_x]
-        return o
+        return {"type": o["type"], "position": [new_y, new_x]}
     object_posns = list(map(transform_coords, objects))
     actor_posns = list(map(transform_coords, actors))
     printed_layout = []
@@ -179,9 +186,38 @@ def player_update(msg):
     objects = msg["objects"]
     actors = msg["actors"]
     layout = msg["layout"]
+    view.remember(layout, position, objects, actors)
     print(f'You are now at [{position[0]}, {position[1]}]')
     print_layout(layout, objects, actors, position)
 
+def player_delta(msg):
+    """ Update the player on what the dungeon looks like, given only what changed since the last
+    view the server sent. Expects a message of the form:
+    { "type": "player-delta",
+    "position": (point),
+    "cells": [ [ y, x, (tile) ], ... ],
+    "objects": (object-list),
+    "actors": (actor-position-list),
+    "message": (maybe-string)
+    }
+    where cells holds the absolute coordinates of the cells in view that changed, and objects and
+    actors are only given if they changed.
+    """
+    player_update(view.apply_delta(msg))
+
+def move_prompt(msg):
+    """ Ask the player for a move. Expects a message of the form:
+    { "type": "move",
+    "time-left": (number)
+    }
+    where time-left is the seconds the player has left before its turn is skipped, and is only
+    given by servers that limit the length of turns.
+    """
+    print("Please provide a move in the form [y, x], or enter \"skip\" if you wish to skip your move.")
+    if "time-left" in msg:
+        print(f'You have {msg["time-left"]} seconds left to move.')
+    process_move()
+
 def handle_string(msg):
     """ Deal with server messages that are only a single string, rather than dicts.
     """
@@ -189,8 +225,7 @@ def handle_string(msg):
         print("What is your name?")
         send(sock, input())
     elif msg == "move":
-        print("Please provide a move in the form [y, x], or enter \"skip\" if you wish to skip your move.")
-        process_move()
+        move_prompt({"type": "move"})
     elif msg == "OK":
         print("Your move was successful.")
     elif msg == "Key":
@@ -205,19 +240,28 @@ def handle_string(msg):
         print("Malformed server message:")
         print(msg)
 
-def handle_server_message(msg):
+def welcome(msg):
+    """ Greet the player, and ask the server for the codec given on the command line if the
+    server offers it. Servers that do not list their codecs only offer JSON.
+    """
+    print("Welcome To SNARL")
+    if args.codec != "json" and args.codec in msg.get("codecs", ["json"]):
+        send(sock, json.dumps({"type": "codec", "codec": args.codec}))
+
+def handle_server_message(payload):
     try:
-        msg = json.loads(msg)
+        msg = decode(payload)
         is_json = True
         if isinstance(msg, str):
             is_json = False
-    except:
+    except Exception:
+        # A frame that cannot be decoded is reported as a malformed message.
+        msg = payload.decode('utf-8', 'replace')
         is_json = False
     if not is_json:
         handle_string(msg)
     elif msg["type"] == "welcome":
-        # Do nothing cause we don't need any server information right now. This could change.
-        print("Welcome To SNARL")
+        welcome(msg)
     elif msg["type"] == "start-level":
         start_level(msg)
     elif msg["type"] == "end-level":
@@ -227,12 +271,18 @@ def handle_server_message(msg):
         exit(0)
     elif msg["type"] == "player-update":
         player_update(msg)
+    elif msg["type"] == "player-delta":
+        player_delta(msg)
+    elif msg["type"] == "move":
+        move_prompt(msg)
     else:
         print("Malformed server message:")
         print(msg)
 
 # main loop for client functionality
 while True:
-    msg = receive(sock)
-    if msg != "":
-        handle_server_message(msg)
\ No newline at end of file
+    payload = receive_payload(sock)
+    if payload == b"":
+        # The server closed the connection.
+        break
+    handle_server_message(payload)
\ No newline at end of file
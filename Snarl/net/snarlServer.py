@@ -1,200 +1,91 @@
-import sys
-import socket
+import asyncio
 import argparse
-import json
-import time
-from netutils import send, receive
-from Snarl.src.Game.gamemanager import Gamemanager
-from Snarl.tests.parseJson import create_level_from_json
-from Snarl.src.Game.utils import grid_to_string
-from Snarl.src.Game.moveresult import Moveresult
-from Snarl.src.Game.player_impl import Player
-from Snarl.src.Game.observer_impl import Observer
-from Snarl.src.Game.enemy_zombie import EnemyZombie
-from Snarl.src.Game.occupants import LevelExit, LevelKey, Character, Zombie, Door
+from session import Connection, GameSession, Lobby, SEND_LIMIT
+from supervisor import Supervisor
+from Snarl.tests.parseJson import load_level_jsons
 
-parser = argparse.ArgumentParser(description = "socket connection info")
-parser.add_argument("--levels", type = str, nargs = 1)
-parser.add_argument("--clients", type = int, nargs = 1)
-parser.add_argument("--wait", type = int, nargs = 1)
-parser.add_argument("--observe", nargs = "?", const = True)
-parser.add_argument("--address", type = str, nargs = 1)
-parser.add_argument("--port", type = int, nargs = 1)
-args = parser.parse_args()
-
-args.levels = args.levels[0] if not args.levels == None else "snarl.levels"
-if args.clients == None or args.clients[0] == None:
-    args.clients = 4
-elif args.clients[0] < 1 or args.clients[0] > 4:
-    raise ValueError("There must be between 1 and 4 players in a game.")
-else:
-    args.clients = args.clients[0]
-args.wait = args.wait[0] if not args.wait == None else 60
-args.address = args.address[0] if not args.address == None else "127.0.0.1"
-args.port = args.port[0] if not args.port == None else 45678
-
-players = {}
-player_connections = []
-sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-sock.bind((args.address, args.port))
-sock.listen()
-
-# Allow players to connect up to a max timeout
-sock.settimeout(args.wait)
-try:
-    for i in range(args.clients):
-        conn, address = sock.accept()
-        print(f"Connected to {address[0]}:{address[1]}")
-        player_connections.append(conn)
-except socket.timeout:
-    print("No Additional Players")
-
-# Close the listening socket when player connections are established.
-sock.close()
-
-f = open(args.levels)
-levels_string = f.read()
-levels_len = len(levels_string)
-level_jsons = []
-decoder = json.JSONDecoder()
-error_index = 0
-while error_index < levels_len and len(levels_string) > 0:
-    try: 
-        leveljson_obj, error_index = decoder.raw_decode(levels_string)
-        level_jsons.append(leveljson_obj)
-        levels_string = levels_string[error_index:]
-    except(json.decoder.JSONDecodeError):
-        levels_string = levels_string[1:]
-
-# instantiate a gamemanager
-num_of_levels = level_jsons.pop(0)
-levels = list(map(create_level_from_json, level_jsons))
-first_level = levels.pop(0)
-gm = Gamemanager(args.clients, num_of_levels = num_of_levels, levels = levels)
-
-# Add an Observer if specified.
-if args.observe:
-    gm.register_observer(Observer())
-
-def tile_to_num(tile):
-    """Transforms the given tile into a number 0, 1, 2, as specified by assignment.
+def parse_args():
+    """Parses and checks the server's command line arguments.
     """
-    if tile.has_block():
-        return 0
-    elif tile.has_occupant(Door):
-        return 2
+    parser = argparse.ArgumentParser(description = "socket connection info")
+    parser.add_argument("--levels", type = str, nargs = 1)
+    parser.add_argument("--clients", type = int, nargs = 1)
+    parser.add_argument("--wait", type = int, nargs = 1)
+    parser.add_argument("--observe", nargs = "?", const = True)
+    parser.add_argument("--address", type = str, nargs = 1)
+    parser.add_argument("--port", type = int, nargs = 1)
+    parser.add_argument("--games", type = int, nargs = 1)
+    parser.add_argument("--workers", type = int, nargs = 1)
+    parser.add_argument("--deltas", nargs = "?", const = True)
+    parser.add_argument("--send-limit", type = int, nargs = 1)
+    parser.add_argument("--handshake-timeout", type = int, nargs = 1)
+    parser.add_argument("--turn-timeout", type = float, nargs = 1)
+    args = parser.parse_args()
+
+    args.levels = args.levels[0] if not args.levels == None else "snarl.levels"
+    if args.clients == None or args.clients[0] == None:
+        args.clients = 4
+    elif args.clients[0] < 1 or args.clients[0] > 4:
+        raise ValueError("There must be between 1 and 4 players in a game.")
     else:
-        return 1
-
-def transform_layout(tile_grid):
-    """Given a tile grid and a center position, transform the grid into a 5x5 grid of 0,1,2
-    as per the assignment spec.
+        args.clients = args.clients[0]
+    args.wait = args.wait[0] if not args.wait == None else 60
+    args.address = args.address[0] if not args.address == None else "127.0.0.1"
+    args.port = args.port[0] if not args.port == None else 45678
+    # By default a single game is hosted. A value of 0 hosts games until the server is stopped.
+    args.games = args.games[0] if not args.games == None else 1
+    if args.games < 0:
+        raise ValueError("The number of games cannot be negative.")
+    # By default games are played by the server process itself. Otherwise they are spread across
+    # this many worker processes.
+    args.workers = args.workers[0] if not args.workers == None else 0
+    if args.workers < 0:
+        raise ValueError("The number of workers cannot be negative.")
+    # A client with more than this many bytes waiting to be sent to it is disconnected.
+    args.send_limit = args.send_limit[0] if not args.send_limit == None else SEND_LIMIT
+    if args.send_limit < 1:
+        raise ValueError("The send limit must be positive.")
+    # A client that has not given a name after this many seconds is disconnected.
+    args.handshake_timeout = args.handshake_timeout[0] if not args.handshake_timeout == None else 60
+    if args.handshake_timeout < 1:
+        raise ValueError("The handshake timeout must be positive.")
+    # By default players may take as long as they like to move. Otherwise a player that has not
+    # moved after this many seconds skips its turn.
+    args.turn_timeout = args.turn_timeout[0] if not args.turn_timeout == None else None
+    if args.turn_timeout is not None and args.turn_timeout <= 0:
+        raise ValueError("The turn timeout must be positive.")
+    return args
+
+async def serve(args, level_jsons):
+    """Accepts clients and hosts their games until the lobby has hosted its last game.
     """
-    number_layout = []
-    # How many rows/cols of padding do we need on each side?
-    for row in tile_grid:
-        number_row = []
-        for tile in row:
-            number_row.append(tile_to_num(tile))
-        number_layout.append(number_row)
-    return number_layout
-
-class PlayerOut:
-    def __init__(self, output):
-        """Instantiate instance of this output object, with a connection object to use.
-        """
-        self.output = output
-    
-    def write(self, arg):
-        """Write the argument, properly formatted, via print if self.output is True;
-        otherwise do nothing.
-        """
-        if type(arg) is dict:
-            if "error" in arg and arg["error"] is not None:
-                self._send_error(arg)
-            if arg["type"] == "update":
-                self._send_update(arg)
-            elif arg["type"] == "move-result":
-                self._send_result(arg)
-            elif arg["type"] == "start-level":
-                self._send_arg(arg)
-            elif arg["type"] == "end-level":
-                self._send_arg(arg)
-            elif arg["type"] == "end-game":
-                self._send_end(arg)
-            elif arg["type"] == "error":
-                self._send_error(arg)
-        else:
-            self._send_arg(arg)
-        
-    def _send_arg(self, arg):
-        """Sends the serialized argument.
-        """
-        send(self.output, json.dumps(arg))
-
-    def _send_error(self, arg):
-        err = arg["error"]
-        send(self.output, json.dumps({"error": str(err) }))
-
-    def _send_end(self, arg):
-        """Prints endgame info to console.
-        """
-        won = arg["won"]
-        client_msg = {"type": "end-game", "scores": arg["scores"], "game-won": won}
-        send(self.output, json.dumps(client_msg))
-        
-    def _send_result(self, arg):
-        """Sends an update notifcation when the player EXITS, IS EJECTED, or LANDS ON THE KEY.
-        Otherwise, will send nothing.
-        """
-        result = arg["result"]
-        send(self.output, json.dumps(result.value))
-
-    def _send_update(self, arg):
-        """Prints an update notification. This will show the player's current position as well as
-        the player's surroundings.
-        """
-        layout = transform_layout(arg["layout"])
-        position = [arg["position"].y, arg["position"].x]
-        objects = list(map(lambda x: {"type": "key" if isinstance(x[1], LevelKey) else "exit", "position": \
-                [x[0].y, x[0].x]}, arg["objects"]))
-        actors = list(map(lambda x: {"type": "player" if isinstance(x[1], Character) else "zombie" if \
-                isinstance(x[1], Zombie) else "ghost", "position": [x[0].y, x[0].x]}, arg["actors"]))
-        update_msg = {"type": "player-update", "layout": layout, "position": position, \
-            "objects": objects, "actors": actors, "message": None}
-        send(self.output, json.dumps(update_msg))
-
-# Send welcome message
-for client in player_connections:
-    msg = {"type": "welcome", "info": "No"}
-    send(client, json.dumps(msg))
-
-def make_player_input(client):
-    """Given a client socket connection, return a function that can be called to receive player input.
-    This used to just be a lambda but it caused an issue with multiple clients for some reason.
-    """
-    def input_func():
-        """This function is the input function for a Player object. Call it to get a message from the player.
-        """
-        return receive(client)
-    return input_func
-
-# Register players with game manager
-for client in player_connections:
-    name_valid = False
-    while not name_valid:
-        send(client, "\"name\"")
-        name = receive(client)
-        if not name in set(players.keys()):
-            name_valid = True
-            player_input = make_player_input(client)
-            player = Player(name, name, out=PlayerOut(client), input_func=player_input)
-            gm.add_player(player)
-            
-# Start and run the game
-gm.start_game(first_level)
-gm.run()
-
-# Close the client sockets
-for client in player_connections:
-    client.close()
\ No newline at end of file
+    session_options = {"observe": bool(args.observe), "deltas": bool(args.deltas), \
+        "turn_timeout": args.turn_timeout}
+    if args.workers > 0:
+        supervisor = Supervisor(args.workers, level_jsons, args.clients, **session_options)
+        make_session = supervisor.make_session
+    else:
+        supervisor = None
+        def make_session(session_id):
+            """Creates a new game session, which builds its own levels from the level JSON.
+            """
+            return GameSession(session_id, level_jsons, args.clients, **session_options)
+    # Clients are told whether they will be sent player-delta messages.
+    welcome = {"updates": "delta"} if args.deltas else {}
+    lobby = Lobby(make_session, args.wait, args.games if args.games > 0 else None, welcome, \
+        args.handshake_timeout)
+
+    async def handle_client(reader, writer):
+        connection = Connection(reader, writer, args.send_limit)
+        print(f"Connected to {connection.address[0]}:{connection.address[1]}")
+        await lobby.handle(connection)
+
+    server = await asyncio.start_server(handle_client, args.address, args.port)
+    async with server:
+        await lobby.wait_closed()
+    if supervisor is not None:
+        supervisor.close()
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(serve(args, load_level_jsons(args.levels)))
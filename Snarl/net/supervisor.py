@@ -0,0 +1,263 @@
+"""This file holds the supervisor that lets the SNARL server spread its games across several worker
+processes, so that games are not all played by a single Python interpreter.
+
+The supervisor greets clients and groups them into sessions with a Lobby, as the server does when
+it plays every game itself. Each session is owned by one worker process. The socket of every
+client that joins the session is handed over to that worker, which plays the game with a
+GameSession of its own. A worker that stops unexpectedly is replaced by a new one, and only the
+games it was playing are lost.
+
+The supervisor talks to each worker over a Unix socket pair of type SOCK_SEQPACKET, so every
+message arrives whole. Each message is a JSON object, and a client's socket is passed along with
+the message that names its player.
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+from session import Connection, GameSession
+
+# The most bytes in a message between the supervisor and a worker.
+CONTROL_SIZE = 4096
+
+def send_control(control: socket.socket, msg: dict, fds: list = None):
+    """Send the given message, and any given file descriptors, over a control socket.
+    """
+    socket.send_fds(control, [json.dumps(msg).encode()], fds if fds is not None else [])
+
+def receive_control(control: socket.socket):
+    """Receive a message over a control socket. Returns the message, or None if the other end has
+    been closed, along with the file descriptors that came with it. Raises a ValueError if the
+    message was cut short or cannot be decoded, after closing any file descriptors that came with it.
+    """
+    data, fds, flags, _ = socket.recv_fds(control, CONTROL_SIZE, 1)
+    try:
+        if flags & (socket.MSG_TRUNC | socket.MSG_CTRUNC):
+            raise ValueError(f"A control message was longer than {CONTROL_SIZE} bytes.")
+        return (json.loads(data) if data else None), fds
+    except ValueError:
+        for fd in fds:
+            os.close(fd)
+        raise
+
+def run_worker(control: socket.socket, level_jsons: list, max_players: int, session_options: dict):
+    """The entry point of a worker process. Plays the games handed over by the supervisor until
+    the supervisor closes its end of the control socket, and then until those games are over.
+    """
+    asyncio.run(_serve_worker(control, level_jsons, max_players, session_options))
+
+async def _serve_worker(control: socket.socket, level_jsons: list, max_players: int, session_options: dict):
+    """Plays the games handed over by the supervisor over the given control socket.
+    """
+    loop = asyncio.get_running_loop()
+    messages = asyncio.Queue()
+    sessions = {}
+    games = set()
+
+    def on_readable():
+        try:
+            messages.put_nowait(receive_control(control))
+        except BlockingIOError:
+            pass
+        except ValueError as e:
+            print(f"Skipped a message from the supervisor: {e}")
+
+    def on_finished(session_id, task):
+        games.discard(task)
+        error = None
+        if not task.cancelled() and task.exception() is not None:
+            error = repr(task.exception())
+        try:
+            send_control(control, {"type": "finished", "session": session_id, "error": error})
+        except OSError:
+            pass
+
+    control.setblocking(False)
+    loop.add_reader(control.fileno(), on_readable)
+    while True:
+        msg, fds = await messages.get()
+        if msg is None:
+            break
+        session_id = msg["session"]
+        if msg["type"] == "join":
+            if len(fds) != 1:
+                # The client's socket did not come with the message, so there is no player to add.
+                for fd in fds:
+                    os.close(fd)
+                print(f"Skipped a join message for game {session_id} that came with {len(fds)} sockets.")
+                continue
+            session = sessions.get(session_id)
+            if session is None:
+                session = sessions[session_id] = GameSession(session_id, level_jsons, max_players, **session_options)
+            reader, writer = await asyncio.open_connection(sock=socket.socket(fileno=fds[0]))
+            connection = Connection(reader, writer, msg["send_limit"])
+            connection.codec = msg["codec"]
+            session.add_player(msg["name"], connection)
+        elif msg["type"] == "start":
+            session = sessions.pop(session_id, None)
+            if session is None:
+                # The players of the session were never handed over, so there is no game to play.
+                send_control(control, {"type": "finished", "session": session_id, \
+                    "error": f"No players of game {session_id} reached its worker."})
+                continue
+            task = loop.create_task(session.run())
+            games.add(task)
+            task.add_done_callback(lambda task, session_id=session_id: on_finished(session_id, task))
+    loop.remove_reader(control.fileno())
+    await asyncio.gather(*games, return_exceptions=True)
+
+class Worker:
+    """Represents a worker process, as seen by the supervisor.
+    """
+    def __init__(self, context, level_jsons: list, max_players: int, session_options: dict, on_stopped):
+        """Starts a worker process.
+
+        Arguments:
+            context: the multiprocessing context to start the process with.
+            level_jsons (list): the number of levels in a game followed by the JSON of each level.
+            max_players (int): the most players in a game.
+            session_options (dict): the keyword arguments given to every GameSession.
+            on_stopped (function): called with this worker if its process stops unexpectedly.
+        """
+        self.control, worker_control = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self.process = context.Process(target=run_worker, daemon=True, \
+            args=(worker_control, level_jsons, max_players, session_options))
+        self.process.start()
+        worker_control.close()
+        self.on_stopped = on_stopped
+        self.alive = True
+        # Sessions owned by this worker that have joined players, and the futures of those being played.
+        self.sessions = set()
+        self.games = {}
+        self.loop = asyncio.get_running_loop()
+        self.control.setblocking(False)
+        self.loop.add_reader(self.control.fileno(), self._on_readable)
+
+    def join(self, session_id: int, name: str, connection: Connection):
+        """Hands the given client over to this worker, to play in the given session.
+        """
+        if not self.alive:
+            raise RuntimeError("Cannot hand a player over to a worker that has stopped.")
+        sock = connection.detach()
+        msg = {"type": "join", "session": session_id, "name": name, "codec": connection.codec, \
+            "send_limit": connection.send_limit}
+        try:
+            send_control(self.control, msg, [sock.fileno()])
+        finally:
+            sock.close()
+        self.sessions.add(session_id)
+
+    async def play(self, session_id: int):
+        """Has this worker play the game of the given session, and waits until it is over.
+        """
+        if not self.alive:
+            raise RuntimeError(f"The worker playing game {session_id} has stopped.")
+        finished = self.games[session_id] = self.loop.create_future()
+        send_control(self.control, {"type": "start", "session": session_id})
+        try:
+            await finished
+        finally:
+            self.sessions.discard(session_id)
+            self.games.pop(session_id, None)
+
+    def close(self):
+        """Tells this worker to exit once its games are over.
+        """
+        if self.alive:
+            self.alive = False
+            self.loop.remove_reader(self.control.fileno())
+            self.control.close()
+
+    def _on_readable(self):
+        """Handles a message from the worker, or its stopping.
+        """
+        try:
+            msg, _ = receive_control(self.control)
+        except BlockingIOError:
+            return
+        except ValueError as e:
+            print(f"Skipped a message from a worker: {e}")
+            return
+        except OSError:
+            msg = None
+        if msg is None:
+            self.close()
+            for session_id, finished in self.games.items():
+                if not finished.done():
+                    finished.set_exception(RuntimeError(f"The worker playing game {session_id} has stopped."))
+            self.on_stopped(self)
+            return
+        finished = self.games.get(msg["session"])
+        if finished is not None and not finished.done():
+            if msg["error"] is not None:
+                finished.set_exception(RuntimeError(msg["error"]))
+            else:
+                finished.set_result(None)
+
+class RemoteSession(GameSession):
+    """Represents a GameSession whose game is played by a worker process. The players that join it
+    are handed over to the worker right away.
+    """
+    def __init__(self, session_id: int, supervisor, max_players: int):
+        super().__init__(session_id, None, max_players)
+        self.supervisor = supervisor
+        self.worker = None
+
+    def add_player(self, name: str, connection: Connection):
+        """Adds the client with the given connection to this session, handing it over to the
+        session's worker. If that worker has stopped, the players that had joined were lost with
+        it, so the session starts over with a new worker.
+        """
+        if self.worker is None or not self.worker.alive:
+            self.worker = self.supervisor.choose_worker()
+            self.connections = {}
+        super().add_player(name, connection)
+        self.worker.join(self.session_id, name, connection)
+
+    async def run(self):
+        """Has the session's worker play the game, and waits until it is over.
+        """
+        self.started = True
+        await self.worker.play(self.session_id)
+
+class Supervisor:
+    """Keeps a pool of worker processes that play the games hosted by the server.
+    """
+    def __init__(self, num_of_workers: int, level_jsons: list, max_players: int, **session_options):
+        """Starts the given number of worker processes. Must be called from the event loop. Any
+        keyword arguments, such as observe, are given to every GameSession played by the workers.
+        """
+        if num_of_workers < 1:
+            raise ValueError("There must be at least one worker.")
+        # Workers are spawned rather than forked, so they do not keep copies of client sockets.
+        self.context = multiprocessing.get_context("spawn")
+        self.level_jsons = level_jsons
+        self.max_players = max_players
+        self.session_options = session_options
+        self.workers = [self._start_worker() for _ in range(num_of_workers)]
+
+    def make_session(self, session_id: int) -> RemoteSession:
+        """Creates a new game session, to be played by one of the workers.
+        """
+        return RemoteSession(session_id, self, self.max_players)
+
+    def choose_worker(self) -> Worker:
+        """Returns the worker with the fewest sessions.
+        """
+        return min(self.workers, key=lambda worker: len(worker.sessions))
+
+    def close(self):
+        """Tells every worker to exit once its games are over.
+        """
+        for worker in self.workers:
+            worker.close()
+
+    def _start_worker(self) -> Worker:
+        return Worker(self.context, self.level_jsons, self.max_players, self.session_options, self._worker_stopped)
+
+    def _worker_stopped(self, worker: Worker):
+        """Replaces a worker whose process stopped unexpectedly.
+        """
+        print(f"Worker {worker.process.pid} stopped, starting a new one.")
+        self.workers[self.workers.index(worker)] = self._start_worker()
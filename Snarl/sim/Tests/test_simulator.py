@@ -0,0 +1,35 @@
+import os
+import unittest
+from Snarl.sim.simulator import play_game, simulate, Stats
+from Snarl.tests.parseJson import load_level_jsons
+
+LEVEL_JSONS = load_level_jsons(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname( \
+    os.path.abspath(__file__)))), "net", "snarl.levels"))
+
+class TestSimulator(unittest.TestCase):
+    def test_same_seed_gives_same_stats(self):
+        first = simulate(LEVEL_JSONS, ["seeker", "random"], 6, seed = 11, max_turns = 300, processes = 2)
+        second = simulate(LEVEL_JSONS, ["seeker", "random"], 6, seed = 11, max_turns = 300, processes = 2)
+        self.assertEqual(first.games, 6)
+        self.assertEqual(first.summary(), second.summary())
+        self.assertEqual(sorted(first.turns), sorted(second.turns))
+
+    def test_games_played_in_batches_match_games_played_alone(self):
+        stats = Stats()
+        for seed in range(11, 17):
+            stats.add(play_game(LEVEL_JSONS, ["seeker", "random"], seed, 300))
+        simulated = simulate(LEVEL_JSONS, ["seeker", "random"], 6, seed = 11, max_turns = 300, processes = 2)
+        self.assertEqual(stats.summary(), simulated.summary())
+
+    def test_game_is_stopped_at_max_turns(self):
+        result = play_game(LEVEL_JSONS, ["random"] * 4, 3, 5)
+        self.assertFalse(result["finished"])
+        self.assertEqual(result["turns"], 5)
+
+    def test_finished_game_is_played_to_its_end(self):
+        result = play_game(LEVEL_JSONS, ["seeker"], 0, 10000)
+        self.assertTrue(result["finished"])
+        self.assertLess(result["turns"], 10000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,241 @@
+"""This file holds the headless simulator, which plays games of SNARL with scripted players and
+gathers statistics about how those games went, for balancing levels.
+
+Every game is played by a Gamemanager, as any other game is, but the input and output of each
+player is a script rather than a person or a client. Games are split into batches that are played
+by a pool of worker processes, and each batch sends back only the Stats of its games.
+"""
+import json
+import random
+import statistics
+from collections import Counter
+from multiprocessing import Pool
+from Snarl.src.Game.gamemanager import Gamemanager
+from Snarl.src.Game.player_impl import Player
+from Snarl.src.Game.occupants import LevelKey, LevelExit
+from Snarl.src.Game.moveresult import Moveresult
+from Snarl.tests.parseJson import create_level_from_json
+
+# The number of games played by a worker process at a time.
+BATCH_SIZE = 50
+# The (x, y) offsets of the cells a player can reach in a move, which are at most 2 cardinal moves away.
+REACH = [(dx, dy) for dx in range(-2, 3) for dy in range(-2, 3) if abs(dx) + abs(dy) <= 2]
+
+class RandomWalk:
+    """Plays a player by moving to a random open tile in reach, or staying put. A script is both
+    the output of its player and, through move, its input. It keeps the level the player is on
+    and the number of times the player was ejected from each level.
+    """
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.position = None
+        self.layout = None
+        self.objects = []
+        self.level = 1
+        self.ejects = Counter()
+        self.won = None
+        # Has the player been asked for a move that has not been accepted yet?
+        self.asked = False
+
+    def write(self, arg):
+        """Takes in a notification sent to the player.
+        """
+        if type(arg) is not dict:
+            return
+        if arg["type"] == "update":
+            self.position = arg["position"]
+            self.layout = arg["layout"]
+            self.objects = arg["objects"]
+        elif arg["type"] == "move-result":
+            self.asked = False
+            if arg["result"] == Moveresult.EJECT:
+                self.ejects[self.level] += 1
+            self._on_result(arg["result"])
+        elif arg["type"] == "start-level":
+            self.level = arg["level"]
+            self._on_level_start()
+        elif arg["type"] == "end-game":
+            self.won = arg["won"]
+
+    def move(self) -> str:
+        """Returns the player's next move, as a player would type it. A player whose last move was
+        invalid skips its turn instead of trying again.
+        """
+        if self.asked or self.position is None:
+            return "skip"
+        self.asked = True
+        dest = self._choose(self._reachable_tiles())
+        return json.dumps([dest.y, dest.x])
+
+    def _reachable_tiles(self) -> list:
+        """Returns the tiles in view that the player could move to, which are those in reach that
+        are not blocked, including the player's own. The layout the player was last sent is
+        centered on the player, and only its cells in reach are read.
+        """
+        center = len(self.layout) // 2
+        tiles = []
+        for dx, dy in REACH:
+            row, col = center + dy, center + dx
+            if 0 <= row < len(self.layout) and 0 <= col < len(self.layout):
+                tile = self.layout[row][col]
+                if not tile.has_block():
+                    tiles.append(tile)
+        return tiles
+
+    def _choose(self, tiles: list):
+        """Chooses the tile to move to from the given ones.
+        """
+        return self.rng.choice(tiles)
+
+    def _on_result(self, result: Moveresult):
+        pass
+
+    def _on_level_start(self):
+        pass
+
+class KeySeeker(RandomWalk):
+    """Plays a player by heading for the key of the level once it has been seen, and then for the
+    exit, wandering at random until then and now and again on the way, so as not to get stuck
+    against a wall.
+    """
+    # The chance of a random move while heading for the key or the exit.
+    WANDER = 0.25
+
+    def __init__(self, rng: random.Random):
+        super().__init__(rng)
+        self.key = None
+        self.exit = None
+        self.has_key = False
+
+    def _choose(self, tiles: list):
+        for tile, obj in self.objects:
+            if isinstance(obj, LevelKey):
+                self.key = tile
+            elif isinstance(obj, LevelExit):
+                self.exit = tile
+        if self.key is not None and self.position.coordinates_equal(self.key):
+            # The key was picked up by another player.
+            self.key = None
+            self.has_key = True
+        target = self.exit if self.has_key else self.key
+        if target is None or self.rng.random() < self.WANDER:
+            return self.rng.choice(tiles)
+        distance = min(abs(tile.x - target.x) + abs(tile.y - target.y) for tile in tiles)
+        return self.rng.choice([tile for tile in tiles if abs(tile.x - target.x) + abs(tile.y - target.y) == distance])
+
+    def _on_result(self, result: Moveresult):
+        if result == Moveresult.KEY:
+            self.key = None
+            self.has_key = True
+
+    def _on_level_start(self):
+        self.key = None
+        self.exit = None
+        self.has_key = False
+
+# The scripts that players may be played by.
+STRATEGIES = {"random": RandomWalk, "seeker": KeySeeker}
+
+def play_game(level_jsons: list, strategies: list, seed: int, max_turns: int) -> dict:
+    """Plays a game with a player for each of the given strategies, which are keys of STRATEGIES.
+
+    Arguments:
+        level_jsons (list): the number of levels in the game followed by the JSON of each level.
+        strategies (list): the strategy of each player.
+        seed (int): the seed of every random choice made in the game.
+        max_turns (int): the most turns played before the game is stopped.
+
+    Returns a dictionary of whether the game finished, whether the players won, the number of
+    turns played, the level the game ended on, and the number of ejections from each level.
+    """
+    levels = list(map(create_level_from_json, level_jsons[1:]))
+    first_level = levels.pop(0)
+    gm = Gamemanager(len(strategies), num_of_levels = level_jsons[0], levels = levels, seed = seed)
+    scripts = []
+    for i, strategy in enumerate(strategies):
+        # The players' choices are made with the game's own random number generator as well.
+        script = STRATEGIES[strategy](gm.rng)
+        name = f"player{i + 1}"
+        gm.add_player(Player(name, name, out = script, input_func = script.move))
+        scripts.append(script)
+    gm.start_game(first_level)
+    finished = gm.run(max_turns)
+    ejects = Counter()
+    for script in scripts:
+        ejects.update(script.ejects)
+    return {"finished": finished, "won": bool(scripts[0].won), "turns": gm.turns, \
+        "level": max(script.level for script in scripts), "ejects": dict(ejects)}
+
+class Stats:
+    """Sums up the results of many games. Stats kept for separate batches of games can be merged.
+    """
+    def __init__(self):
+        self.games = 0
+        self.finished = 0
+        self.won = 0
+        self.turns = []
+        self.ended_on = Counter()
+        self.ejects = Counter()
+
+    def add(self, result: dict):
+        """Adds the result of a game, as returned by play_game.
+        """
+        self.games += 1
+        self.finished += result["finished"]
+        self.won += result["won"]
+        self.turns.append(result["turns"])
+        self.ended_on[result["level"]] += 1
+        self.ejects.update(result["ejects"])
+
+    def merge(self, other):
+        """Adds the games summed up by another Stats to this one.
+        """
+        self.games += other.games
+        self.finished += other.finished
+        self.won += other.won
+        self.turns.extend(other.turns)
+        self.ended_on.update(other.ended_on)
+        self.ejects.update(other.ejects)
+
+    def summary(self) -> dict:
+        """Returns a summary of the games, with the win rate, the turn counts, and for each level
+        the games that ended on it and the ejections from it per game.
+        """
+        games = max(self.games, 1)
+        return {"games": self.games, "win-rate": self.won / games, \
+            "unfinished": self.games - self.finished, \
+            "turns": {"mean": statistics.mean(self.turns) if self.turns else 0, \
+                "median": statistics.median(self.turns) if self.turns else 0, \
+                "max": max(self.turns, default = 0)}, \
+            "levels": {level: {"ended-on": self.ended_on[level], "ejects-per-game": self.ejects[level] / games} \
+                for level in sorted(set(self.ended_on) | set(self.ejects))}}
+
+# The arguments shared by every game played by a worker process, set when the process starts.
+_worker_args = None
+
+def _init_worker(level_jsons: list, strategies: list, max_turns: int):
+    global _worker_args
+    _worker_args = (level_jsons, strategies, max_turns)
+
+def _play_batch(seeds: range) -> Stats:
+    """Plays a game for each of the given seeds in a worker process.
+    """
+    level_jsons, strategies, max_turns = _worker_args
+    stats = Stats()
+    for seed in seeds:
+        stats.add(play_game(level_jsons, strategies, seed, max_turns))
+    return stats
+
+def simulate(level_jsons: list, strategies: list, num_of_games: int, seed: int = 0, max_turns: int = 10000, \
+    processes: int = None) -> Stats:
+    """Plays the given number of games with a player for each of the given strategies, spread
+    across the given number of worker processes, which defaults to one per CPU. Game i is
+    played with seed + i, so the same arguments always give the same Stats.
+    """
+    batches = [range(start, min(start + BATCH_SIZE, seed + num_of_games)) \
+        for start in range(seed, seed + num_of_games, BATCH_SIZE)]
+    stats = Stats()
+    with Pool(processes, initializer = _init_worker, initargs = (level_jsons, strategies, max_turns)) as pool:
+        for batch_stats in pool.imap_unordered(_play_batch, batches):
+            stats.merge(batch_stats)
+    return stats
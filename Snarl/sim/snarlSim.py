@@ -0,0 +1,41 @@
+import argparse
+import json
+import time
+from Snarl.sim.simulator import simulate, STRATEGIES
+from Snarl.tests.parseJson import load_level_jsons
+
+def parse_args():
+    """Parses and checks the simulator's command line arguments.
+    """
+    parser = argparse.ArgumentParser(description = "simulation info")
+    parser.add_argument("--levels", type = str, nargs = 1)
+    parser.add_argument("--games", type = int, nargs = 1)
+    parser.add_argument("--players", type = str, nargs = "+", choices = list(STRATEGIES))
+    parser.add_argument("--seed", type = int, nargs = 1)
+    parser.add_argument("--max-turns", type = int, nargs = 1)
+    parser.add_argument("--processes", type = int, nargs = 1)
+    args = parser.parse_args()
+
+    args.levels = args.levels[0] if not args.levels == None else "snarl.levels"
+    args.games = args.games[0] if not args.games == None else 1000
+    if args.games < 1:
+        raise ValueError("There must be at least one game.")
+    # Each player is given by the strategy it plays with.
+    args.players = args.players if not args.players == None else ["seeker"]
+    if len(args.players) > 4:
+        raise ValueError("There must be between 1 and 4 players in a game.")
+    args.seed = args.seed[0] if not args.seed == None else 0
+    # Games that go on for longer than this are stopped, and counted as unfinished.
+    args.max_turns = args.max_turns[0] if not args.max_turns == None else 10000
+    # By default there is a worker process per CPU.
+    args.processes = args.processes[0] if not args.processes == None else None
+    return args
+
+if __name__ == "__main__":
+    args = parse_args()
+    start = time.perf_counter()
+    stats = simulate(load_level_jsons(args.levels), args.players, args.games, args.seed, args.max_turns, \
+        args.processes)
+    summary = stats.summary()
+    summary["seconds"] = round(time.perf_counter() - start, 2)
+    print(json.dumps(summary, indent = 2))
@@ -11,42 +11,42 @@ import json
 
 class TestEnemies(unittest.TestCase):
     def test_enemies_get_state(self):
-        z = EnemyZombie("name", "name")
+        z = EnemyZombie("name", "name", 0)
         grid = [[3]]
         z.notify({"state": grid})
         self.assertEqual(z.state, grid)
 
     def test_enemy_name_must_be_string(self):
         with self.assertRaises(TypeError):
-            EnemyZombie({"This is": "not a string"}, "This one is")
+            EnemyZombie({"This is": "not a string"}, "This one is", 0)
 
     def test_enemy_notify_must_be_dict(self):
-        z = EnemyZombie("Zomb", "Karl")
+        z = EnemyZombie("Zomb", "Karl", 0)
         with self.assertRaises(RuntimeError):
             z.notify("I am not a dict")
 
     def test_enemy_notify_loc_stores_location(self):
-        z = EnemyZombie("Zomb", "Karl")
+        z = EnemyZombie("Zomb", "Karl", 0)
         loc_val = Tile(23, 2)
         z.notify({ "loc": loc_val })
         self.assertEqual(z.location, loc_val)
 
     def test_enemy_not_equal_to_other_types(self):
-        z = EnemyZombie("Zomb", "Karl")
+        z = EnemyZombie("Zomb", "Karl", 0)
         self.assertNotEqual(z, "I am a string")
 
     def test_enemies_with_equal_name_and_entities_are_equal(self):
-        e1 = EnemyGhost("Ghast", "Karl")
-        e2 = EnemyGhost("Ghast", "Karl")
+        e1 = EnemyGhost("Ghast", "Karl", 0)
+        e2 = EnemyGhost("Ghast", "Karl", 0)
         e2.entity = e1.entity
         self.assertEqual(e1, e2)
 
     def test_hash_returns_hash(self):
-        z = EnemyZombie("Zomb", "Karl")
+        z = EnemyZombie("Zomb", "Karl", 0)
         self.assertEqual(type(z.__hash__()),int)
 
     def test_get_entity_returns_entity(self):
-        z = EnemyZombie("Zomb", "Karl")
+        z = EnemyZombie("Zomb", "Karl", 0)
         self.assertEqual(type(z.get_entity()), Zombie)
 
     def test_get_cardinal_moves_returns_none_when_no_moves(self):
@@ -54,7 +54,7 @@ class TestEnemies(unittest.TestCase):
         room2 = Room(Tile(0, 8), 4, 4, [Tile(1, 8)], [Tile(1, 9), Tile(2, 9)])
         hall = Hallway([], Tile(1,2), Tile(1,8))
         level = Level([room1, room2], [hall], Tile(1,9), Tile(2, 9))
-        z = EnemyZombie("Zombi", "Zombo")
+        z = EnemyZombie("Zombi", "Zombo", 0)
         state = Gamestate(level, 1, 1)
         state.add_adversary(z.entity, Tile(1, 1))
         z.notify({"state": state, "loc": Tile(1, 1)})
@@ -65,64 +65,82 @@ class TestEnemies(unittest.TestCase):
         room2 = Room(Tile(0, 8), 4, 4, [Tile(1, 8)], [Tile(1, 9), Tile(2, 9)])
         hall = Hallway([], Tile(1,2), Tile(1,8))
         level = Level([room1, room2], [hall], Tile(1,9), Tile(2, 9))
-        z = EnemyZombie("Zombi", "Zombo")
+        z = EnemyZombie("Zombi", "Zombo", 0)
         state = Gamestate(level, 1, 1)
         state.add_adversary(z.entity, Tile(2, 1))
         z.notify({"state": state, "loc": Tile(2, 1)})
         self.assertNotEqual(z._get_valid_cardinal_moves(), [])
 
-    def test_get_players_in_room_returns_empty_list_when_no_players(self):
+    def test_zombie_does_not_chase_player_in_another_room(self):
         room1 = Room(Tile(0, 0), 6, 3, [Tile(1, 2)], [Tile(1, 1), Tile(2, 1)])
-        room2 = Room(Tile(0, 8), 4, 4, [Tile(1, 8)], [Tile(1, 9), Tile(2, 9)])
+        room2 = Room(Tile(0, 8), 4, 4, [Tile(1, 8)], [Tile(1, 9), Tile(2, 9), Tile(1, 10), Tile(2, 10)])
         hall = Hallway([], Tile(1,2), Tile(1,8))
         level = Level([room1, room2], [hall], Tile(1,9), Tile(2, 9))
-        z = EnemyZombie("Zombi", "Zombo")
+        z = EnemyZombie("Zombi", "Zombo", 0)
         state = Gamestate(level, 1, 1)
         state.add_adversary(z.entity, Tile(2, 1))
+        state.add_character(Character("char"), Tile(1, 10))
         z.notify({"state": state, "loc": Tile(2, 1)})
-        self.assertEqual(z._get_players_in_room(), [])
+        self.assertIsNone(z._get_move_to_player())
+        self.assertTrue(z._determine_move().coordinates_equal(Tile(1, 1)))
 
-    def test_get_players_in_room_returns_players_in_room(self):
+    def test_determine_move_returns_move_not_farther_than_player_in_room(self):
         room1 = Room(Tile(0, 0), 6, 3, [Tile(1, 2)], [Tile(1, 1), Tile(2, 1)])
         room2 = Room(Tile(0, 8), 4, 4, [Tile(1, 8)], [Tile(1, 9), Tile(2, 9)])
         hall = Hallway([], Tile(1,2), Tile(1,8))
         level = Level([room1, room2], [hall], Tile(1,9), Tile(2, 9))
-        z = EnemyZombie("Zombi", "Zombo")
+        z = EnemyZombie("Zombi", "Zombo", 0)
         state = Gamestate(level, 1, 1)
         state.add_adversary(z.entity, Tile(2, 1))
         character = Character("char")
         character_loc = Tile(1, 1)
         state.add_character(character, character_loc)
         z.notify({"state": state, "loc": Tile(2, 1)})
-        players_in_room = z._get_players_in_room()
-        self.assertNotEqual(players_in_room, [])
-        self.assertTrue(players_in_room[0].coordinates_equal(character_loc))
+        move = z._determine_move()
+        self.assertTrue(move.coordinates_equal(character_loc))
 
-    def test_determine_move_returns_move_not_farther_than_player_in_room(self):
-        room1 = Room(Tile(0, 0), 6, 3, [Tile(1, 2)], [Tile(1, 1), Tile(2, 1)])
+    def test_zombie_follows_chase_field_around_blocks(self):
+        # The player is behind a row of blocks that can only be walked around on the right.
+        open_tiles = [Tile(x, 1) for x in range(1, 6)] + [Tile(5, 2)] + [Tile(x, 3) for x in range(1, 6)]
+        room1 = Room(Tile(0, 0), 7, 5, [Tile(3, 4)], open_tiles)
+        room2 = Room(Tile(0, 8), 4, 4, [Tile(3, 8)], [Tile(1, 9), Tile(2, 9)])
+        hall = Hallway([], Tile(3, 4), Tile(3, 8))
+        level = Level([room1, room2], [hall], Tile(1, 9), Tile(2, 9))
+        z = EnemyZombie("Zombi", "Zombo", 0)
+        state = Gamestate(level, 1, 1)
+        state.add_adversary(z.entity, Tile(1, 1))
+        character_loc = Tile(1, 3)
+        state.add_character(Character("char"), character_loc)
+        self.assertEqual(level.get_chase_field().distance(1, 1), 10)
+        for _ in range(10):
+            z.notify({"state": state, "loc": level.locate_entity(z.entity)})
+            level.move_occupant(z.entity, z._determine_move())
+        self.assertTrue(level.locate_entity(z.entity).coordinates_equal(character_loc))
+
+    def test_chase_field_is_shared_until_players_move(self):
+        room1 = Room(Tile(0, 0), 6, 3, [Tile(1, 2)], [Tile(1, 1), Tile(2, 1), Tile(3, 1)])
         room2 = Room(Tile(0, 8), 4, 4, [Tile(1, 8)], [Tile(1, 9), Tile(2, 9)])
         hall = Hallway([], Tile(1,2), Tile(1,8))
         level = Level([room1, room2], [hall], Tile(1,9), Tile(2, 9))
-        z = EnemyZombie("Zombi", "Zombo")
         state = Gamestate(level, 1, 1)
-        state.add_adversary(z.entity, Tile(2, 1))
         character = Character("char")
-        character_loc = Tile(1, 1)
-        state.add_character(character, character_loc)
-        z.notify({"state": state, "loc": Tile(2, 1)})
-        move = z._determine_move()
-        self.assertTrue(move.coordinates_equal(character_loc))
+        state.add_character(character, Tile(1, 1))
+        field = level.get_chase_field()
+        self.assertIs(field, level.get_chase_field())
+        level.move_occupant(character, Tile(2, 1))
+        self.assertIsNot(field, level.get_chase_field())
+        self.assertEqual(level.get_chase_field().distance(3, 1), 1)
 
     def test_cannot_move_before_being_notified_of_game_state(self):
         with self.assertRaises(RuntimeError):
-            EnemyZombie("Zombi", "Zombo")._determine_move()
+            EnemyZombie("Zombi", "Zombo", 0)._determine_move()
 
     def test_move_moves_in_random_open_dir_when_no_player_in_room(self):
         room1 = Room(Tile(0, 0), 6, 3, [Tile(1, 2)], [Tile(1, 1), Tile(2, 1)])
         room2 = Room(Tile(0, 8), 4, 4, [Tile(1, 8)], [Tile(1, 9), Tile(2, 9)])
         hall = Hallway([], Tile(1,2), Tile(1,8))
         level = Level([room1, room2], [hall], Tile(1,9), Tile(2, 9))
-        z = EnemyZombie("Zombi", "Zombo")
+        z = EnemyZombie("Zombi", "Zombo", 0)
         state = Gamestate(level, 1, 1)
         state.add_adversary(z.entity, Tile(2, 1))
         open_loc = Tile(1, 1)
@@ -130,12 +148,25 @@ class TestEnemies(unittest.TestCase):
         move = z._determine_move()
         self.assertTrue(move.coordinates_equal(open_loc))
 
+    def test_zombie_chooses_random_moves_with_its_random_number_generator(self):
+        room1 = Room(Tile(0, 0), 5, 5, [Tile(1, 4)], [Tile(x, y) for x in range(1, 4) for y in range(1, 4)])
+        room2 = Room(Tile(0, 8), 4, 4, [Tile(1, 8)], [Tile(1, 9), Tile(2, 9)])
+        hall = Hallway([], Tile(1, 4), Tile(1, 8))
+        level = Level([room1, room2], [hall], Tile(1, 9), Tile(2, 9))
+        z = EnemyZombie("Zombi", "Zombo", 0, LastChoice())
+        state = Gamestate(level, 1, 1)
+        state.add_adversary(z.entity, Tile(2, 2))
+        z.notify({"state": state, "loc": Tile(2, 2)})
+        moves = z._get_valid_cardinal_moves()
+        self.assertEqual(len(moves), 4)
+        self.assertTrue(z._determine_move().coordinates_equal(moves[-1]))
+
     def test_ghost_moves_to_closest_wall_when_no_player_in_range(self):
         room1 = Room(Tile(0, 0), 6, 3, [Tile(1, 2)], [Tile(1, 1), Tile(2, 1)])
         room2 = Room(Tile(0, 8), 4, 4, [Tile(1, 8)], [Tile(1, 9), Tile(2, 9)])
         hall = Hallway([], Tile(1,2), Tile(1,8))
         level = Level([room1, room2], [hall], Tile(1,9), Tile(2, 9))
-        g = EnemyGhost("El Ghost", "gost")
+        g = EnemyGhost("El Ghost", "gost", 0)
         state = Gamestate(level, 1, 1)
         state.add_adversary(g.entity, Tile(2, 1))
         g.notify({"state": state, "loc": Tile(2, 1)})
@@ -147,7 +178,7 @@ class TestEnemies(unittest.TestCase):
         room2 = Room(Tile(0, 8), 4, 4, [Tile(1, 8)], [Tile(1, 9), Tile(2, 9)])
         hall = Hallway([], Tile(1,2), Tile(1,8))
         level = Level([room1, room2], [hall], Tile(1,9), Tile(2, 9))
-        g = EnemyGhost("El Ghost", "gost")
+        g = EnemyGhost("El Ghost", "gost", 0)
         state = Gamestate(level, 1, 1)
         state.add_adversary(g.entity, Tile(2, 1))
         character = Character("char")
@@ -158,5 +189,12 @@ class TestEnemies(unittest.TestCase):
         self.assertTrue(move.coordinates_equal(character_loc))
 
 
+class LastChoice:
+    """Stands in for a random number generator that always chooses the last of its options.
+    """
+    def choice(self, options):
+        return options[-1]
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
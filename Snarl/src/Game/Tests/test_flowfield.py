@@ -0,0 +1,43 @@
+import unittest
+from Snarl.src.Game.flowfield import FlowField
+
+# A 5x3 grid with a wall in the middle column, open only on the bottom row:
+#   . . X . .
+#   . . X . .
+#   . . . . .
+WALKABLE = bytes([1, 1, 0, 1, 1,
+                  1, 1, 0, 1, 1,
+                  1, 1, 1, 1, 1])
+
+class TestFlowField(unittest.TestCase):
+    def test_distances_walk_around_obstacles(self):
+        field = FlowField(5, 3, [(0, 0)], WALKABLE)
+        self.assertEqual(field.distance(0, 0), 0)
+        self.assertEqual(field.distance(1, 0), 1)
+        self.assertEqual(field.distance(3, 0), 7)
+        self.assertIsNone(field.distance(2, 0))
+
+    def test_distance_is_to_closest_target(self):
+        field = FlowField(5, 3, [(0, 0), (4, 0)], WALKABLE)
+        self.assertEqual(field.distance(3, 0), 1)
+        self.assertEqual(field.distance(2, 2), 4)
+
+    def test_unreachable_and_outside_cells_have_no_distance(self):
+        walkable = bytes([1, 0, 1])
+        field = FlowField(3, 1, [(0, 0)], walkable)
+        self.assertIsNone(field.distance(2, 0))
+        self.assertIsNone(field.distance(-1, 0))
+        self.assertIsNone(field.distance(0, 1))
+
+    def test_targets_need_not_be_walkable(self):
+        field = FlowField(5, 3, [(2, 0)], WALKABLE)
+        self.assertEqual(field.distance(2, 0), 0)
+        self.assertEqual(field.distance(1, 0), 1)
+        self.assertEqual(field.distance(3, 0), 1)
+
+    def test_no_targets(self):
+        field = FlowField(5, 3, [], WALKABLE)
+        self.assertIsNone(field.distance(0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
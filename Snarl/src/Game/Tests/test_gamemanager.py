@@ -9,6 +9,7 @@ from Snarl.src.Game.player_impl import Player
 from Snarl.src.Game.occupants import Zombie
 from Snarl.src.Game.enemy_zombie import EnemyZombie
 from Snarl.src.Game.gamemanager import Gamemanager
+from Snarl.src.Game.gamestate import Gamestate
 
 class TestGamemanager(unittest.TestCase):
     def test_constructor_error_when_view_distance_nonpositive(self):
@@ -55,12 +56,12 @@ class TestGamemanager(unittest.TestCase):
 
     def test_add_adversary_adds_one_adversary(self):
         manager = Gamemanager(1)
-        manager.add_enemies(EnemyZombie("enemy", "zomb"))
+        manager.add_enemies(EnemyZombie("enemy", "zomb", 0))
         self.assertEqual(len(manager.enemy_list), 1)
 
     def test_add_adversary_adds_list_of_adversaries(self):
         manager = Gamemanager(1)
-        l = [EnemyZombie("enemy 1", "zomb 1"), EnemyZombie("enemy 2", "zomb 3")]
+        l = [EnemyZombie("enemy 1", "zomb 1", 0), EnemyZombie("enemy 2", "zomb 3", 1)]
         manager.add_enemies(l)
         self.assertEqual(len(manager.enemy_list), len(l))
     
@@ -133,6 +134,87 @@ class TestGamemanager(unittest.TestCase):
         with self.assertRaises(RuntimeError):
             manager._get_move()
 
+    def test_update_players_only_changed_skips_players_whose_view_was_not_touched(self):
+        room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9), Tile(9, 5)], [Tile(5, 5), Tile(7, 5), Tile(6, 6), Tile(7, 7)])
+        hallway1 = Hallway([], Tile(3, 9), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 10, 10, [Tile(3, 20)], [Tile(5, 25), Tile(5, 26)])
+        level = Level([room1, room2], [hallway1], Tile(6, 6), Tile(7, 7))
+        near, far = UpdateRecorder(), UpdateRecorder()
+        player = Player("Ty", "Tulkas Astaldo", out=near)
+        player2 = Player("Nic", "Morgoth Bauglir", out=far)
+        manager = Gamemanager()
+        manager.add_player(player)
+        manager.add_player(player2)
+        manager.game_state = Gamestate(level, 2, 0)
+        manager.game_state.add_character(player.entity, Tile(5, 5))
+        manager.game_state.add_character(player2.entity, Tile(5, 25))
+        manager._update_players()
+        self.assertEqual((len(near.updates), len(far.updates)), (1, 1))
+        manager.game_state.get_tile(Tile(7, 5))
+        manager._update_players(only_changed = True)
+        self.assertEqual((len(near.updates), len(far.updates)), (2, 1))
+        manager._update_players(only_changed = True)
+        self.assertEqual((len(near.updates), len(far.updates)), (2, 1))
+        manager.game_state.move(player2.entity, Tile(5, 26))
+        manager._update_players(only_changed = True)
+        self.assertEqual((len(near.updates), len(far.updates)), (2, 2))
+
+    def test_games_with_the_same_seed_spawn_entities_in_the_same_places(self):
+        def spawns(seed):
+            room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9)], [Tile(5, 5), Tile(6, 6), Tile(7, 7)])
+            hallway1 = Hallway([], Tile(3, 9), Tile(3, 20))
+            room2 = Room(Tile(0, 20), 10, 10, [Tile(3, 20)], [Tile(x, y) for x in range(1, 9) for y in range(21, 29)])
+            level = Level([room1, room2], [hallway1], Tile(6, 6), Tile(7, 7))
+            manager = Gamemanager(seed = seed)
+            manager.add_player(Player("Ty", "Tulkas Astaldo"))
+            manager.add_player(Player("Nic", "Morgoth Bauglir"))
+            manager.start_game(level)
+            self.assertIs(level.rng, manager.rng)
+            entities = [player.entity for player in manager.player_list] + [enemy.entity for enemy in manager.enemy_list]
+            return [(tile.x, tile.y) for tile in map(manager.game_state.get_entity_location, entities)]
+        self.assertEqual(spawns(42), spawns(42))
+        self.assertNotEqual(spawns(42), spawns(43))
+
+    def test_games_number_their_zombies_independently(self):
+        def first_zombie_name():
+            room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9)], [Tile(5, 5), Tile(6, 6), Tile(7, 7)])
+            hallway1 = Hallway([], Tile(3, 9), Tile(3, 20))
+            room2 = Room(Tile(0, 20), 10, 10, [Tile(3, 20)], [Tile(x, y) for x in range(1, 9) for y in range(21, 29)])
+            manager = Gamemanager(levels = [])
+            manager.add_player(Player("Ty", "Tulkas Astaldo"))
+            manager.start_game(Level([room1, room2], [hallway1], Tile(6, 6), Tile(7, 7)))
+            return manager.enemy_list[0].entity.name
+        self.assertEqual(first_zombie_name(), "zombie0")
+        self.assertEqual(first_zombie_name(), "zombie0")
+
+    def test_run_stops_after_max_turns(self):
+        room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9)], [Tile(5, 5), Tile(6, 6), Tile(7, 7)])
+        hallway1 = Hallway([], Tile(3, 9), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 10, 10, [Tile(3, 20)], [Tile(x, y) for x in range(1, 9) for y in range(21, 29)])
+        recorder = UpdateRecorder()
+        manager = Gamemanager(seed = 7)
+        manager.add_player(Player("Ty", "Tulkas Astaldo", out = recorder, input_func = lambda: "skip"))
+        manager.start_game(Level([room1, room2], [hallway1], Tile(6, 6), Tile(7, 7)))
+        self.assertFalse(manager.run(max_turns = 4))
+        self.assertEqual(manager.turns, 4)
+        self.assertFalse(manager.rule_checker.is_game_over(manager.game_state))
+        # The players are not told that a stopped game has ended.
+        self.assertNotIn("end-game", recorder.types)
+
+class UpdateRecorder:
+    """Keeps the update notifications written to it by a Player.
+    """
+    def __init__(self):
+        self.updates = []
+        self.types = []
+
+    def write(self, arg):
+        if type(arg) is not dict:
+            return
+        self.types.append(arg["type"])
+        if arg["type"] == "update":
+            self.updates.append(arg)
+
     
 
 
@@ -42,9 +42,9 @@ class TestGamestate(unittest.TestCase):
         gs.add_character(character, Tile(2, 2))
         gs.move(character, Tile(3, 3))
         # player was successfully added to new tile
-        self.assertEqual(gs.current_level.get_tile(Tile(3, 3)).get_character(), character)
+        self.assertEqual(gs.current_level.peek_tile(Tile(3, 3)).get_character(), character)
         # player was successfully removed from old tile
-        self.assertEqual(gs.current_level.get_tile(Tile(2, 2)).get_character(), None)
+        self.assertEqual(gs.current_level.peek_tile(Tile(2, 2)).get_character(), None)
     
     def test_move_player_through_doorway(self):
         room1 = Room(Tile(0, 0), 5, 5, [Tile(3, 4)], [Tile(1, 2), Tile(2, 3)])
@@ -56,9 +56,9 @@ class TestGamestate(unittest.TestCase):
         gs.current_level.add_character(character, Tile(3, 4))
         gs.move(character, Tile(3, 6))
         # player was successfully added to new tile
-        self.assertEqual(gs.current_level.get_tile(Tile(3, 6)).get_character(), character)
+        self.assertEqual(gs.current_level.peek_tile(Tile(3, 6)).get_character(), character)
         # player was successfully removed from old tile
-        self.assertEqual(gs.current_level.get_tile(Tile(3, 4)).get_character(), None)
+        self.assertEqual(gs.current_level.peek_tile(Tile(3, 4)).get_character(), None)
 
     def test_move_player_in_hallway(self):
         room1 = Room(Tile(0, 0), 5, 5, [Tile(3, 4)], [Tile(1, 2), Tile(2, 3)])
@@ -70,9 +70,9 @@ class TestGamestate(unittest.TestCase):
         gs.current_level.add_character(character, Tile(3, 6))
         gs.move(character, Tile(1, 6))
         # player was successfully added to new tile
-        self.assertEqual(gs.current_level.get_tile(Tile(1, 6)).get_character(), character)
+        self.assertEqual(gs.current_level.peek_tile(Tile(1, 6)).get_character(), character)
         # player was successfully removed from old tile
-        self.assertEqual(gs.current_level.get_tile(Tile(3, 6)).get_character(), None)
+        self.assertEqual(gs.current_level.peek_tile(Tile(3, 6)).get_character(), None)
 
     def test_move_adversary(self):
         room1 = Room(Tile(0, 0), 5, 5, [Tile(3, 4)], [Tile(2, 2), Tile(3, 2), Tile(1, 2), Tile(2, 3)])
@@ -84,9 +84,9 @@ class TestGamestate(unittest.TestCase):
         gs.current_level.add_adversary(adv, Tile(2, 2))
         gs.move(adv, Tile(3, 2))
         # player was successfully added to new tile
-        self.assertEqual(gs.current_level.get_tile(Tile(3, 2)).get_adversary(), Adversary())
+        self.assertEqual(gs.current_level.peek_tile(Tile(3, 2)).get_adversary(), Adversary())
         # player was successfully removed from old tile
-        self.assertEqual(gs.current_level.get_tile(Tile(2, 2)).get_character(), None)
+        self.assertEqual(gs.current_level.peek_tile(Tile(2, 2)).get_character(), None)
 
     def test_move_adversary_through_doorway(self):
         room1 = Room(Tile(0, 0), 5, 5, [Tile(3, 4)], [Tile(3, 3), Tile(1, 2), Tile(2, 3)])
@@ -98,9 +98,9 @@ class TestGamestate(unittest.TestCase):
         gs.current_level.add_adversary(adv, Tile(3, 3))
         gs.move(adv, Tile(3, 4))
         # player was successfully added to new tile
-        self.assertEqual(gs.current_level.get_tile(Tile(3, 4)).get_adversary(), Adversary())
+        self.assertEqual(gs.current_level.peek_tile(Tile(3, 4)).get_adversary(), Adversary())
         # player was successfully removed from old tile
-        self.assertEqual(gs.current_level.get_tile(Tile(3, 3)).get_character(), None)
+        self.assertEqual(gs.current_level.peek_tile(Tile(3, 3)).get_character(), None)
 
     def test_move_adversary_through_hallway(self):
         room1 = Room(Tile(0, 0), 5, 5, [Tile(3, 4)], [Tile(1, 2), Tile(2, 3)])
@@ -112,9 +112,9 @@ class TestGamestate(unittest.TestCase):
         gs.current_level.add_adversary(adv, Tile(1, 6))
         gs.move(adv, Tile(1, 7))
         # player was successfully added to new tile
-        self.assertEqual(gs.current_level.get_tile(Tile(1, 7)).get_adversary(), Adversary())
+        self.assertEqual(gs.current_level.peek_tile(Tile(1, 7)).get_adversary(), Adversary())
         # player was successfully removed from old tile
-        self.assertEqual(gs.current_level.get_tile(Tile(1, 6)).get_character(), None)
+        self.assertEqual(gs.current_level.peek_tile(Tile(1, 6)).get_character(), None)
 
     def test_get_tiles_gets_current_level_tiles(self):
         room1 = Room(Tile(0, 0), 5, 5, [Tile(3, 4)], [Tile(1, 2), Tile(2, 3)])
@@ -154,6 +154,19 @@ class TestGamestate(unittest.TestCase):
         self.assertTrue(tiles_in_x_range)
         self.assertTrue(tiles_in_y_range)
 
+    def test_get_character_surroundings_is_padded_square(self):
+        room1 = Room(Tile(0, 0), 5, 5, [Tile(3, 4)], [Tile(1, 2), Tile(2, 3)])
+        hallway1 = Hallway([Tile(3, 6), Tile(1, 6), Tile(1, 18), Tile(3, 18)], Tile(3, 4), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 5, 10, [Tile(3, 20)])
+        level = Level([room1, room2], [hallway1], Tile(1, 2), Tile(2, 3))
+        character = Character("Tulkas Astaldo")
+        level.add_character(character, Tile(0, 0))
+        gs = Gamestate(level, 1, 0)
+        tiles = gs.get_character_surroundings(character, 2)
+        self.assertEqual(len(tiles), 5)
+        self.assertTrue(all(len(row) == 5 for row in tiles))
+        self.assertTrue(tiles[2][2].has_character())
+
     def test_add_adversary_adds_adversary(self):
         room1 = Room(Tile(0, 0), 5, 5, [Tile(3, 4)], [Tile(1, 2), Tile(2, 3)])
         hallway1 = Hallway([Tile(3, 6), Tile(1, 6), Tile(1, 18), Tile(3, 18)], Tile(3, 4), Tile(3, 20))
@@ -305,5 +318,49 @@ class TestGamestate(unittest.TestCase):
 
         self.assertEqual(dumbledore, gs.get_level_unlocked_by())
 
+    def test_restore_goes_back_to_an_earlier_level(self):
+        room1 = Room(Tile(0, 0), 5, 5, [Tile(3, 4)], [Tile(1, 2), Tile(2, 3), Tile(1, 1)])
+        hallway1 = Hallway([Tile(3, 6), Tile(1, 6), Tile(1, 18), Tile(3, 18)], Tile(3, 4), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 5, 10, [Tile(3, 20)])
+        level1 = Level([room1, room2], [hallway1], Tile(1, 2), Tile(2, 3))
+        room1_1 = Room(Tile(0, 0), 5, 5, [Tile(3, 4)], [Tile(2, 2), Tile(3, 3), Tile(1, 1), Tile(1, 2)])
+        hallway1_1 = Hallway([Tile(3, 6), Tile(1, 6), Tile(1, 18), Tile(3, 18)], Tile(3, 4), Tile(3, 20))
+        room2_1 = Room(Tile(0, 20), 5, 10, [Tile(3, 20)])
+        level2 = Level([room1_1, room2_1], [hallway1_1], Tile(1, 1), Tile(1, 2))
+        gs = Gamestate(level1, 1, 0, [level2])
+        dumbledore = Character("Dumbledore")
+        gs.add_character(dumbledore, Tile(1, 1))
+        snapshot = gs.snapshot()
+        rolled = gs.rng.random()
+        gs.next_level()
+        gs.add_character(dumbledore, Tile(2, 2))
+        gs.restore(snapshot)
+        self.assertIs(gs.current_level, level1)
+        self.assertEqual(gs.levels, [level2])
+        self.assertEqual(gs.num_levels_completed, 0)
+        self.assertEqual(gs.characters, [dumbledore])
+        self.assertFalse(level1.is_completed)
+        self.assertEqual(level2.characters, {})
+        self.assertEqual(gs.get_entity_location(dumbledore), Tile(1, 1, dumbledore))
+        self.assertEqual(gs.rng.random(), rolled)
+
+    def test_fork_is_played_without_changing_the_game(self):
+        room1 = Room(Tile(0, 0), 5, 5, [Tile(3, 4)], [Tile(1, 2), Tile(2, 3), Tile(1, 1)])
+        hallway1 = Hallway([Tile(3, 6), Tile(1, 6), Tile(1, 18), Tile(3, 18)], Tile(3, 4), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 5, 10, [Tile(3, 20)])
+        level1 = Level([room1, room2], [hallway1], Tile(1, 2), Tile(2, 3))
+        gs = Gamestate(level1, 1, 0)
+        dumbledore = Character("Dumbledore")
+        gs.add_character(dumbledore, Tile(1, 1))
+        fork = gs.fork()
+        self.assertEqual(fork.rng.random(), gs.rng.random())
+        fork.move(dumbledore, Tile(1, 2))
+        fork.move(dumbledore, Tile(2, 3))
+        self.assertTrue(fork.is_current_level_completed())
+        self.assertIs(fork.current_level.rng, fork.rng)
+        self.assertFalse(gs.is_current_level_unlocked())
+        self.assertEqual(gs.get_current_characters(), [dumbledore])
+        self.assertEqual(gs.get_entity_location(dumbledore), Tile(1, 1, dumbledore))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
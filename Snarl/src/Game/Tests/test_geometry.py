@@ -0,0 +1,102 @@
+import unittest
+from array import array
+from Snarl.src.Game.geometry import LevelGeometry, build_geometry, level_dimensions, block_distances, terrain_mask, \
+    VOID_REGION
+from Snarl.src.Game.level import Level
+from Snarl.src.Game.room import Room
+from Snarl.src.Game.hallway import Hallway
+from Snarl.src.Game.tile import Tile
+from Snarl.src.Game.terrain import Terrain
+
+class TestGeometry(unittest.TestCase):
+    def test_level_dimensions_cover_rooms_and_hallways(self):
+        room1 = Room(Tile(0, 0), 5, 5, [Tile(3, 4)], [Tile(1, 1), Tile(2, 2)])
+        hallway1 = Hallway([Tile(3, 6), Tile(1, 6), Tile(1, 18), Tile(3, 18)], Tile(3, 4), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 5, 10, [Tile(3, 20)])
+        self.assertEqual(level_dimensions([room1, room2], [hallway1]), (5, 30))
+
+    def test_build_geometry_stores_doors_key_and_exit(self):
+        room1 = Room(Tile(0, 0), 5, 5, [Tile(3, 4)], [Tile(1, 1), Tile(2, 2)])
+        hallway1 = Hallway([Tile(3, 6), Tile(1, 6), Tile(1, 18), Tile(3, 18)], Tile(3, 4), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 5, 10, [Tile(3, 20)])
+        geometry = build_geometry([room1, room2], [hallway1], Tile(1, 1), Tile(2, 2))
+        self.assertEqual(geometry.doors, ((3, 4), (3, 20)))
+        self.assertEqual(geometry.key, (1, 1))
+        self.assertEqual(geometry.exit, (2, 2))
+        self.assertEqual(geometry.terrain_at(1, 10), Terrain.FLOOR)
+        self.assertEqual(geometry.terrain_at(3, 10), Terrain.VOID)
+
+    def test_geometry_is_immutable(self):
+        room1 = Room(Tile(0, 0), 5, 5, [Tile(3, 4)], [Tile(1, 1), Tile(2, 2)])
+        hallway1 = Hallway([Tile(3, 6), Tile(1, 6), Tile(1, 18), Tile(3, 18)], Tile(3, 4), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 5, 10, [Tile(3, 20)])
+        level = Level([room1, room2], [hallway1], Tile(1, 1), Tile(2, 2))
+        with self.assertRaises(AttributeError):
+            level.geometry.width = 10
+        with self.assertRaises(TypeError):
+            level.geometry.terrain[0] = Terrain.FLOOR
+
+    def test_cell_index_rejects_coordinates_outside_level(self):
+        geometry = LevelGeometry(2, 2, bytes(4), array('i', [VOID_REGION]) * 4, (), None, None)
+        self.assertEqual(geometry.cell_index(1, 1), 3)
+        with self.assertRaises(IndexError):
+            geometry.cell_index(2, 0)
+
+    def test_regions_map_cells_to_rooms_and_hallways(self):
+        room1 = Room(Tile(0, 0), 5, 5, [Tile(3, 4)], [Tile(1, 1), Tile(2, 2)])
+        hallway1 = Hallway([Tile(3, 6), Tile(1, 6), Tile(1, 18), Tile(3, 18)], Tile(3, 4), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 5, 10, [Tile(3, 20)])
+        geometry = build_geometry([room1, room2], [hallway1], Tile(1, 1), Tile(2, 2))
+        self.assertEqual(geometry.room_index_at(0, 0), 0)
+        self.assertEqual(geometry.room_index_at(3, 20), 1)
+        self.assertEqual(geometry.room_index_at(1, 10), None)
+        self.assertEqual(geometry.hallway_index_at(1, 10), 0)
+        self.assertEqual(geometry.hallway_index_at(3, 10), None)
+        self.assertEqual(geometry.room_index_at(3, 10), None)
+        self.assertEqual(geometry.room_index_at(50, 50), None)
+
+    def test_geometry_cannot_be_modified(self):
+        room1 = Room(Tile(0, 0), 5, 5, [Tile(3, 4)], [Tile(1, 1), Tile(2, 2)])
+        hallway1 = Hallway([Tile(3, 6), Tile(1, 6), Tile(1, 18), Tile(3, 18)], Tile(3, 4), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 5, 10, [Tile(3, 20)])
+        geometry = build_geometry([room1, room2], [hallway1], Tile(1, 1), Tile(2, 2))
+        with self.assertRaises(TypeError):
+            geometry.regions[0] = 1
+        with self.assertRaises(TypeError):
+            geometry.terrain[0] = Terrain.FLOOR
+        self.assertEqual(geometry.room_index_at(0, 0), 0)
+
+    def test_block_distances_scan_rows_and_columns(self):
+        B, F = Terrain.BLOCK, Terrain.FLOOR
+        terrain = bytes([B, F, F, F,
+                         F, F, F, B,
+                         F, F, F, F])
+        geometry = LevelGeometry(4, 3, terrain, array('i', [VOID_REGION]) * 12, (), None, None)
+        distances = block_distances(geometry)
+        self.assertEqual(distances[0 * 4 + 1], 1)
+        self.assertEqual(distances[1 * 4 + 2], 1)
+        self.assertEqual(distances[1 * 4 + 3], 0)
+        self.assertEqual(distances[2 * 4 + 0], 2)
+        self.assertEqual(distances[2 * 4 + 2], float("inf"))
+
+    def test_block_distances_use_farthest_block_right_and_below(self):
+        B, F = Terrain.HORIZONTAL_WALL, Terrain.DOOR
+        geometry = LevelGeometry(4, 1, bytes([F, B, F, B]), array('i', [VOID_REGION]) * 4, (), None, None)
+        distances = block_distances(geometry)
+        self.assertEqual(list(distances), [3, 0, 1, 0])
+
+    def test_block_distances_use_farthest_block_below(self):
+        B, F = Terrain.BLOCK, Terrain.FLOOR
+        geometry = LevelGeometry(1, 5, bytes([F, B, F, F, B]), array('i', [VOID_REGION]) * 5, (), None, None)
+        distances = block_distances(geometry)
+        # The cell at y = 0 is given the farthest block below it, 4 away, although one is 1 away.
+        self.assertEqual(list(distances), [4, 0, 1, 1, 0])
+
+    def test_terrain_mask_flags_cells_of_the_given_terrain(self):
+        B, F, D = Terrain.BLOCK, Terrain.FLOOR, Terrain.DOOR
+        geometry = LevelGeometry(5, 1, bytes([F, B, D, F, Terrain.VOID]), array('i', [VOID_REGION]) * 5, (), None, None)
+        self.assertEqual(terrain_mask(geometry, [Terrain.FLOOR]), bytes([1, 0, 0, 1, 0]))
+        self.assertEqual(terrain_mask(geometry, [Terrain.FLOOR, Terrain.DOOR]), bytes([1, 0, 1, 1, 0]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,7 @@ from Snarl.src.Game.hallway import Hallway
 from Snarl.src.Game.tile import Tile
 from Snarl.src.Game.occupants import Character, Adversary, LevelKey, LevelExit, Ghost
 from Snarl.src.Game.utils import grid_to_string
+from Snarl.src.Game.terrain import Terrain
 
 class TestLevel(unittest.TestCase):
     def test_rooms_field_rejects_nonrooms(self):
@@ -220,7 +221,7 @@ class TestLevel(unittest.TestCase):
         hallway2 = Hallway([Tile(12, 5), Tile(12, 2), Tile(15, 2)], Tile(9, 5), Tile(18, 2))
         room3 = Room(Tile(18, 0), 5, 5, [Tile(18, 2)])
         level = Level([room1, room2, room3], [hallway1, hallway2], Tile(1, 1), Tile(2, 2))
-        g = Ghost()
+        g = Ghost("ghost", 0)
         blocked_tile = Tile(10, 10)
         level.add_adversary(g, blocked_tile)
         level.interact(blocked_tile)
@@ -335,5 +336,159 @@ class TestLevel(unittest.TestCase):
         rooms = level.get_reachable_rooms_from_tile(Tile(1, 1))
         self.assertEqual([[down20.y, down20.x], [across18.y, across18.x]], rooms)
 
+    def test_get_tile_keeps_changes_to_tile(self):
+        room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9), Tile(9, 5)], [Tile(5, 5), Tile(7, 5), Tile(1, 1), Tile(2, 2)])
+        hallway1 = Hallway([], Tile(3, 9), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 10, 10, [Tile(3, 20)])
+        level = Level([room1, room2], [hallway1], Tile(1, 1), Tile(2, 2))
+        level.get_tile(Tile(7, 5)).add_occupant(Character("Nic"))
+        self.assertEqual(level.get_tile(Tile(7, 5)).get_character(), Character("Nic"))
+        self.assertIs(level.get_tile(Tile(7, 5)), level.get_tile(Tile(7, 5)))
+
+    def test_peek_tile_does_not_store_tile(self):
+        room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9), Tile(9, 5)], [Tile(5, 5), Tile(7, 5), Tile(1, 1), Tile(2, 2)])
+        hallway1 = Hallway([], Tile(3, 9), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 10, 10, [Tile(3, 20)])
+        level = Level([room1, room2], [hallway1], Tile(1, 1), Tile(2, 2))
+        level.peek_tile(Tile(7, 5)).add_occupant(Character("Nic"))
+        self.assertEqual(level.get_tile(Tile(7, 5)).get_character(), None)
+
+    def test_take_touched_cells_returns_and_forgets_touched_cells(self):
+        room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9), Tile(9, 5)], [Tile(5, 5), Tile(7, 5), Tile(1, 1), Tile(2, 2)])
+        hallway1 = Hallway([], Tile(3, 9), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 10, 10, [Tile(3, 20)])
+        level = Level([room1, room2], [hallway1], Tile(1, 1), Tile(2, 2))
+        level.add_character(Character("Nic"), Tile(5, 5))
+        level.take_touched_cells()
+        level.peek_tile(Tile(1, 1))
+        level.get_tile(Tile(2, 2))
+        level.move_occupant(Character("Nic"), Tile(7, 5))
+        self.assertEqual(level.take_touched_cells(), {(2, 2), (5, 5), (7, 5)})
+        self.assertEqual(level.take_touched_cells(), set())
+
+    def test_reading_tiles_does_not_store_or_touch_them(self):
+        room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9), Tile(9, 5)], [Tile(5, 5), Tile(7, 5), Tile(1, 1), Tile(2, 2)])
+        hallway1 = Hallway([], Tile(3, 9), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 10, 10, [Tile(3, 20)])
+        level = Level([room1, room2], [hallway1], Tile(1, 1), Tile(2, 2))
+        level.add_character(Character("Nic"), Tile(5, 5))
+        level.take_touched_cells()
+        stored = dict(level.occupied_tiles)
+        level.interact(Tile(6, 6))
+        level.interact(Tile(5, 5))
+        level._get_characters_on_tile(Tile(7, 5))
+        self.assertEqual(level.occupied_tiles, stored)
+        self.assertEqual(level.take_touched_cells(), set())
+        level.move_occupant(Character("Nic"), Tile(7, 5))
+        level.move_occupant(Character("Nic"), Tile(5, 5))
+        self.assertEqual(level.occupied_tiles.keys(), stored.keys())
+
+    def test_stored_tiles_range_holds_every_entity_in_range(self):
+        room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9), Tile(9, 5)], [Tile(5, 5), Tile(7, 5), Tile(1, 1), Tile(2, 2)])
+        hallway1 = Hallway([], Tile(3, 9), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 10, 10, [Tile(3, 20)])
+        level = Level([room1, room2], [hallway1], Tile(1, 1), Tile(2, 2))
+        level.add_character(Character("Nic"), Tile(7, 5))
+        level.add_adversary(Adversary(), Tile(5, 5))
+        level.add_character(Character("Ty"), Tile(3, 25))
+        tiles = level.get_stored_tiles_range(Tile(8, 8), Tile(0, 0))
+        self.assertEqual([(tile.x, tile.y) for tile in tiles], [(1, 1), (2, 2), (5, 5), (7, 5)])
+        self.assertEqual(tiles[3].get_character(), Character("Nic"))
+        self.assertEqual(level.get_stored_tiles_range(Tile(4, 24), Tile(4, 24)), [])
+
+    def test_terrain_matches_layout(self):
+        room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9), Tile(9, 5)], [Tile(5, 5), Tile(7, 5), Tile(1, 1), Tile(2, 2)])
+        hallway1 = Hallway([], Tile(3, 9), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 10, 10, [Tile(3, 20)])
+        hallway2 = Hallway([Tile(12, 5), Tile(12, 2), Tile(15, 2)], Tile(9, 5), Tile(18, 2))
+        room3 = Room(Tile(18, 0), 5, 5, [Tile(18, 2)])
+        level = Level([room1, room2, room3], [hallway1, hallway2], Tile(1, 1), Tile(2, 2))
+        self.assertEqual(level.get_terrain(Tile(0, 0)), Terrain.HORIZONTAL_WALL)
+        self.assertEqual(level.get_terrain(Tile(0, 3)), Terrain.VERTICAL_WALL)
+        self.assertEqual(level.get_terrain(Tile(3, 3)), Terrain.BLOCK)
+        self.assertEqual(level.get_terrain(Tile(5, 5)), Terrain.FLOOR)
+        self.assertEqual(level.get_terrain(Tile(9, 5)), Terrain.DOOR)
+        self.assertEqual(level.get_terrain(Tile(12, 3)), Terrain.FLOOR)
+        self.assertEqual(level.get_terrain(Tile(15, 15)), Terrain.VOID)
+
+    def test_get_tile_outside_level_raises(self):
+        room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9), Tile(9, 5)], [Tile(5, 5), Tile(7, 5), Tile(1, 1), Tile(2, 2)])
+        hallway1 = Hallway([], Tile(3, 9), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 10, 10, [Tile(3, 20)])
+        level = Level([room1, room2], [hallway1], Tile(1, 1), Tile(2, 2))
+        with self.assertRaises(IndexError):
+            level.get_tile(Tile(10, 5))
+
+    def test_get_room_at_and_get_hallway_at(self):
+        room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9), Tile(9, 5)], [Tile(5, 5), Tile(1, 1), Tile(2, 2)])
+        hallway1 = Hallway([], Tile(3, 9), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 10, 10, [Tile(3, 20)])
+        hallway2 = Hallway([Tile(12, 5), Tile(12, 2), Tile(15, 2)], Tile(9, 5), Tile(18, 2))
+        room3 = Room(Tile(18, 0), 5, 5, [Tile(18, 2)])
+        level = Level([room1, room2, room3], [hallway1, hallway2], Tile(1, 1), Tile(2, 2))
+        self.assertIs(level.get_room_at(Tile(5, 5)), room1)
+        self.assertIs(level.get_room_at(Tile(18, 2)), room3)
+        self.assertIsNone(level.get_room_at(Tile(12, 3)))
+        self.assertIs(level.get_hallway_at(Tile(12, 3)), hallway2)
+        self.assertIsNone(level.get_hallway_at(Tile(5, 5)))
+        self.assertEqual(level._tile_in_room_or_hallway(Tile(15, 15)), "void")
+
+    def test_level_key_and_exit_are_indexed(self):
+        room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9), Tile(9, 5)], [Tile(5, 5), Tile(1, 1), Tile(2, 2)])
+        hallway1 = Hallway([], Tile(3, 9), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 10, 10, [Tile(3, 20)])
+        level = Level([room1, room2], [hallway1], Tile(1, 1), Tile(2, 2))
+        self.assertIs(level.get_level_key(), level.get_tile(Tile(1, 1)))
+        self.assertIs(level.get_level_exit(), level.get_tile(Tile(2, 2)))
+        self.assertTrue(level.get_level_key().has_occupant(LevelKey))
+        self.assertTrue(level.get_level_exit().has_occupant(LevelExit))
+
+    def test_level_key_index_cleared_after_pickup(self):
+        room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9), Tile(9, 5)], [Tile(1, 2), Tile(1, 1), Tile(2, 2)])
+        hallway1 = Hallway([], Tile(3, 9), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 10, 10, [Tile(3, 20)])
+        level = Level([room1, room2], [hallway1], Tile(1, 1), Tile(2, 2))
+        level.add_character(Character("Nic"), Tile(1, 2))
+        level.move_occupant(Character("Nic"), Tile(1, 1))
+        self.assertTrue(level.level_exit_unlocked)
+        self.assertIsNone(level.get_level_key())
+        self.assertFalse(level.peek_tile(Tile(1, 1)).has_occupant(LevelKey))
+        self.assertIs(level.get_level_exit(), level.get_tile(Tile(2, 2)))
+
+    def test_restore_undoes_moves_and_key_pickup(self):
+        room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9), Tile(9, 5)], [Tile(1, 2), Tile(1, 1), Tile(2, 2), Tile(5, 5)])
+        hallway1 = Hallway([], Tile(3, 9), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 10, 10, [Tile(3, 20)])
+        level = Level([room1, room2], [hallway1], Tile(1, 1), Tile(2, 2))
+        level.add_character(Character("Nic"), Tile(1, 2))
+        rendered = level.render_to_string()
+        snapshot = level.snapshot()
+        for _ in range(2):
+            level.move_occupant(Character("Nic"), Tile(1, 1))
+            self.assertTrue(level.level_exit_unlocked)
+            level.restore(snapshot)
+            self.assertFalse(level.level_exit_unlocked)
+            self.assertIs(level.locate_entity(Character("Nic")), level.get_tile(Tile(1, 2)))
+            self.assertIs(level.get_level_key(), level.get_tile(Tile(1, 1)))
+            self.assertTrue(level.peek_tile(Tile(1, 1)).has_occupant(LevelKey))
+            self.assertEqual(level.render_to_string(), rendered)
+        self.assertIn((1, 1), level.take_touched_cells())
+
+    def test_fork_is_played_without_changing_the_level(self):
+        room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9), Tile(9, 5)], [Tile(1, 2), Tile(1, 1), Tile(2, 2), Tile(5, 5)])
+        hallway1 = Hallway([], Tile(3, 9), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 10, 10, [Tile(3, 20)])
+        level = Level([room1, room2], [hallway1], Tile(1, 1), Tile(2, 2))
+        level.add_character(Character("Nic"), Tile(1, 2))
+        rendered = level.render_to_string()
+        fork = level.fork()
+        fork.move_occupant(Character("Nic"), Tile(1, 1))
+        self.assertTrue(fork.level_exit_unlocked)
+        self.assertNotEqual(fork.render_to_string(), rendered)
+        self.assertIs(fork.geometry, level.geometry)
+        self.assertFalse(level.level_exit_unlocked)
+        self.assertEqual(level.locate_entity(Character("Nic")), Tile(1, 2, Character("Nic")))
+        self.assertEqual(level.render_to_string(), rendered)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -30,18 +30,23 @@ class TestOccupants(unittest.TestCase):
 
     def test_zombies_equal_with_same_name(self):
         name = "zomb" 
-        z1 = Zombie(name)
-        z2 = Zombie(name)
+        z1 = Zombie(name, 0)
+        z2 = Zombie(name, 1)
         z2.name = z1.name
         self.assertEqual(z1, z2)
 
-    def test_zombie_names_increment(self):
-        z1 = Zombie()
-        z2 = Zombie()
+    def test_zombies_with_different_numbers_differ(self):
+        z1 = Zombie("zombie", 0)
+        z2 = Zombie("zombie", 1)
         self.assertNotEqual(z1.name, z2.name)
+        self.assertNotEqual(z1, z2)
+
+    def test_zombie_named_with_given_number(self):
+        self.assertEqual(Zombie("zomb", 3).name, "zomb3")
+        self.assertEqual(Ghost("ghast", 3).name, "ghast3")
 
     def test_ghost_renders_as_g(self):
-        g = Ghost()
+        g = Ghost("ghost", 0)
         self.assertEqual(g.render(), "G")
 
     def test_wall_renders_as_pound(self):
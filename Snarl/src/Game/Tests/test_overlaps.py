@@ -0,0 +1,48 @@
+import unittest
+from Snarl.src.Game.overlaps import find_overlaps, Overlap, ROOMS_INTERSECT, HALLWAY_INSIDE_ROOM, \
+    HALLWAYS_INTERSECT, HALLWAY_STRADDLES_ROOM
+from Snarl.src.Game.level import Level
+from Snarl.src.Game.room import Room
+from Snarl.src.Game.hallway import Hallway
+from Snarl.src.Game.tile import Tile
+
+class TestOverlaps(unittest.TestCase):
+    def test_no_overlaps_in_valid_layout(self):
+        room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9), Tile(9, 5)], [Tile(5, 5)])
+        hallway1 = Hallway([], Tile(3, 9), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 10, 10, [Tile(3, 20)])
+        hallway2 = Hallway([Tile(12, 5), Tile(12, 2), Tile(15, 2)], Tile(9, 5), Tile(18, 2))
+        room3 = Room(Tile(18, 0), 5, 5, [Tile(18, 2)])
+        self.assertEqual(find_overlaps([room1, room2, room3], [hallway1, hallway2]), [])
+
+    def test_reports_every_intersecting_room_pair(self):
+        room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9)])
+        room2 = Room(Tile(5, 5), 10, 10, [Tile(5, 7)])
+        room3 = Room(Tile(8, 8), 4, 4, [Tile(8, 9)])
+        room4 = Room(Tile(30, 30), 4, 4, [Tile(30, 31)])
+        self.assertEqual(find_overlaps([room1, room2, room3, room4], []), \
+            [Overlap(ROOMS_INTERSECT, 0, 1), Overlap(ROOMS_INTERSECT, 0, 2), Overlap(ROOMS_INTERSECT, 1, 2)])
+
+    def test_reports_hallways_inside_and_straddling_rooms(self):
+        room1 = Room(Tile(5, 5), 5, 5, [Tile(5, 7)])
+        inside = Hallway([Tile(7, 7)], Tile(7, 1), Tile(1, 7))
+        straddle = Hallway([], Tile(20, 3), Tile(20, 15))
+        room2 = Room(Tile(18, 6), 5, 5, [Tile(18, 7)])
+        overlaps = find_overlaps([room1, room2], [inside, straddle])
+        self.assertIn(Overlap(HALLWAY_INSIDE_ROOM, 0, 0), overlaps)
+        self.assertIn(Overlap(HALLWAY_STRADDLES_ROOM, 1, 1), overlaps)
+
+    def test_reports_intersecting_hallways_once(self):
+        hallway1 = Hallway([Tile(5, 1), Tile(5, 10)], Tile(4, 1), Tile(4, 10))
+        hallway2 = Hallway([Tile(1, 5), Tile(10, 5)], Tile(1, 4), Tile(10, 4))
+        self.assertEqual(find_overlaps([], [hallway1, hallway2]), [Overlap(HALLWAYS_INTERSECT, 0, 1)])
+
+    def test_level_error_lists_overlaps(self):
+        room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9)])
+        room2 = Room(Tile(5, 5), 10, 10, [Tile(5, 7)])
+        with self.assertRaises(ValueError) as context:
+            Level([room1, room2], [], Tile(1, 1), Tile(2, 2))
+        self.assertIn("room 0 at [0, 0] and room 1 at [5, 5] intersect", str(context.exception))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from Snarl.src.Game.rendercache import RenderCache
+from Snarl.src.Game.level import Level
+from Snarl.src.Game.room import Room
+from Snarl.src.Game.hallway import Hallway
+from Snarl.src.Game.tile import Tile
+from Snarl.src.Game.occupants import Character
+from Snarl.src.Game.utils import grid_to_string
+
+def make_cache(cells):
+    calls = []
+    def render_cell(index):
+        calls.append(index)
+        return cells[index]
+    return RenderCache(3, 2, render_cell), calls
+
+def make_level():
+    room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9), Tile(9, 5)], [Tile(5, 5), Tile(6, 5), Tile(1, 1), Tile(2, 2)])
+    hallway1 = Hallway([], Tile(3, 9), Tile(3, 20))
+    room2 = Room(Tile(0, 20), 10, 10, [Tile(3, 20)])
+    return Level([room1, room2], [hallway1], Tile(1, 1), Tile(2, 2))
+
+class TestRenderCache(unittest.TestCase):
+    def test_first_frame_renders_every_cell(self):
+        cells = list("abcdef")
+        cache, calls = make_cache(cells)
+        self.assertEqual(cache.frame(), [['a', 'b', 'c'], ['d', 'e', 'f']])
+        self.assertEqual(sorted(calls), list(range(6)))
+
+    def test_only_dirty_cells_are_rendered_again(self):
+        cells = list("abcdef")
+        cache, calls = make_cache(cells)
+        cache.frame()
+        calls.clear()
+        cells[4] = 'X'
+        cache.mark_dirty(4)
+        self.assertEqual(cache.frame(), [['a', 'b', 'c'], ['d', 'X', 'f']])
+        self.assertEqual(calls, [4])
+
+    def test_changes_since_version(self):
+        cells = list("abcdef")
+        cache, calls = make_cache(cells)
+        cache.frame()
+        start = cache.version
+        cells[0] = 'X'
+        cache.mark_dirty(0)
+        cache.mark_dirty(1)
+        self.assertEqual(cache.changes_since(start), {(0, 0): 'X'})
+        middle = cache.version
+        cells[5] = 'Y'
+        cache.mark_dirty(5)
+        self.assertEqual(cache.changes_since(middle), {(2, 1): 'Y'})
+        self.assertEqual(cache.changes_since(start), {(0, 0): 'X', (2, 1): 'Y'})
+        self.assertEqual(cache.changes_since(cache.version), {})
+
+    def test_old_versions_are_forgotten(self):
+        cells = list("abcdef")
+        cache, calls = make_cache(cells)
+        cache.frame()
+        for i in range(10):
+            cells[i % 6] = str(i)
+            cache.mark_dirty(i % 6)
+            cache.frame()
+        self.assertIsNone(cache.changes_since(0))
+        self.assertEqual(cache.changes_since(cache.version - 1), {(0, 1): '9'})
+
+    def test_to_string_matches_grid_to_string(self):
+        cells = list("ab def")
+        cache, calls = make_cache(cells)
+        self.assertEqual(cache.to_string(), grid_to_string(cache.frame()))
+        cells[2] = 'c'
+        cache.mark_dirty(2)
+        self.assertEqual(cache.to_string(), grid_to_string([['a', 'b', 'c'], ['d', 'e', 'f']]))
+
+    def test_level_reports_cells_changed_by_moves(self):
+        level = make_level()
+        character = Character("Nic")
+        level.add_character(character, Tile(5, 5))
+        version, changes = level.render_changes()
+        self.assertIsNone(changes)
+        self.assertEqual(level.render()[5][5], 'P')
+        level.move_occupant(character, Tile(6, 5))
+        version, changes = level.render_changes(version)
+        self.assertEqual(changes, {(5, 5): ' ', (6, 5): 'P'})
+        self.assertEqual(level.render_to_string(), grid_to_string(level.render()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from Snarl.src.Game.roomgraph import RoomGraph
+from Snarl.src.Game.geometry import build_geometry
+from Snarl.src.Game.level import Level
+from Snarl.src.Game.room import Room
+from Snarl.src.Game.hallway import Hallway
+from Snarl.src.Game.tile import Tile
+
+def make_rooms_and_hallways():
+    room1 = Room(Tile(0, 0), 10, 10, [Tile(3, 9), Tile(9, 5)], [Tile(5, 5), Tile(1, 1), Tile(2, 2)])
+    hallway1 = Hallway([], Tile(3, 9), Tile(3, 20))
+    room2 = Room(Tile(0, 20), 10, 10, [Tile(3, 20), Tile(9, 25)])
+    hallway2 = Hallway([Tile(12, 5), Tile(12, 2), Tile(15, 2)], Tile(9, 5), Tile(18, 2))
+    room3 = Room(Tile(18, 0), 5, 5, [Tile(18, 2)])
+    room4 = Room(Tile(30, 30), 5, 5, [Tile(30, 32)], [Tile(32, 32)])
+    room5 = Room(Tile(18, 22), 5, 5, [Tile(18, 25)])
+    hallway3 = Hallway([], Tile(9, 25), Tile(18, 25))
+    return [room1, room2, room3, room4, room5], [hallway1, hallway2, hallway3]
+
+class TestRoomGraph(unittest.TestCase):
+    def test_neighbors_follow_hallways(self):
+        rooms, hallways = make_rooms_and_hallways()
+        graph = RoomGraph(build_geometry(rooms, hallways, None, None), len(rooms), hallways)
+        self.assertEqual(graph.neighbors(0), (1, 2))
+        self.assertEqual(graph.neighbors(1), (0, 4))
+        self.assertEqual(graph.neighbors(3), ())
+        self.assertEqual(graph.hallway_rooms(1), (0, 2))
+
+    def test_components_split_disconnected_rooms(self):
+        rooms, hallways = make_rooms_and_hallways()
+        graph = RoomGraph(build_geometry(rooms, hallways, None, None), len(rooms), hallways)
+        self.assertEqual(graph.components(), ((0, 1, 2, 4), (3,)))
+        self.assertEqual(graph.component_rooms(4), (0, 1, 2, 4))
+        self.assertNotEqual(graph.component(0), graph.component(3))
+
+    def test_distance_counts_hallways(self):
+        rooms, hallways = make_rooms_and_hallways()
+        graph = RoomGraph(build_geometry(rooms, hallways, None, None), len(rooms), hallways)
+        self.assertEqual(graph.distance(0, 0), 0)
+        self.assertEqual(graph.distance(2, 4), 3)
+        self.assertEqual(graph.distance(4, 2), 3)
+        self.assertIsNone(graph.distance(0, 3))
+
+    def test_level_room_distance_and_connected_rooms(self):
+        rooms, hallways = make_rooms_and_hallways()
+        level = Level(rooms, hallways, Tile(1, 1), Tile(2, 2))
+        self.assertEqual(level.get_room_distance(Tile(1, 1), Tile(20, 24)), 2)
+        self.assertEqual(level.get_room_distance(Tile(12, 3), Tile(20, 2)), 1)
+        self.assertIsNone(level.get_room_distance(Tile(1, 1), Tile(32, 32)))
+        self.assertEqual(level.get_connected_rooms_from_tile(Tile(32, 32)), [[30, 30]])
+        self.assertEqual(level.get_room_components(), [[[0, 0], [20, 0], [0, 18], [22, 18]], [[30, 30]]])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -95,7 +95,7 @@ class TestRulechecker(unittest.TestCase):
         hallway1 = Hallway([Tile(3, 6), Tile(1, 6), Tile(1, 18), Tile(3, 18)], Tile(3, 4), Tile(3, 20))
         room2 = Room(Tile(0, 20), 5, 10, [Tile(3, 20)], [Tile(2, 22)])
         level = Level([room1, room2], [hallway1], Tile(2, 2), Tile(2, 22))
-        adv = Zombie()
+        adv = Zombie("zombie", 0)
         level.add_adversary(adv, Tile(1, 8))
         is_valid = rulechecker._is_valid_adversary_move(adv, Tile(1, 7), level)
         self.assertTrue(is_valid)
@@ -106,7 +106,7 @@ class TestRulechecker(unittest.TestCase):
         hallway1 = Hallway([Tile(3, 6), Tile(1, 6), Tile(1, 18), Tile(3, 18)], Tile(3, 4), Tile(3, 20))
         room2 = Room(Tile(0, 20), 5, 10, [Tile(3, 20)], [Tile(2, 22)])
         level = Level([room1, room2], [hallway1], Tile(2, 2), Tile(2, 22))
-        adv = Zombie()
+        adv = Zombie("zombie", 0)
         level.add_adversary(adv, Tile(1, 11))
         is_valid = rulechecker._is_valid_adversary_move(adv, Tile(1, 7), level)
         self.assertFalse(is_valid)
@@ -117,7 +117,7 @@ class TestRulechecker(unittest.TestCase):
         hallway1 = Hallway([Tile(3, 6), Tile(1, 6), Tile(1, 18), Tile(3, 18)], Tile(3, 4), Tile(3, 20))
         room2 = Room(Tile(0, 20), 5, 10, [Tile(3, 20)], [Tile(2, 22)])
         level = Level([room1, room2], [hallway1], Tile(2, 2), Tile(2, 22))
-        adv = Zombie()
+        adv = Zombie("zombie", 0)
         level.add_adversary(adv, Tile(0, 0))
         is_valid = rulechecker._is_valid_adversary_move(adv, Tile(1, 0), level)
         self.assertFalse(is_valid)
@@ -166,5 +166,49 @@ class TestRulechecker(unittest.TestCase):
         level_over = rulechecker.is_level_over(level)
         self.assertTrue(level_over)
 
+    def test_legal_moves_are_the_valid_player_moves(self):
+        rulechecker = Rulechecker()
+        room1 = Room(Tile(0, 0), 5, 5, [Tile(3, 4)], [Tile(1, 1), Tile(2, 1), Tile(1, 2), Tile(2, 2), Tile(3, 3)])
+        hallway1 = Hallway([Tile(3, 6), Tile(1, 6), Tile(1, 18), Tile(3, 18)], Tile(3, 4), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 5, 10, [Tile(3, 20)])
+        level = Level([room1, room2], [hallway1], Tile(1, 1), Tile(2, 1))
+        character = Character("char")
+        level.add_character(character, Tile(2, 2))
+        level.add_character(Character("other char"), Tile(1, 2))
+        valid = set()
+        for x in range(5):
+            for y in range(8):
+                try:
+                    if rulechecker.is_valid_move(character, Tile(x, y), level):
+                        valid.add((x, y))
+                except RuntimeError:
+                    pass
+        moves = rulechecker.legal_moves(character, level)
+        self.assertEqual([(tile.x, tile.y) for tile in moves], sorted(valid, key=lambda xy: (xy[1], xy[0])))
+        self.assertEqual(valid, {(2, 1), (1, 1), (2, 2), (3, 3)})
+
+    def test_legal_moves_for_zombie_are_cardinal_and_avoid_key_and_doors(self):
+        rulechecker = Rulechecker()
+        room1 = Room(Tile(0, 0), 5, 5, [Tile(2, 4)], [Tile(1, 1), Tile(2, 1), Tile(1, 2), Tile(2, 2), Tile(3, 2), Tile(2, 3)])
+        hallway1 = Hallway([], Tile(2, 4), Tile(2, 20))
+        room2 = Room(Tile(0, 20), 5, 10, [Tile(2, 20)], [Tile(2, 22)])
+        level = Level([room1, room2], [hallway1], Tile(2, 1), Tile(2, 22))
+        zombie = Zombie("zombie", 0)
+        level.add_adversary(zombie, Tile(2, 2))
+        level.add_character(Character("char"), Tile(3, 2))
+        moves = rulechecker.legal_moves(zombie, level)
+        self.assertEqual([(tile.x, tile.y) for tile in moves], [(2, 3), (3, 2), (1, 2)])
+        level.move_occupant(zombie, Tile(2, 3))
+        self.assertEqual([(tile.x, tile.y) for tile in rulechecker.legal_moves(zombie, level)], [(2, 2)])
+
+    def test_legal_moves_empty_when_entity_not_on_level(self):
+        rulechecker = Rulechecker()
+        room1 = Room(Tile(0, 0), 5, 5, [Tile(3, 4)], [Tile(1, 1), Tile(2, 2)])
+        hallway1 = Hallway([Tile(3, 6), Tile(1, 6), Tile(1, 18), Tile(3, 18)], Tile(3, 4), Tile(3, 20))
+        room2 = Room(Tile(0, 20), 5, 10, [Tile(3, 20)])
+        level = Level([room1, room2], [hallway1], Tile(1, 1), Tile(2, 2))
+        self.assertEqual(rulechecker.legal_moves(Character("char"), level), [])
+        self.assertEqual(rulechecker.legal_moves(Zombie("zombie", 0), level), [])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -107,7 +107,7 @@ class TestPosn(unittest.TestCase):
 
     def test_tile_renders_adversary_occupant(self):
         tile = Tile(0, 0)
-        tile.add_occupant(Zombie("I am a zombie"))
+        tile.add_occupant(Zombie("I am a zombie", 0))
         self.assertEqual(tile.render(), 'Z')
 
 
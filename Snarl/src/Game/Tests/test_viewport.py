@@ -0,0 +1,61 @@
+import unittest
+from Snarl.src.Game.level import Level
+from Snarl.src.Game.room import Room
+from Snarl.src.Game.hallway import Hallway
+from Snarl.src.Game.tile import Tile
+from Snarl.src.Game.occupants import Character, Block
+
+def make_level():
+    room1 = Room(Tile(0, 0), 5, 5, [Tile(3, 4)], [Tile(1, 2), Tile(2, 3), Tile(1, 1)])
+    hallway1 = Hallway([Tile(3, 6), Tile(1, 6), Tile(1, 18), Tile(3, 18)], Tile(3, 4), Tile(3, 20))
+    room2 = Room(Tile(0, 20), 5, 10, [Tile(3, 20)])
+    return Level([room1, room2], [hallway1], Tile(1, 2), Tile(2, 3))
+
+class TestViewport(unittest.TestCase):
+    def test_viewport_is_square_and_centered(self):
+        level = make_level()
+        view = level.get_viewport(Tile(2, 2), 2)
+        self.assertEqual(len(view), 5)
+        self.assertTrue(all(len(row) == 5 for row in view))
+        self.assertTrue(view[2][2].coordinates_equal(Tile(2, 2)))
+        self.assertTrue(view[0][0].coordinates_equal(Tile(0, 0)))
+
+    def test_viewport_pads_outside_of_level(self):
+        level = make_level()
+        view = level.get_viewport(Tile(0, 0), 2)
+        self.assertEqual(len(view), 5)
+        self.assertTrue(all(len(row) == 5 for row in view))
+        self.assertTrue(view[0][0].has_occupant(Block))
+        self.assertTrue(view[2][1].has_occupant(Block))
+        self.assertTrue(view[1][4].has_occupant(Block))
+        self.assertTrue(view[2][2].coordinates_equal(Tile(0, 0)))
+        self.assertTrue(view[4][4].coordinates_equal(Tile(2, 2)))
+
+    def test_changing_padding_changes_no_other_cell(self):
+        level = make_level()
+        view = level.get_viewport(Tile(0, 0), 2)
+        other = level.get_viewport(Tile(0, 0), 2)
+        view[0][0].occupants.clear()
+        self.assertIsNot(view[0][0], view[0][0])
+        self.assertTrue(view[0][0].has_occupant(Block))
+        self.assertTrue(view[0][1].has_occupant(Block))
+        self.assertTrue(other[0][0].has_occupant(Block))
+
+    def test_viewport_reads_current_level_state(self):
+        level = make_level()
+        view = level.get_viewport(Tile(1, 1), 1)
+        character = Character("Nic")
+        level.add_character(character, Tile(1, 1))
+        self.assertTrue(view[1][1].has_character())
+        self.assertFalse(view[1][0].has_character())
+
+    def test_viewport_rejects_cells_outside_of_window(self):
+        level = make_level()
+        view = level.get_viewport(Tile(1, 1), 1)
+        with self.assertRaises(IndexError):
+            view[3]
+        with self.assertRaises(IndexError):
+            view[0][3]
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,26 +3,29 @@ from .tile import Tile
 import sys
 from .actor import Actor
 from .utils import grid_to_string
-from .rulechecker import Rulechecker
 import json
+import random
 
 class Enemy(Actor):
     """Represents basic behavior for a SNARL enemy, including information about the entity
     that it plays in the game.
     """
-    def __init__(self, name : str, entity_type, entity_name, out = None):
+    def __init__(self, name : str, entity_type, entity_name, number: int, out = None, rng: random.Random = None):
         """ Initialize this Player with a name and a Character, aliased by a name. Initially,
         the player is not expelled and has no surroundings. These fields may be changed as
-        the game progresses.
+        the game progresses. Random moves are chosen with rng, which should be the random number
+        generator of the game this enemy plays in. The entity is given the number, to tell it
+        apart from the other entities of its type in the game.
         """
         if not type(name) == str:
             raise TypeError("Enemy Name must be a string!")
         self.name = name
-        self.entity = entity_type(entity_name)
+        self.entity = entity_type(entity_name, number)
         self.expelled = False
         self.state = None
         self.location = None
         self.out = out
+        self.rng = rng if rng is not None else random.Random()
     
     def notify(self, arg):
         """Updates this enemy with a notification of the form
@@ -51,21 +54,9 @@ class Enemy(Actor):
         return self.entity
 
     def _get_valid_cardinal_moves(self):
-        """Return the possible cardinal moves for this enemy.
+        """Return the possible cardinal moves for this enemy, or None if there are none.
         """
-        # If any coordinate is 0, can't move in that axis's negative direction.
-        up = Tile(self.location.x, self.location.y + 1)
-        right = Tile(self.location.x + 1, self.location.y)
-        cardinals = [up, right]
-        if (self.location.x > 0):
-            left = Tile(self.location.x - 1, self.location.y)
-            cardinals.append(left)
-        if (self.location.y > 0):
-            down = Tile(self.location.x, self.location.y - 1)
-            cardinals.append(down)
-        
-        valid = lambda t : Rulechecker().is_valid_move(self.entity, t, self.state.current_level)
-        valid_moves = list(filter(valid, cardinals))
+        valid_moves = self.state.rule_checker.legal_moves(self.entity, self.state.current_level)
         if valid_moves == []:
             return None
-        return valid_moves
\ No newline at end of file
+        return valid_moves
@@ -1,5 +1,4 @@
 import json
-import random
 import sys
 from .enemy import Enemy
 from .occupants import Ghost, Wall, Block, LevelKey, LevelExit
@@ -9,8 +8,8 @@ from .rulechecker import Rulechecker
 class EnemyGhost(Enemy):
     """Represents the controller of a Ghost in a SNARL game.
     """
-    def __init__(self, name : str, entity_name : str) -> None:
-        super().__init__(name, Ghost, entity_name)
+    def __init__(self, name : str, entity_name : str, number: int, rng = None) -> None:
+        super().__init__(name, Ghost, entity_name, number, rng = rng)
     
     def _determine_move(self):
         """ Determines what move this ghost should make depending on whether or not
@@ -42,12 +41,12 @@ class EnemyGhost(Enemy):
         
         # 3. remove moves that go right into a wall or block (in case we're in a hallway or at the edge of a room)
         valid_moves_not_walls = list(filter(lambda t: \
-            not self.state.current_level.get_tile(t).has_occupant(Block), \
+            not self.state.current_level.peek_tile(t).has_occupant(Block), \
                     valid_progressive_moves))
 
         # 4. if this leaves us with no moves, just move into the wall and hope for the best
         if len(valid_moves_not_walls) == 0:
-            return random.choice(valid_cardinal_moves)
+            return self.rng.choice(valid_cardinal_moves)
         
         # 5. if we are left with moves, pick the one that brings us closest to the player
         return sorted(valid_progressive_moves, key=dist_to_player)[0]
@@ -64,22 +63,7 @@ class EnemyGhost(Enemy):
     def _distance_to_closest_block(self, tile):
         """ Determine the distance between this tile and the closest block.
         """
-        left, right, up, down = float("inf"), float("inf"), float("inf"), float("inf")
-        width, height = self.state.current_level.calculate_level_dimensions()
-        for i in range(tile.x):
-            if self.state.get_tile(Tile(i, tile.y)).has_occupant(Block):
-                left = tile.x - i
-        for i in range(tile.y):
-            if self.state.get_tile(Tile(tile.x, i)).has_occupant(Block):
-                up = tile.y - i
-        for i in range(tile.x, width):
-            if self.state.get_tile(Tile(i, tile.y)).has_occupant(Block):
-                right = i - tile.x
-        for i in range(tile.y, height):
-            if self.state.get_tile(Tile(tile.x, i)).has_occupant(Block):
-                down = i - tile.y
-
-        return min(left, right, up, down)
+        return self.state.current_level.get_block_distance(tile)
 
     def _get_players_in_range(self):
         """Returns a list of the characters that are in the range (10 tiles) of this ghost.
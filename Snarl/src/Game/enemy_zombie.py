@@ -1,41 +1,43 @@
 from .enemy import Enemy
 from .occupants import Zombie
-import random
 from .rulechecker import Rulechecker
 from .tile import Tile
 
 class EnemyZombie(Enemy):
     """Represents the controller of a Zombie in a SNARL game.
     """
-    def __init__(self, name : str, entity_name : str) -> None:
-        super().__init__(name, Zombie, entity_name)
+    def __init__(self, name : str, entity_name : str, number: int, rng = None) -> None:
+        super().__init__(name, Zombie, entity_name, number, rng = rng)
     
     def _determine_move(self):
         """Determines what move this zombie should make depending on whether or not
-        the player is in the same room.
+        a player can be reached from the zombie's room.
         """
         if self.state is None or self.location is None:
             raise RuntimeError("Cannot get Zombie move before Zombie has game info!")
         
-        players_in_room = self._get_players_in_room()
-        move = None
-        if len(players_in_room) > 0:
-            # Move towards the closest player
-            move = self._get_move_to_player(players_in_room[0])
-        else:
+        # Move towards the closest player
+        move = self._get_move_to_player()
+        if move is None:
             # Move in a random valid direction.
             move = self._get_random_open_dir()
         
         return move
     
-    def _get_move_to_player(self, player_loc):
-        """Gets a move that is closer to the given player location but still valid.
+    def _get_move_to_player(self):
+        """Gets a valid move that follows the level's chase field towards the closest player, or
+        None if no player can be reached from here.
         """
+        field = self.state.current_level.get_chase_field()
+        if field.distance(self.location.x, self.location.y) is None:
+            return None
         valid_moves = self._get_valid_cardinal_moves()
-        if valid_moves == []:
+        if valid_moves is None:
+            return None
+        reachable = [move for move in valid_moves if field.distance(move.x, move.y) is not None]
+        if reachable == []:
             return None
-        dist_to_player = lambda t: player_loc.distance(t)
-        return sorted(valid_moves, key=dist_to_player)[0]
+        return min(reachable, key=lambda t: field.distance(t.x, t.y))
 
     def _get_random_open_dir(self):
         """Using the current state, return a tile that is a valid move in a random direction.
@@ -44,28 +46,4 @@ class EnemyZombie(Enemy):
         valid_moves = self._get_valid_cardinal_moves()
         if valid_moves == None:
             return None
-        return random.choice(valid_moves)
-
-    def _get_players_in_room(self):
-        """Returns a list of the characters that are in the same room as this zombie.
-        Returns an empty list if there are no such characters.
-        This list is sorted in ascending order by closest character.
-        """
-        characters = self.state.get_current_characters()
-        character_locs = []
-        for character in characters:
-            character_locs.append(self.state.get_entity_location(character))
-
-        rooms = self.state.current_level.rooms
-        my_room = None
-        for room in rooms:
-            if room.contains(self.location):
-                my_room = room
-                break
-        
-        chars_in_room = list(filter(lambda c : my_room.contains(c), character_locs))
-        # Get closest character in room
-        return sorted(chars_in_room, key=lambda c: c.distance(self.location))
-
-        
-        
\ No newline at end of file
+        return self.rng.choice(valid_moves)
@@ -0,0 +1,56 @@
+"""This file holds the FlowField class, which adversaries use to chase characters. A flow field
+stores, for every cell of a level, how many steps it takes to reach the closest of a set of
+target cells, so that an adversary can find its best move by looking at its neighbors.
+"""
+from array import array
+from collections import deque
+
+# Distance stored for cells from which no target can be reached.
+UNREACHED = -1
+
+class FlowField:
+    """Represents the distances from every cell of a level to the closest of a set of targets,
+    walking only through cardinal moves onto walkable cells. Built with a single breadth first
+    search started from every target at once.
+    """
+    def __init__(self, width: int, height: int, targets: list, walkable):
+        """Computes the field.
+
+        Arguments:
+            width (int): the width of the level.
+            height (int): the height of the level.
+            targets (list[tuple]): the (x, y) coordinates that the field leads to. Targets do not
+                need to be walkable themselves, and targets outside of the level are ignored.
+            walkable (bytes): one flag per cell, indexed by y * width + x, that is non-zero for
+                cells that may be walked through.
+        """
+        self.width = width
+        self.height = height
+        size = width * height
+        distances = array('i', [UNREACHED]) * size
+        queue = deque()
+        for x, y in targets:
+            if 0 <= x < width and 0 <= y < height and distances[y * width + x] == UNREACHED:
+                distances[y * width + x] = 0
+                queue.append(y * width + x)
+        while queue:
+            index = queue.popleft()
+            step = distances[index] + 1
+            x = index % width
+            for neighbor in (index - width if index >= width else None, \
+                    index + width if index + width < size else None, \
+                    index - 1 if x > 0 else None, \
+                    index + 1 if x < width - 1 else None):
+                if neighbor is not None and distances[neighbor] == UNREACHED and walkable[neighbor]:
+                    distances[neighbor] = step
+                    queue.append(neighbor)
+        self.distances = distances
+
+    def distance(self, x: int, y: int):
+        """Returns the number of steps from the given coordinates to the closest target, or None
+        if no target can be reached from them.
+        """
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        distance = self.distances[y * self.width + x]
+        return None if distance == UNREACHED else distance
@@ -1,3 +1,4 @@
+import itertools
 import random
 from .gamestate import Gamestate
 from .rulechecker import Rulechecker
@@ -17,7 +18,14 @@ from .observer import AbstractObserver
 import traceback
 
 class Gamemanager:
-    def __init__(self, max_players: int = 4, view_distance: int = 2, num_of_levels: int = 1, levels : list = []):
+    def __init__(self, max_players: int = 4, view_distance: int = 2, num_of_levels: int = 1, levels : list = None, \
+        seed = None):
+        """ Creates a Gamemanager for a game with the given levels. Every random choice made in the
+        game, such as where entities spawn and how enemies move, is made with the game's own random
+        number generator, seeded with the given seed, so games with the same seed and the same
+        moves from their players play out the same way. A Gamemanager keeps no state outside of
+        itself, so any number of games may be played side by side in one process.
+        """
         if view_distance >= 1:
             self.view_distance = view_distance
         else:
@@ -34,26 +42,34 @@ class Gamemanager:
             raise ValueError("Invalid number of players: " + str(max_players))
 
         self.rule_checker = Rulechecker()
+        self.rng = random.Random(seed)
+        # Number the zombies and ghosts of this game, so that their names are unique within it.
+        self.zombie_numbers = itertools.count()
+        self.ghost_numbers = itertools.count()
         # This is populated when the game is started.
         self.game_state = None
         self.turn_order = Turnorder([])
         self.current_turn = None
+        # The number of turns played so far, counting the turns of adversaries.
+        self.turns = 0
         self.player_list = []
         self.enemy_list = []
         self.observers = []
-        self.init_levels = levels
+        self.init_levels = levels if levels is not None else []
         self.level_num = 1
+        # The (x, y) position of each player when they were last sent their surroundings.
+        self.updated_positions = {}
 
     def start_game(self, level: Level):
         """ Begin the game by placing all the players in the top left room of the first level.
         """
         # Initialize game state and begin
-        self.game_state = Gamestate(level, len(self.player_list), 1, self.init_levels)
+        self.game_state = Gamestate(level, len(self.player_list), 1, self.init_levels, rng = self.rng)
         for player in self.player_list:
             spawn_tile = self.game_state.get_random_spawn_tile()
             self.game_state.add_character(player.entity, spawn_tile)
         # First level has one zombie and no ghosts
-        first_zombie = EnemyZombie("zombie", "zombie")
+        first_zombie = EnemyZombie("zombie", "zombie", next(self.zombie_numbers), self.rng)
         self.add_enemies(first_zombie)
         for enemy in self.enemy_list:
             enemy_spawn = self.game_state.get_random_spawn_tile()
@@ -123,18 +139,32 @@ class Gamemanager:
             raise RuntimeError("Attempted to get a move from a nonexistent enemy!")
         return current_enemy.move()
 
-    def _update_players(self):
+    def _update_players(self, only_changed: bool = False):
         """ Update all the players about changes to the Gamestate surrounding them. This
         happens every time any player moves or there is an interaction that could change
-        the way the level looks.
+        the way the level looks. If only_changed is True, players whose view could not have
+        changed since their last update are skipped.
         """
         if not self.game_state:
             raise RuntimeError("Cannot call update_players when the game has not started!")
+        touched = self.game_state.take_touched_cells()
         for player in self.player_list:
             # Do not update a player that has exited or been expelled from the level
             if not self.game_state.is_character_expelled(player.entity) and not \
                 player.entity in self.game_state.get_completed_characters():
-                self._update_player(player)
+                if not only_changed or self._is_view_changed(player, touched):
+                    self._update_player(player)
+
+    def _is_view_changed(self, player: Player, touched: set) -> bool:
+        """ Could the given player's view have changed since their last update, given the
+        coordinates of the cells touched since then? It has if the player moved, or if any
+        touched cell is within the player's view distance.
+        """
+        position = self.game_state.get_entity_location(player.entity)
+        if self.updated_positions.get(player) != (position.x, position.y):
+            return True
+        return any(abs(x - position.x) <= self.view_distance and abs(y - position.y) <= self.view_distance \
+            for x, y in touched)
 
     def _update_player(self, player: Player, update_grid = None):
         """Sends an update notification to a single player.
@@ -145,6 +175,8 @@ class Gamemanager:
             position = self.game_state.get_entity_location(player.entity)
         except:
             position = None
+        if position is not None:
+            self.updated_positions[player] = (position.x, position.y)
 
         tile1, tile2 = self.game_state.get_character_view_range(player.entity, self.view_distance)
         actors = self.game_state.actors_in_range(tile1, tile2)
@@ -189,8 +221,8 @@ class Gamemanager:
         else:
             self.current_turn.notify(self._format_move_result_notification(None, Moveresult.OK))
         # Notify players and adversaries of changes to the gamestate, including players who were killed
-        # on this turn. Note that this usually results in one rendering per move to all entities.
-        self._update_players()
+        # on this turn. Players whose view the move did not touch are not notified.
+        self._update_players(only_changed = True)
         self._update_adversaries()
         self._handle_completed_characters(completed_before_turn)
         self._handle_killed_players(pre_players)
@@ -339,9 +371,9 @@ class Gamemanager:
         zombies = []
         ghosts = []
         for i in range(math.floor(self.level_num / 2) + 1):
-            zombies.append(EnemyZombie("zombie", "zombie"))
+            zombies.append(EnemyZombie("zombie", "zombie", next(self.zombie_numbers), self.rng))
         for i in range(math.floor((self.level_num - 1) / 2)):
-            ghosts.append(EnemyGhost("ghost", "ghost"))
+            ghosts.append(EnemyGhost("ghost", "ghost", next(self.ghost_numbers), self.rng))
 
         # reset the turn order, update enemy_list, add enemies to gamestate
         self.turn_order = Turnorder([])
@@ -362,8 +394,10 @@ class Gamemanager:
         self._notify_level_start()
         self.current_turn = self.turn_order.next()
 
-    def run(self):
-        """ Main game loop.
+    def run(self, max_turns: int = None) -> bool:
+        """ Main game loop. If max_turns is given, the game is stopped once that many turns have
+        been played, counting the turns of adversaries, without telling the players it has ended.
+        Returns whether the game is over.
         """
         if not self.game_state:
             raise RuntimeError("Cannot call run when the game has not started!")
@@ -375,6 +409,8 @@ class Gamemanager:
         self._update_adversaries()
         self._notify_observers()
         while not self.rule_checker.is_game_over(self.game_state):
+            if max_turns is not None and self.turns >= max_turns:
+                return False
             valid_move = False
             while not valid_move:
                 try:
@@ -388,6 +424,8 @@ class Gamemanager:
                 self._next_level()
                 self._update_players()
                 self._update_adversaries()
+            self.turns += 1
             self._notify_observers()
         
         self._notify_players_endgame()
+        return True
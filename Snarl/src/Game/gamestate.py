@@ -1,21 +1,32 @@
+import copy
+import random
 from .rulechecker import Rulechecker
 from .level import Level
 from .tile import Tile
 from .room import Room
-from .occupants import Entity, Character, Adversary, Block, LevelExit, LevelKey
+from .viewport import Viewport
+from .occupants import Entity, Character, Adversary, LevelExit, LevelKey
+from .snapshot import GamestateSnapshot
 
 class Gamestate:
     """Represents the state of a SNARL game.
     """
-    def __init__(self, start_level: Level, num_of_players: int, num_of_adversaries: int, levels = [], characters = []):
+    def __init__(self, start_level: Level, num_of_players: int, num_of_adversaries: int, levels = None, characters = None, \
+        rng: random.Random = None):
         """ Creates a Gamestate with the given initial level and number of
-        players and adversaries to create the game with.
+        players and adversaries to create the game with. Every random choice made in the
+        game's levels is made with rng, which defaults to a new random number generator. The
+        levels that follow the initial one are popped from levels as the game goes.
         """
-        self.levels = levels
+        self.levels = levels if levels is not None else []
         self.current_level = start_level
+        self.rng = rng if rng is not None else random.Random()
+        for level in [start_level] + self.levels:
+            level.rng = self.rng
         self.num_levels_completed = 0
         self.rule_checker = Rulechecker()
-        self.characters = characters
+        # Every Gamestate needs its own list, since characters are added to it as the game goes.
+        self.characters = characters if characters is not None else []
         if num_of_players in range(1, 5):
             self.num_of_players = num_of_players
         else:
@@ -49,6 +60,12 @@ class Gamestate:
         """
         return self.current_level.get_tile(tile)
 
+    def take_touched_cells(self) -> set:
+        """Returns the coordinates of the cells of the current level that may have changed since
+        the last call, and forgets them.
+        """
+        return self.current_level.take_touched_cells()
+
     def get_tiles(self) -> list:
         """ Return the full array of tiles in the current level.
         """
@@ -59,33 +76,17 @@ class Gamestate:
         """
         return self.current_level.get_tiles_range(tile1, tile2)
     
-    def get_character_surroundings(self, character: Character, radius: int) -> list:
+    def get_character_surroundings(self, character: Character, radius: int) -> Viewport:
         """Return a square of the tiles around the given player in the given radius.
         This will provide padding if the character is close enough to an edge.
         """
-        tile1, tile2 = self.get_character_view_range(character, radius)
-        real_tiles = self.get_tiles_range(tile1, tile2)
-        loc = self.get_entity_location(character)
-        level_width, level_height = self.current_level.calculate_level_dimensions()
-
-        if loc.x - radius < 0:
-            for row in real_tiles:
-                row.insert(0, Tile(0, 0, [Block()]))
-        if level_width - (loc.x + radius + 1) < 0:
-            for row in real_tiles:
-                row.append(Tile(0, 0, [Block()]))
-        if loc.y - radius < 0:
-            real_tiles.insert(0, [Tile(0, 0, [Block()]) for tile in range(2*radius + 1)])
-        if level_height - (loc.y + radius +  1) < 0:
-            real_tiles.append([Tile(0, 0, [Block()]) for tile in range(2*radius + 1)])
-
-        return real_tiles
+        return self.current_level.get_viewport(self.get_entity_location(character), radius)
 
     def get_character_view_range(self, character: Character, radius: int):
         """ Get tiles on 2 corners of the rectangular view range of the character.
         """
         loc = self.current_level.locate_entity(character)
-        level_width, level_height = self.current_level.calculate_level_dimensions()
+        level_width, level_height = self.current_level.geometry.width, self.current_level.geometry.height
         minx = max(0, loc.x - radius)
         maxx = min(level_width, loc.x + radius)
         miny = max(0, loc.y - radius)
@@ -164,34 +165,70 @@ class Gamestate:
         """
         return self.current_level.render()
 
+    def render_to_string(self) -> str:
+        """ Renders the current level as utils.grid_to_string would format the result of render().
+        """
+        return self.current_level.render_to_string()
+
     def objects_in_range(self, t1: Tile, t2: Tile) -> list:
         """ Returns all the objects in the range between the two provided tiles.
         """
-        objects = []
-        tile_list = self.current_level.get_tiles_range(t1, t2)
-        for row in tile_list:
-            for tile in row:
-                if tile.has_occupant(LevelKey):
-                    objects.append((tile, LevelKey()))
-                elif tile.has_occupant(LevelExit):
-                    objects.append((tile, LevelExit()))
-        return objects
+        level = self.current_level
+        objects = [(tile, obj) for tile, obj in ((level.get_level_key(), LevelKey()), \
+            (level.get_level_exit(), LevelExit())) if tile is not None and self._in_range(tile, t1, t2)]
+        return sorted(objects, key=lambda pair: (pair[0].y, pair[0].x))
 
     def actors_in_range(self, t1: Tile, t2: Tile) -> list:
         """ Returns all the actors in the range between the two provided tiles.
         """
         actors = []
-        tile_list = self.current_level.get_tiles_range(t1, t2)
-        for row in tile_list:
-            for tile in row:
-                for occ in tile.occupants:
-                    if isinstance(occ, Entity):
-                        actors.append((tile, occ))
+        for tile in self.current_level.get_stored_tiles_range(t1, t2):
+            for occ in tile.occupants:
+                if isinstance(occ, Entity):
+                    actors.append((tile, occ))
         return actors
+
+    def _in_range(self, tile: Tile, t1: Tile, t2: Tile) -> bool:
+        """ Is the given tile inside of the rectangle between the two provided tiles?
+        """
+        return min(t1.x, t2.x) <= tile.x <= max(t1.x, t2.x) and min(t1.y, t2.y) <= tile.y <= max(t1.y, t2.y)
     
     def get_level_unlocked_by(self):
         """Return the character who unlocked the current level, or None if the level
         is not unlocked.
         """
         if self.current_level.level_exit_unlocked:
-            return self.current_level.unlocked_by
\ No newline at end of file
+            return self.current_level.unlocked_by
+
+    def snapshot(self) -> GamestateSnapshot:
+        """Returns a GamestateSnapshot of this game, which restore can later bring it back to. The
+        levels left to play are included, since playing on past the current level changes them.
+        """
+        return GamestateSnapshot(self.current_level, list(self.levels), \
+            {level: level.snapshot() for level in [self.current_level] + self.levels}, \
+            self.num_levels_completed, list(self.characters), self.rng.getstate())
+
+    def restore(self, snapshot: GamestateSnapshot):
+        """Brings this game back to the given snapshot of it, including the state of its random
+        number generator. The snapshot may be restored any number of times.
+        """
+        self.current_level = snapshot.current_level
+        self.levels = list(snapshot.levels)
+        for level, level_snapshot in snapshot.level_snapshots.items():
+            level.restore(level_snapshot)
+        self.num_levels_completed = snapshot.num_levels_completed
+        self.characters = list(snapshot.characters)
+        self.rng.setstate(snapshot.rng_state)
+
+    def fork(self):
+        """Returns a copy of this game that can be played without changing this one, such as to
+        try out moves. The copy shares the geometry of every level and the entities in the game,
+        and has its own random number generator, which starts in the state this game's is in.
+        """
+        fork = copy.copy(self)
+        fork.rng = random.Random()
+        fork.rng.setstate(self.rng.getstate())
+        fork.current_level = self.current_level.fork(fork.rng)
+        fork.levels = [level.fork(fork.rng) for level in self.levels]
+        fork.characters = list(self.characters)
+        return fork
@@ -0,0 +1,204 @@
+"""This file holds the LevelGeometry class, which is the part of a level that never changes once
+the level has been built, along with the functions used to build it from rooms and hallways.
+"""
+from array import array
+from typing import NamedTuple
+from .terrain import Terrain
+
+# Region id of cells that are in no room and no hallway. Cells in a room hold the room's index in
+# the level's room list, and cells in a hallway hold -(index + 2) of the hallway in the hallway list.
+VOID_REGION = -1
+
+class LevelGeometry(NamedTuple):
+    """Represents the static layout of a SNARL level: its dimensions, the terrain of every cell,
+    the coordinates of its doors and the coordinates of its key and exit. A LevelGeometry is built
+    once, when its Level is created, and is never modified afterwards.
+
+    The terrain is stored as one Terrain code per cell, indexed by y * width + x. The regions
+    tuple uses the same indexing and holds the id of the room or hallway each cell belongs to.
+    Coordinates are (x, y) tuples.
+    """
+    width: int
+    height: int
+    terrain: bytes
+    regions: tuple
+    doors: tuple
+    key: tuple
+    exit: tuple
+
+    def contains(self, x: int, y: int) -> bool:
+        """Are the given coordinates inside of this level?
+        """
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def cell_index(self, x: int, y: int) -> int:
+        """Returns the index into self.terrain of the given coordinates.
+        """
+        if not self.contains(x, y):
+            raise IndexError(f"Coordinates ({x}, {y}) are outside of the level.")
+        return y * self.width + x
+
+    def terrain_at(self, x: int, y: int) -> int:
+        """Returns the terrain code at the given coordinates.
+        """
+        return self.terrain[self.cell_index(x, y)]
+
+    def room_index_at(self, x: int, y: int):
+        """Returns the index of the room containing the given coordinates, or None if they are
+        not inside of a room. Coordinates outside of the level are in no room.
+        """
+        if not self.contains(x, y):
+            return None
+        region = self.regions[y * self.width + x]
+        return region if region >= 0 else None
+
+    def hallway_index_at(self, x: int, y: int):
+        """Returns the index of the hallway containing the given coordinates, or None if they are
+        not inside of a hallway. Coordinates outside of the level are in no hallway.
+        """
+        if not self.contains(x, y):
+            return None
+        region = self.regions[y * self.width + x]
+        return -region - 2 if region < VOID_REGION else None
+
+def level_dimensions(rooms: list, hallways: list):
+    """Returns a tuple (width, height) of a level's dimensions, determined by
+    the maximum coordinates needed by all of the level's rooms and hallways.
+    """
+    max_width = 0
+    max_height = 0
+    for room in rooms:
+        room_max_x = room.position.x + room.width
+        room_max_y = room.position.y + room.height
+        if max_width < room_max_x:
+            max_width = room_max_x
+        if max_height < room_max_y:
+            max_height = room_max_y
+
+    for hall in hallways:
+        for point in hall.waypoints:
+            if max_width < point.x:
+                max_width = point.x
+            if max_height < point.y:
+                max_height = point.y
+
+    return max_width, max_height
+
+def build_geometry(rooms: list, hallways: list, key_loc, exit_loc) -> LevelGeometry:
+    """Rasterizes the given rooms and hallways into a LevelGeometry.
+
+    Arguments:
+        rooms (list[Room]): the rooms of the level.
+        hallways (list[Hallway]): the hallways of the level.
+        key_loc (Tile): the location of the level key, or None.
+        exit_loc (Tile): the location of the level exit, or None.
+
+    Returns:
+        geometry (LevelGeometry): the static layout of the level.
+    """
+    width, height = level_dimensions(rooms, hallways)
+    terrain = bytearray([Terrain.VOID]) * (width * height)
+    regions = array('i', [VOID_REGION]) * (width * height)
+    doors = []
+    for room in rooms:
+        _rasterize_room(terrain, width, room)
+        doors.extend((door.x, door.y) for door in room.get_room_doors())
+    for i, hall in enumerate(hallways):
+        for j in range(0, len(hall.waypoints) - 1):
+            _rasterize_hallway_segment(terrain, regions, width, height, hall.waypoints[j], \
+                hall.waypoints[j + 1], -i - 2)
+    # Rooms are written last so that they take precedence over any hallway touching them.
+    for i, room in enumerate(rooms):
+        for y in range(room.position.y, room.position.y + room.height):
+            row = y * width
+            regions[row + room.position.x:row + room.position.x + room.width] = array('i', [i]) * room.width
+
+    key = (key_loc.x, key_loc.y) if key_loc else None
+    exit = (exit_loc.x, exit_loc.y) if exit_loc else None
+    return LevelGeometry(width, height, bytes(terrain), tuple(regions), tuple(doors), key, exit)
+
+def _rasterize_room(terrain: bytearray, width: int, room):
+    """Writes the walls, doors, and open tiles of the given room into terrain.
+    """
+    x_min, y_min = room.position.x, room.position.y
+    x_max, y_max = x_min + room.width - 1, y_min + room.height - 1
+    for y in range(y_min, y_max + 1):
+        row = y * width
+        if y == y_min or y == y_max:
+            terrain[row + x_min:row + x_max + 1] = bytes([Terrain.HORIZONTAL_WALL]) * room.width
+            continue
+        terrain[row + x_min] = Terrain.VERTICAL_WALL
+        terrain[row + x_max] = Terrain.VERTICAL_WALL
+        if room.width > 2:
+            terrain[row + x_min + 1:row + x_max] = bytes([Terrain.BLOCK]) * (room.width - 2)
+    for door in room.get_room_doors():
+        terrain[door.y * width + door.x] = Terrain.DOOR
+    for tile in room.get_open_tiles():
+        terrain[tile.y * width + tile.x] = Terrain.FLOOR
+
+def _rasterize_hallway_segment(terrain: bytearray, regions: array, width: int, height: int, start, end, region: int):
+    """Writes a single segment of a hallway into terrain and regions, given the start and end
+    coordinates and the hallway's region id. Does not require that start coordinates are less
+    than end coordinates.
+    """
+    y_min = min(start.y, end.y)
+    y_max = max(start.y, end.y)
+    x_min = min(start.x, end.x)
+    x_max = max(start.x, end.x)
+    for y in range(y_min, y_max + 1):
+        for x in range(x_min, x_max + 1):
+            if not (0 <= x < width and 0 <= y < height):
+                raise IndexError(f"Hallway coordinates ({x}, {y}) are outside of the level.")
+            terrain[y * width + x] = Terrain.FLOOR
+            regions[y * width + x] = region
+
+def terrain_mask(geometry: LevelGeometry, codes) -> bytes:
+    """Returns one flag per cell of the level, indexed by y * width + x, that is 1 for the cells
+    whose terrain is one of the given Terrain codes and 0 for every other cell.
+    """
+    table = bytearray(256)
+    for code in codes:
+        table[code] = 1
+    return geometry.terrain.translate(table)
+
+def block_distances(geometry: LevelGeometry) -> array:
+    """Computes, for every cell of the level, the value that a scan along the cell's row and
+    column gives for the distance to a block, where walls and cells outside of every room and
+    hallway count as blocks. The scan takes the closest block to the left of and above the cell,
+    and the farthest block at or to the right of and at or below the cell, and returns the
+    smallest of those four distances. Cells with no block in their row or column hold infinity.
+    This is not the distance to the nearest block: it is the value the ghost's original scan gave,
+    kept so that ghosts move as they always have.
+
+    Returns:
+        distances (array): one distance per cell, indexed by y * width + x.
+    """
+    width, height = geometry.width, geometry.height
+    is_block = [code not in (Terrain.DOOR, Terrain.FLOOR) for code in geometry.terrain]
+    inf = float("inf")
+    distances = array('d', [inf]) * (width * height)
+    for y in range(height):
+        row = y * width
+        blocks = [x for x in range(width) if is_block[row + x]]
+        last = blocks[-1] if blocks else -1
+        before = None
+        for x in range(width):
+            best = x - before if before is not None else inf
+            if last >= x:
+                best = min(best, last - x)
+            distances[row + x] = best
+            if is_block[row + x]:
+                before = x
+    for x in range(width):
+        blocks = [y for y in range(height) if is_block[y * width + x]]
+        last = blocks[-1] if blocks else -1
+        before = None
+        for y in range(height):
+            index = y * width + x
+            if before is not None:
+                distances[index] = min(distances[index], y - before)
+            if last >= y:
+                distances[index] = min(distances[index], last - y)
+            if is_block[index]:
+                before = y
+    return distances
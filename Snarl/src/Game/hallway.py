@@ -106,12 +106,8 @@ class Hallway:
         """ Does the row of tiles between w1 and w2 intersect with the row of tiles
         between p1 and p2?
         """
-        w_x = range(min(w1.x, w2.x), max(w1.x, w2.x) + 1)
-        w_y = range(min(w1.y, w2.y), max(w1.y, w2.y) + 1)
-        p_x = range(min(p1.x, p2.x), max(p1.x, p2.x) + 1)
-        p_y = range(min(p1.y, p2.y), max(p1.y, p2.y) + 1)
-        xflag = set(w_x).intersection(set(p_x)) != set()
-        yflag = set(w_y).intersection(set(p_y)) != set()
+        xflag = max(min(w1.x, w2.x), min(p1.x, p2.x)) <= min(max(w1.x, w2.x), max(p1.x, p2.x))
+        yflag = max(min(w1.y, w2.y), min(p1.y, p2.y)) <= min(max(w1.y, w2.y), max(p1.y, p2.y))
         return xflag and yflag
 
     def contains(self, tile: Tile) -> bool:
@@ -120,7 +116,8 @@ class Hallway:
         for i in range(0, len(self.waypoints) - 1):
             this_w = self.waypoints[i]
             next_w = self.waypoints[i + 1]
-            if self._does_segment_intersect(this_w, next_w, tile, tile):
+            if min(this_w.x, next_w.x) <= tile.x <= max(this_w.x, next_w.x) and \
+                min(this_w.y, next_w.y) <= tile.y <= max(this_w.y, next_w.y):
                 return True
                 
         return False
\ No newline at end of file
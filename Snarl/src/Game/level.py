@@ -1,9 +1,17 @@
-import itertools
+import copy
 import random
 from .room import Room
 from .hallway import Hallway
 from .occupants import Adversary, Character, Block, LevelKey, LevelExit, Occupant, Ghost, Door
 from .tile import Tile
+from .terrain import Terrain, TERRAIN_GLYPHS, terrain_occupants
+from .geometry import build_geometry, block_distances, terrain_mask
+from .roomgraph import RoomGraph
+from .overlaps import find_overlaps, ROOMS_INTERSECT, HALLWAYS_INTERSECT
+from .flowfield import FlowField
+from .viewport import Viewport
+from .rendercache import RenderCache
+from .snapshot import LevelSnapshot
 
 class Level:
     """Represents a SNARL Level.
@@ -24,76 +32,107 @@ class Level:
         self.completed_characters = []
         self.adversaries = {}
         self.level_exit_unlocked = False
+        # The random number generator of the game this level is played in, set by its Gamestate.
+        self.rng = random.Random()
 
-        if self._any_overlaps():
-            raise ValueError("There are overlapping rooms or hallways in this level.")
+        overlaps = find_overlaps(self.rooms, self.hallways)
+        if overlaps:
+            raise ValueError("There are overlapping rooms or hallways in this level: " + \
+                "; ".join(self._describe_overlap(overlap) for overlap in overlaps))
         if not self._are_hallways_connected_to_doors():
             raise ValueError("There are disconnected hallways on this level.")
 
         self.key_location = key_loc
         self.exit_location = exit_loc
         self._update_tiles()
-        if self.get_tile(key_loc).has_block() or self.get_tile(key_loc).has_occupant(Door):
+        self.room_graph = RoomGraph(self.geometry, len(self.rooms), self.hallways)
+        # The cells a zombie may walk on, before the level key and exit are taken out of them.
+        self._floor_mask = terrain_mask(self.geometry, [Terrain.FLOOR])
+        self._chase_field = None
+        self._chase_field_state = None
+        self._block_distances = None
+        if self.peek_tile(key_loc).has_block() or self.peek_tile(key_loc).has_occupant(Door):
             raise RuntimeError("Invalid key location. Cannot place a key on a block or a door.")
-        if self.get_tile(exit_loc).has_block() or self.get_tile(exit_loc).has_occupant(Door):
+        if self.peek_tile(exit_loc).has_block() or self.peek_tile(exit_loc).has_occupant(Door):
             raise RuntimeError("Invalid exit location. Cannot place an exit on a block or a door.")
         if exit_loc.coordinates_equal(key_loc):
             raise RuntimeError("Cannot have the exit and the key located on the same tile.")
 
-    def render(self) -> str:
+    def render(self) -> list:
         """Renders an ASCII representation of this level. Each coordinate in the level
-        corresponds to a single ASCII character. Stores this grid of characters in self.rendered_tiles.
+        corresponds to a single ASCII character. Only the cells changed since the last render
+        are rendered again; see RenderCache.
 
         Returns:
             rendered_tiles (list[list[character]]): A 2D list storing each character representing the level.
                 Each element of the outer list contains a single row.
         """
-        width, height = self.calculate_level_dimensions()
-        rendered_tiles = [['X' for x in range(width)] for y in range(height)]
-        # Render rooms
-        for y in range(height):
-            for x in range(width):
-                rendered_tiles[y][x] = self.tiles[y][x].render()
+        return [list(row) for row in self.render_cache.frame()]
 
-        return rendered_tiles
+    def render_to_string(self) -> str:
+        """Renders this level as utils.grid_to_string would format the result of render().
+        """
+        return self.render_cache.to_string()
+
+    def render_changes(self, version: int = None):
+        """Returns a tuple (version, changes) of the current version of this level's rendered
+        frame and the cells that changed after the given version, as a dictionary mapping (x, y)
+        coordinates to characters. Changes are None if no version is given or the given version
+        is too old, in which case render() should be used to get the whole frame.
+        """
+        changes = None if version is None else self.render_cache.changes_since(version)
+        return self.render_cache.version, changes
+
+    def _render_cell(self, index: int) -> str:
+        """Renders the cell at the given index of the level's terrain.
+        """
+        stored = self.occupied_tiles.get(index)
+        if stored is not None:
+            return stored.render()
+        return TERRAIN_GLYPHS[self.geometry.terrain[index]]
 
     def get_tiles(self) -> list:
-        """ Return the array of tiles.
+        """ Return the array of tiles. Tiles that hold nothing but terrain are built on the fly,
+        so only use the result for reading; use get_tile to change the contents of a tile.
         """
-        return self.tiles.copy()
+        return self._build_tiles(0, 0, self.geometry.width, self.geometry.height)
 
     def get_tiles_range(self, tile1: Tile, tile2: Tile) -> list:
         """ Return the rectangle of tiles between the specified tiles.
         """
-        width, height = self.calculate_level_dimensions()
+        width, height = self.geometry.width, self.geometry.height
         min_x = max(min(tile1.x, tile2.x), 0)
         min_y = max(min(tile1.y, tile2.y), 0)
         max_x = min(max(tile1.x, tile2.x) + 1, width)
         max_y = min(max(tile1.y, tile2.y) + 1, height)
-        return [row[min_x:max_x] for row in self.get_tiles()[min_y:max_y]]
+        return self._build_tiles(min_x, min_y, max_x, max_y)
+
+    def get_stored_tiles_range(self, tile1: Tile, tile2: Tile) -> list:
+        """ Return the stored Tiles in the rectangle between the specified tiles, row by row. Tiles
+        that hold nothing but terrain are not stored, so these are the only tiles in the rectangle
+        that can hold entities, and they are found without building the others.
+        """
+        min_x, max_x = min(tile1.x, tile2.x), max(tile1.x, tile2.x)
+        min_y, max_y = min(tile1.y, tile2.y), max(tile1.y, tile2.y)
+        return [self.occupied_tiles[index] for index in sorted(self.occupied_tiles) \
+            if min_x <= self.occupied_tiles[index].x <= max_x and min_y <= self.occupied_tiles[index].y <= max_y]
+
+    def get_viewport(self, center: Tile, radius: int) -> Viewport:
+        """ Return a read-only square window of the tiles within the given radius of the center
+        tile. Cells of the window that are outside of the level are padded with blocks.
+        """
+        return Viewport(self.geometry, self._peek, center.x - radius, center.y - radius, 2 * radius + 1)
+
+    def _build_tiles(self, min_x, min_y, max_x, max_y) -> list:
+        """ Build the rectangle of tiles from (min_x, min_y) inclusive to (max_x, max_y) exclusive.
+        """
+        return [[self._peek(x, y) for x in range(min_x, max_x)] for y in range(min_y, max_y)]
 
     def calculate_level_dimensions(self):
         """Returns a tuple (width, height) of the level's dimensions, determined by
         the maximum coordinates needed by all of the level's rooms and hallways.
         """
-        max_width = 0
-        max_height = 0
-        for room in self.rooms:
-            room_max_x = room.position.x + room.width
-            room_max_y = room.position.y + room.height
-            if max_width < room_max_x:
-                max_width = room_max_x
-            if max_height < room_max_y:
-                max_height = room_max_y
-
-        for hall in self.hallways:
-            for point in hall.waypoints:
-                if max_width < point.x:
-                    max_width = point.x
-                if max_height < point.y:
-                    max_height = point.y
-        
-        return max_width, max_height
+        return self.geometry.width, self.geometry.height
     
     def locate_entity(self, occupant: Occupant) -> Tile:
         """ Locate the given occupant on the current level if it is a Character or Adversary.
@@ -109,22 +148,70 @@ class Level:
         """ Move the given occupant to the given destination if it is a Character or Adversary.
         """
         if isinstance(occupant, Adversary):
-            self.get_tile(self.adversaries[occupant]).remove_occupant(occupant)
-            self.get_tile(dest).occupants.append(occupant)
-            self.adversaries[occupant] = self.get_tile(dest)
+            self._remove_from_tile(occupant)
+            stored = self.get_tile(dest)
+            stored.occupants.append(occupant)
+            self.adversaries[occupant] = stored
         elif isinstance(occupant, Character):
-            self.get_tile(self.characters[occupant]).remove_occupant(occupant)
-            self.get_tile(dest).occupants.append(occupant)
-            self.characters[occupant] = self.get_tile(dest)
+            self._remove_from_tile(occupant)
+            stored = self.get_tile(dest)
+            stored.occupants.append(occupant)
+            self.characters[occupant] = stored
         else:
             raise RuntimeError("You can't move something that isn't a Character or an Adversary!")
-        self.interact(self.get_tile(dest))
+        self.interact(stored)
 
     def get_tile(self, tile: Tile) -> Tile:
         """ Given a tile, returns the actual Tile object in the grid associated with the same
-        indices as the passed tile.
+        indices as the passed tile, so that it can be changed. Changes made to the returned Tile
+        are kept by the level, and the cell is rendered again. Use peek_tile to only read a tile.
         """
-        return self.tiles[tile.y][tile.x]
+        index = self.geometry.cell_index(tile.x, tile.y)
+        # The returned tile may be changed, so the cell must be rendered again.
+        self.render_cache.mark_dirty(index)
+        self.touched_cells.add(index)
+        stored = self.occupied_tiles.get(index)
+        if stored is None:
+            stored = Tile(tile.x, tile.y, terrain_occupants(self.geometry.terrain[index]))
+            self.occupied_tiles[index] = stored
+        return stored
+
+    def take_touched_cells(self) -> set:
+        """ Returns the (x, y) coordinates of every cell whose Tile may have been changed through
+        get_tile since the last call, and forgets them.
+        """
+        touched = {divmod(index, self.geometry.width)[::-1] for index in self.touched_cells}
+        self.touched_cells = set()
+        return touched
+
+    def peek_tile(self, tile: Tile) -> Tile:
+        """ Given a tile, returns a Tile holding the contents of the level at the same indices,
+        without storing a new Tile in the level. The result must not be modified.
+        """
+        return self._peek(tile.x, tile.y)
+
+    def get_terrain(self, tile: Tile) -> Terrain:
+        """ Returns the terrain code of the level at the given tile's coordinates.
+        """
+        return Terrain(self.geometry.terrain_at(tile.x, tile.y))
+
+    def _peek(self, x: int, y: int) -> Tile:
+        """ Returns the stored Tile at (x, y) if there is one, otherwise a new Tile built from
+        the terrain at (x, y).
+        """
+        index = self.geometry.cell_index(x, y)
+        stored = self.occupied_tiles.get(index)
+        if stored is None:
+            return Tile(x, y, terrain_occupants(self.geometry.terrain[index]))
+        return stored
+
+    def _forget_tile(self, tile: Tile):
+        """ Stops storing the Tile at the given coordinates if it holds nothing but terrain.
+        """
+        index = self.geometry.cell_index(tile.x, tile.y)
+        stored = self.occupied_tiles.get(index)
+        if stored is not None and all(isinstance(occ, (Block, Door)) for occ in stored.occupants):
+            self.occupied_tiles.pop(index)
 
     def interact(self, dest: Tile):
         """Triggers any necessary interactions between the occupants of this tile. The interactions
@@ -133,12 +220,13 @@ class Level:
         2. Character + Adversary = kill the player
         3. Character + Exit and level unlocked = complete the level
         """
-        has_player = self.get_tile(dest).has_character()
-        has_adv = self.get_tile(dest).has_adversary()
-        has_ghost = self.get_tile(dest).has_occupant(Ghost)
-        has_key = self.get_tile(dest).has_occupant(LevelKey)
-        has_exit = self.get_tile(dest).has_occupant(LevelExit)
-        has_block = self.get_tile(dest).has_block()
+        tile = self.peek_tile(dest)
+        has_player = tile.has_character()
+        has_adv = tile.has_adversary()
+        has_ghost = tile.has_occupant(Ghost)
+        has_key = tile.has_occupant(LevelKey)
+        has_exit = tile.has_occupant(LevelExit)
+        has_block = tile.has_block()
         
         characters = self._get_characters_on_tile(dest)
         if has_player and has_adv:
@@ -155,20 +243,20 @@ class Level:
                 self.characters.pop(character)
 
         if has_ghost and has_block:
-            self._teleport_ghost(self.get_tile(dest).get_adversary())
+            self._teleport_ghost(tile.get_adversary())
 
     def _get_characters_on_tile(self, dest):
         """Gets any characters that are present on the tile.
         """
-        return [occupant for occupant in self.get_tile(dest).occupants if isinstance(occupant, Character)]
+        return [occupant for occupant in self.peek_tile(dest).occupants if isinstance(occupant, Character)]
 
     def _teleport_ghost(self, ghost):
         """ Teleport the ghost on the provided tile to a random tile in a random room.
         """
         room_tiles = list(map(lambda r: self._ghost_friendly_tiles(r), self.rooms))
         acceptable_rooms_tiles = list(filter(lambda r: r != [], room_tiles))
-        chosen_room = random.choice(acceptable_rooms_tiles)
-        chosen_tile = random.choice(chosen_room)
+        chosen_room = self.rng.choice(acceptable_rooms_tiles)
+        chosen_tile = self.rng.choice(chosen_room)
         self.move_occupant(ghost, chosen_tile)
 
     def random_spawn_tile(self):
@@ -178,8 +266,8 @@ class Level:
         acceptable_rooms_tiles = list(filter(lambda r: r != [], room_tiles))
         if acceptable_rooms_tiles == []:
             raise RuntimeError("No suitable spawn rooms found!")
-        chosen_room = random.choice(acceptable_rooms_tiles)
-        chosen_tile = random.choice(chosen_room)
+        chosen_room = self.rng.choice(acceptable_rooms_tiles)
+        chosen_tile = self.rng.choice(chosen_room)
         return chosen_tile
 
     def _spawn_friendly_tiles(self, room):
@@ -187,7 +275,7 @@ class Level:
         """
         friendly_tiles = []
         for t in room.get_open_tiles():
-            tile = self.get_tile(t)
+            tile = self.peek_tile(t)
             if not tile.has_occupant(Adversary) and not tile.has_occupant(Block) and not \
                  tile.has_occupant(LevelKey) and not tile.has_occupant(LevelExit) and not \
                      tile.has_character() and not tile.has_occupant(Door):
@@ -202,7 +290,7 @@ class Level:
         """
         friendly_tiles = []
         for t in room.get_open_tiles():
-            tile = self.get_tile(t)
+            tile = self.peek_tile(t)
             if not tile.has_occupant(Adversary) and not tile.has_occupant(Block) and not \
                  tile.has_occupant(LevelKey) and not tile.has_occupant(LevelExit):
                  friendly_tiles.append(t)
@@ -214,12 +302,14 @@ class Level:
         """
         loc = self.locate_entity(occ) if tile is None else tile
         self.get_tile(loc).remove_occupant(occ)
+        self._forget_tile(loc)
 
     def unlock_level_exit(self):
         """Unlocks the level exit tile.
         """
         self.level_exit_unlocked = True
         self._remove_from_tile(LevelKey(), self.key_location)
+        self.object_locations.pop(LevelKey, None)
 
     def set_level_exit_status(self, status: bool):
         """Sets whether or not the level exit is unlocked.
@@ -235,14 +325,16 @@ class Level:
         """
         if character in set(self.characters.keys()):
             raise ValueError("Cannot have duplicate characters!")
-        self.characters[character] = self.get_tile(location)
-        self.get_tile(location).add_occupant(character)
+        stored = self.get_tile(location)
+        self.characters[character] = stored
+        stored.add_occupant(character)
 
     def add_adversary(self, adversary: Adversary, location: Tile):
         """ Adds an adversary to this level at the specified location.
         """
-        self.adversaries[adversary] = self.get_tile(location)
-        self.get_tile(location).add_occupant(adversary)
+        stored = self.get_tile(location)
+        self.adversaries[adversary] = stored
+        stored.add_occupant(adversary)
 
     def get_top_left_room(self) -> Room:
         """ Get the top left room of this Level. Note that this function takes
@@ -251,69 +343,20 @@ class Level:
         return sorted(self.rooms.copy())[0]
 
     def _any_overlaps(self) -> bool:
-        """Do any two rooms/hallways overlap with each other? Uses 4 checks to verify this:
-           - For all pairs of 2 rooms, do the rooms intersect? If yes for any, return true.
-           - For all waypoints, is the waypoint inside of a room? If yes for any, return true.
-           - For all consecutive pairs of waypoints, does the line between them intersect with
-             a line made by another pair of consecutive waypoints? If yes for any, return true.
-           - For all consecutive pairs of waypoints, does the segment they form intersect with
-             a room? If yes for any, return true.
-        """
-        # 1st check:
-        any_room_intersections = self._do_any_rooms_intersect()
-        # 2nd check:
-        any_hallways_inside_rooms = self._do_any_hallways_intersect_rooms()
-        # 3rd check:
-        any_hallways_intersect_hallways = self._do_any_hallways_intersect_hallways()
-        # 4th check:
-        does_hallway_straddle_room = self._does_any_hallway_straddle_room()
-
-        return any_room_intersections or any_hallways_inside_rooms or \
-            any_hallways_intersect_hallways or does_hallway_straddle_room
-    
-    def _do_any_rooms_intersect(self) -> bool:
-        """Are there any two rooms in this level that share coordinates?
-        """
-        room_combos = itertools.combinations(self.rooms, 2)
-        for (room1, room2) in room_combos:
-            if room1 != room2 and room1.does_it_intersect(room2):
-                return True
-        return False
-    
-    def _do_any_hallways_intersect_rooms(self) -> bool:
-        """Do any hallways have coordinates that are inside any room?
-        For this, it suffices to check the hallway's waypoints.
+        """Do any two rooms/hallways overlap with each other? See find_overlaps for the checks used.
         """
-        waypoints = []
-        for hall in self.hallways:
-            waypoints.extend(hall.waypoints)
-        for way in waypoints:
-            for room in self.rooms:
-                if room.contains(way):
-                    return True
-        return False
-
-    def _do_any_hallways_intersect_hallways(self) -> bool:
-        """Will any hallways intersect each other?
-        """
-        hall_combos = itertools.combinations(self.hallways, 2)
-        for (hall1, hall2) in hall_combos:
-            if hall1 != hall2 and hall1.does_it_intersect(hall2):
-                return True
-        return False
-
-    def _does_any_hallway_straddle_room(self) -> bool:
-        """ Does any pair of waypoints in the set of hallways straddle
-        any one of the rooms?
-        """
-        waypoints = []
-        for hall in self.hallways:
-            waypoints.extend(hall.waypoints)
-        for i in range(0, len(waypoints) - 1):
-            for room in self.rooms:
-                if room.is_straddled_by(waypoints[i], waypoints[i + 1]):
-                    return True
-        return False
+        return find_overlaps(self.rooms, self.hallways) != []
+
+    def _describe_overlap(self, overlap) -> str:
+        """Returns a readable description of an Overlap found in this level.
+        """
+        describe_room = lambda i: f"room {i} at [{self.rooms[i].position.y}, {self.rooms[i].position.x}]"
+        describe_hall = lambda i: f"hallway {i} from [{self.hallways[i].door1.y}, {self.hallways[i].door1.x}]"
+        if overlap.kind == ROOMS_INTERSECT:
+            return f"{describe_room(overlap.first)} and {describe_room(overlap.second)} intersect"
+        elif overlap.kind == HALLWAYS_INTERSECT:
+            return f"{describe_hall(overlap.first)} and {describe_hall(overlap.second)} intersect"
+        return f"{describe_hall(overlap.first)} and {describe_room(overlap.second)}: {overlap.kind}"
 
     def _are_hallways_connected_to_doors(self) -> bool:
         """Do all hallways have their endpoints at room doors?
@@ -331,118 +374,59 @@ class Level:
         return set(hall_ends).issubset(set(room_doors))
 
     def _update_tiles(self):
-        """Updates the self.tiles field with the current tile information.
-        """
-        width, height = self.calculate_level_dimensions()
-        self.tiles = [[Tile(x, y, Block()) for x in range(width)] for y in range(height)]
-        self._update_rooms_tiles()
-        self._update_hallways_tiles()
-        key = self.locate_entity(LevelKey)
-        if not key and self.key_location:
-            self.tiles[self.key_location.y][self.key_location.x].add_occupant(LevelKey())
-            self.tiles[self.exit_location.y][self.exit_location.x].add_occupant(LevelExit())
+        """Builds self.geometry from the level's rooms and hallways, then places the level key and
+        exit. Only tiles that hold occupants are stored as Tile objects, in self.occupied_tiles, and
+        the tiles holding the key and exit are kept in self.object_locations. Also creates the
+        level's render cache and its record of touched cells.
+        """
+        self.geometry = build_geometry(self.rooms, self.hallways, self.key_location, self.exit_location)
+        self.render_cache = RenderCache(self.geometry.width, self.geometry.height, self._render_cell)
+        self.touched_cells = set()
+        self.occupied_tiles = {}
+        self.object_locations = {}
+        for room in self.rooms:
+            for tile in room.get_room_doors() + room.get_open_tiles():
+                self._copy_occupants(tile)
+        if self.key_location:
+            self.object_locations[LevelKey] = self.get_tile(self.key_location)
+            self.object_locations[LevelExit] = self.get_tile(self.exit_location)
+            self.object_locations[LevelKey].add_occupant(LevelKey())
+            self.object_locations[LevelExit].add_occupant(LevelExit())
 
-    def _update_hallways_tiles(self):
-        """Alters self.tiles to contain the correct Tile information for all hallways in the level.
-        """
-        for hall in self.hallways:
-            for i in range(0, len(hall.waypoints) - 1):
-                this_w = hall.waypoints[i]
-                next_w = hall.waypoints[i + 1]
-                self._update_hallway_segment(this_w, next_w)
-
-    def _update_hallway_segment(self, start, end):
-        """Renders a single segment of the hallway, given the start and end coordinates.
-        Does not require that start coordinates are less than end coordinates. Stores
-        its result in self.rendered_tiles.
-
-        Arguments:
-            start (Tile): the position of the segment start.
-            end (Tile): the position of the segment end.
-        """
-        self.tiles[start.y][start.x] = Tile(start.x, start.y)
-        y_min = min(start.y, end.y)
-        y_max = max(start.y, end.y)
-        x_min = min(start.x, end.x)
-        x_max = max(start.x, end.x)
-        for y in range(y_min, y_max + 1):
-            for x in range(x_min, x_max + 1):
-                self.tiles[y][x] = Tile(x, y)
-
-    def _update_rooms_tiles(self):
-        """Alters self.rendered_tiles to have room walls, objects, and doors in the coordinates
-        specified by self.rooms.
+    def _copy_occupants(self, tile: Tile):
+        """Adds any non-terrain occupants of the given tile to the level's tile at the same coordinates.
         """
-        for room in self.rooms:
-            # Set the boundary rendered_tiles to a wall
-            room_tiles = room.update_tiles()
-            for x in range(room.position.x, room.position.x + room.width):
-                for y in range(room.position.y, room.position.y + room.height):
-                    self.tiles[y][x] = room_tiles[y - room.position.y][x - room.position.x]
+        for occ in tile.occupants:
+            if not isinstance(occ, (Block, Door)):
+                self.get_tile(tile).add_occupant(occ)
 
     def _get_rooms_from_hallway(self, hallway):
         """Given a hallway, determine which rooms form the endpoint of the hallway.
         Returns the room origins as a 2-element list of 2-element lists representign coordinates.
         """
-        room1 = None
-        room2 = None
-        for room in self.rooms:
-            if room.contains(hallway.door1):
-                room1 = room.position
-            if room.contains(hallway.door2):
-                room2 = room.position
+        room1 = self.get_room_at(hallway.door1).position
+        room2 = self.get_room_at(hallway.door2).position
         return [[room1.y, room1.x], [room2.y, room2.x]]
 
     def _get_rooms_from_tile_in_room(self, tile):
         """Gets the rooms that are connected by 1 hallway to the room containing the current tile.
         Assumes that the current tile is inside a room.
         """
-        origin_room = None
-        for room in self.rooms:
-            if room.contains(tile):
-                origin_room = room
-        
-        origin_room_coords = [origin_room.position.y, origin_room.position.x]
-
-        doors = origin_room.get_room_doors()
-        room_own_neighbor = False
-        adjacent_halls = []
-        # Find all hallways that are adjacent to the the origin room.
-        # If the hallway has doors that both connect to the origin room,
-        # then the origin room is its own neighbor.
-        for hall in self.hallways:
-            door1_in_room = False
-            if any([hall.door1.coordinates_equal(door) for door in doors]):
-                adjacent_halls.append(hall)
-                door1_in_room = True
-            door2_in_room = False
-            if any([hall.door2.coordinates_equal(door) for door in doors]):
-                adjacent_halls.append(hall)
-                door2_in_room = True
-            # Check that room is or is not its own neighbor
-            if door1_in_room and door2_in_room:
-                room_own_neighbor = True
-
-        adjacent_rooms = []
-        for hallway in adjacent_halls:
-            adjacent_rooms.extend(self._get_rooms_from_hallway(hallway))
-
-        unique_rooms = []
-        [unique_rooms.append(x) for x in adjacent_rooms if x not in unique_rooms]
-        # Must remove the room containing the tile, unless it is its own neighbor.
-        if not room_own_neighbor:
-            unique_rooms.remove(origin_room_coords)
-        return unique_rooms
+        origin_room = self.geometry.room_index_at(tile.x, tile.y)
+        return self._room_origins(self.room_graph.neighbors(origin_room))
+
+    def _room_origins(self, room_indices) -> list:
+        """Returns the origins of the rooms with the given indices as [y, x] lists.
+        """
+        return [[self.rooms[i].position.y, self.rooms[i].position.x] for i in room_indices]
     
     def _tile_in_room_or_hallway(self, tile):
         """Given a level and a tile, check whether or not the tile is inside a room, hallway,
         or neither. Return "room", "hallway", or "void", respectively.
         """
-        in_room = any([room.contains(tile) for room in self.rooms])
-        in_hallway = any([hallway.contains(tile) for hallway in self.hallways])
-        if in_room:
+        if self.geometry.room_index_at(tile.x, tile.y) is not None:
             return "room"
-        elif in_hallway:
+        elif self.geometry.hallway_index_at(tile.x, tile.y) is not None:
             return "hallway"
         else:
             return "void"
@@ -450,13 +434,20 @@ class Level:
     def _get_rooms_from_tile_in_hallway(self, tile):
         """Given a tile in a hallway, return the origins of the rooms that the hallway connects.
         """
-        hallway = None
-        for hall in self.hallways:
-            if hall.contains(tile):
-                hallway = hall
-    
-        # Get the room origins from the doors
-        return self._get_rooms_from_hallway(hallway)
+        hallway = self.geometry.hallway_index_at(tile.x, tile.y)
+        return self._room_origins(self.room_graph.hallway_rooms(hallway))
+
+    def get_room_at(self, tile: Tile) -> Room:
+        """Returns the room containing the given tile, or None if the tile is not in a room.
+        """
+        index = self.geometry.room_index_at(tile.x, tile.y)
+        return None if index is None else self.rooms[index]
+
+    def get_hallway_at(self, tile: Tile) -> Hallway:
+        """Returns the hallway containing the given tile, or None if the tile is not in a hallway.
+        """
+        index = self.geometry.hallway_index_at(tile.x, tile.y)
+        return None if index is None else self.hallways[index]
 
     def get_reachable_rooms_from_tile(self, tile):
         """Get the origins of the rooms that are "immediately reachable" from the given tile.
@@ -473,26 +464,154 @@ class Level:
         else: #type is "room"
             return self._get_rooms_from_tile_in_room(tile)
 
+    def get_connected_rooms_from_tile(self, tile):
+        """Get the origins of every room that can be reached from the given tile by walking through
+        any number of hallways, including the tile's own room. If the tile is in a hallway, the rooms
+        reachable from either end of the hallway are returned. If the tile is not in a room and not
+        in a hallway, return the empty array.
+        """
+        room = self._get_any_room_from_tile(tile)
+        if room is None:
+            return []
+        return self._room_origins(self.room_graph.component_rooms(room))
+
+    def get_room_components(self):
+        """Get the groups of rooms that are connected to each other by hallways, as lists of room
+        origins. Rooms in different groups cannot be reached from each other.
+        """
+        return [self._room_origins(component) for component in self.room_graph.components()]
+
+    def get_room_distance(self, tile1, tile2):
+        """Get the smallest number of hallways that must be walked through to get from the room
+        containing tile1 to the room containing tile2. Tiles in a hallway count as being in the room
+        at the hallway's first door. Returns None if either tile is in neither a room nor a hallway,
+        or if the rooms are not connected.
+        """
+        room1 = self._get_any_room_from_tile(tile1)
+        room2 = self._get_any_room_from_tile(tile2)
+        if room1 is None or room2 is None:
+            return None
+        return self.room_graph.distance(room1, room2)
+
+    def _get_any_room_from_tile(self, tile):
+        """Get the index of the room containing the tile or, if the tile is in a hallway, of the room
+        at the hallway's first door. Returns None if the tile is in neither.
+        """
+        room = self.geometry.room_index_at(tile.x, tile.y)
+        if room is not None:
+            return room
+        hallway = self.geometry.hallway_index_at(tile.x, tile.y)
+        return None if hallway is None else self.room_graph.hallway_rooms(hallway)[0]
+
     def get_level_key(self):
         """ Get the tile with the level key on it.
         """
-        for row in self.tiles:
-            for tile in row:
-                if tile.has_occupant(LevelKey):
-                    return tile
-        
-        return None
+        return self.object_locations.get(LevelKey)
 
     def get_level_exit(self):
         """ Get the tile with the level exit on it.
         """
-        for row in self.tiles:
-            for tile in row:
-                if tile.has_occupant(LevelExit):
-                    return tile
-        
+        exit_tile = self.object_locations.get(LevelExit)
+        if exit_tile is not None:
+            return exit_tile
         raise RuntimeError("No tile in this level has an exit on it.")
 
+    def get_block_distance(self, tile: Tile) -> float:
+        """ Get the distance from the given tile to a block, as computed by block_distances. The
+        distances only depend on the level's geometry, so they are computed once per level.
+        Tiles outside of the level are infinitely far from any block.
+        """
+        if not self.geometry.contains(tile.x, tile.y):
+            return float("inf")
+        if self._block_distances is None:
+            self._block_distances = block_distances(self.geometry)
+        return self._block_distances[tile.y * self.geometry.width + tile.x]
+
+    def get_chase_field(self) -> FlowField:
+        """ Get a FlowField leading to the closest character on this level, over the tiles that a
+        Zombie may walk on: floors that hold neither the level key nor the level exit. Doors are
+        not walkable, so a zombie is only led to characters in its own room. The field is computed
+        once for each set of character positions and shared by every zombie on the level, starting
+        from the mask of the level's floors, which is built once with the level.
+        """
+        targets = tuple(sorted((tile.x, tile.y) for tile in self.characters.values()))
+        objects = tuple((tile.x, tile.y) for tile in self.object_locations.values())
+        if self._chase_field is None or self._chase_field_state != (targets, objects):
+            width = self.geometry.width
+            walkable = bytearray(self._floor_mask)
+            for x, y in objects:
+                walkable[y * width + x] = False
+            self._chase_field = FlowField(width, self.geometry.height, targets, walkable)
+            self._chase_field_state = (targets, objects)
+        return self._chase_field
+
+    def snapshot(self) -> LevelSnapshot:
+        """ Returns a LevelSnapshot of where every entity and object is on this level and of its
+        flags, which restore can later bring the level back to. Only the stored Tiles that hold
+        more than terrain are copied; the geometry is shared.
+        """
+        return LevelSnapshot(self._copy_tiles(self.occupied_tiles), self._cell_indices(self.characters), \
+            self._cell_indices(self.adversaries), list(self.completed_characters), \
+            self._cell_indices(self.object_locations), self.level_exit_unlocked, \
+            getattr(self, "unlocked_by", None), self.is_completed)
+
+    def restore(self, snapshot: LevelSnapshot):
+        """ Brings this level back to the given snapshot of it. The snapshot is left as it is, so
+        it may be restored any number of times. Every cell that changed is marked as touched.
+        """
+        changed = set(self.occupied_tiles)
+        self._load(self._copy_tiles(snapshot.tiles), snapshot)
+        changed.update(self.occupied_tiles)
+        for index in changed:
+            self.render_cache.mark_dirty(index)
+        self.touched_cells.update(changed)
+
+    def fork(self, rng: random.Random = None):
+        """ Returns a copy of this level that can be played without changing this one. The copy
+        shares this level's rooms, hallways, geometry and the caches computed from them, and has
+        its own copy of where every entity and object is. Random choices made on the copy are
+        made with rng, which defaults to this level's random number generator.
+        """
+        fork = copy.copy(self)
+        snapshot = self.snapshot()
+        # The snapshot is not kept, so its tiles can be used by the copy as they are.
+        fork._load(snapshot.tiles, snapshot)
+        fork.render_cache = RenderCache(self.geometry.width, self.geometry.height, fork._render_cell)
+        fork.touched_cells = set()
+        if rng is not None:
+            fork.rng = rng
+        return fork
+
+    def _load(self, tiles: dict, snapshot: LevelSnapshot):
+        """ Makes the given tiles this level's stored Tiles, and sets everything else in the level's
+        dynamic layer from the given snapshot.
+        """
+        self.occupied_tiles = tiles
+        self.characters = {character: tiles[index] for character, index in snapshot.characters.items()}
+        self.adversaries = {adversary: tiles[index] for adversary, index in snapshot.adversaries.items()}
+        self.completed_characters = list(snapshot.completed_characters)
+        self.object_locations = {kind: tiles[index] for kind, index in snapshot.object_locations.items()}
+        self.level_exit_unlocked = snapshot.level_exit_unlocked
+        self.unlocked_by = snapshot.unlocked_by
+        self.is_completed = snapshot.is_completed
+
+    def _copy_tiles(self, tiles: dict) -> dict:
+        """ Copies the given stored Tiles, by cell index, leaving out those that hold nothing but
+        terrain, since _peek builds the same Tiles from the geometry. The occupants are shared.
+        """
+        copies = {}
+        for index, tile in tiles.items():
+            if not all(isinstance(occ, (Block, Door)) for occ in tile.occupants):
+                copy_tile = Tile(tile.x, tile.y)
+                copy_tile.occupants = list(tile.occupants)
+                copies[index] = copy_tile
+        return copies
+
+    def _cell_indices(self, locations: dict) -> dict:
+        """ Maps each key of the given dictionary to the cell index of the Tile it is mapped to.
+        """
+        return {key: self.geometry.cell_index(tile.x, tile.y) for key, tile in locations.items()}
+
     def is_level_completed(self):
         """ Have all players either gotten to the exit or been ejected?
         """
@@ -7,6 +7,8 @@ class Observer(AbstractObserver):
     def __init__(self):
         self.gamestate = None
         self.ip = None
+        self.level = None
+        self.version = None
 
     def notify(self, gamestate):
         """Notifies this observer with the new gamestate information. This observer
@@ -22,7 +24,23 @@ class Observer(AbstractObserver):
         """
         return self._render_to_stream(sys.stdout)
 
+    def get_changes(self):
+        """Returns the cells of the current level that changed since the last time this method
+        was called, as a dictionary mapping (x, y) coordinates to characters. Returns None the
+        first time it is called for a level, when the whole level should be rendered instead.
+        """
+        level = self.gamestate.current_level
+        since = self.version if level is self.level else None
+        self.level = level
+        self.version, changes = level.render_changes(since)
+        return changes
+
     def _render_to_stream(self, stream):
         """Renders to the particular output stream.
         """
-        stream.write(grid_to_string(self.gamestate.render()) + "\n\n")
\ No newline at end of file
+        if isinstance(self.gamestate, Gamestate):
+            # A Gamestate keeps its formatted frame, and only formats the rows that changed.
+            rendered = self.gamestate.render_to_string()
+        else:
+            rendered = grid_to_string(self.gamestate.render())
+        stream.write(rendered + "\n\n")
\ No newline at end of file
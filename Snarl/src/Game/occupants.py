@@ -55,10 +55,11 @@ class Adversary(Entity):
 class Zombie(Adversary):
     """Represents a zombie.
     """
-    zombie_count = 0
-    def __init__(self, name = ""):
-        self.name = name + str(Zombie.zombie_count)
-        Zombie.zombie_count += 1
+    def __init__(self, name: str, number: int):
+        """ Creates a zombie named by the given name followed by the given number, which should be
+        unique among the zombies of its game.
+        """
+        self.name = name + str(number)
 
     def __eq__(self, other):
         return isinstance(other, Zombie) and self.name == other.name
@@ -72,10 +73,11 @@ class Zombie(Adversary):
 class Ghost(Adversary):
     """Represents a ghost.
     """
-    ghost_count = 0
-    def __init__(self, name = ""):
-        self.name = name + str(Ghost.ghost_count)
-        Ghost.ghost_count += 1
+    def __init__(self, name: str, number: int):
+        """ Creates a ghost named by the given name followed by the given number, which should be
+        unique among the ghosts of its game.
+        """
+        self.name = name + str(number)
     
     def __eq__(self, other):
         return isinstance(other, Ghost) and self.name == other.name
@@ -0,0 +1,109 @@
+"""This file holds the overlap validation used when building a Level. Rooms, hallway segments and
+hallway waypoints are treated as rectangles and checked against each other with a sweep line
+along the x axis, so that only rectangles that share some x coordinate are ever compared.
+"""
+import heapq
+from collections import namedtuple
+
+# A single rectangle in the sweep. Bounds are inclusive. The kind says what the rectangle stands
+# for and index says which one: a room index, a hallway index, or (for waypoint pairs) the index of
+# the pair's first waypoint in the list of every hallway's waypoints.
+_Item = namedtuple("_Item", ["x_min", "x_max", "y_min", "y_max", "kind", "index"])
+
+ROOM = "room"
+WAYPOINT = "waypoint"
+SEGMENT = "segment"
+WAYPOINT_PAIR = "waypoint-pair"
+
+# The kinds of overlaps that find_overlaps reports.
+ROOMS_INTERSECT = "rooms intersect"
+HALLWAY_INSIDE_ROOM = "hallway inside room"
+HALLWAYS_INTERSECT = "hallways intersect"
+HALLWAY_STRADDLES_ROOM = "hallway straddles room"
+
+Overlap = namedtuple("Overlap", ["kind", "first", "second"])
+
+def find_overlaps(rooms: list, hallways: list) -> list:
+    """Finds every pair of rooms and hallways that overlap with each other. Uses the same 4 checks
+    as a pairwise comparison would:
+       - Do two rooms intersect?
+       - Is a hallway waypoint inside of a room?
+       - Does a segment between consecutive waypoints of a hallway intersect with a segment of
+         another hallway?
+       - Does a pair of consecutive waypoints, taken from the waypoints of all hallways in order,
+         straddle a room?
+
+    Arguments:
+        rooms (list[Room]): the rooms of the level.
+        hallways (list[Hallway]): the hallways of the level.
+
+    Returns:
+        overlaps (list[Overlap]): every overlapping pair, without duplicates, sorted by kind and then
+            by the indices of the pair. For ROOMS_INTERSECT and HALLWAYS_INTERSECT, first and second
+            are both room or both hallway indices. Otherwise first is a hallway index and second is
+            a room index.
+    """
+    items = []
+    for i, room in enumerate(rooms):
+        items.append(_Item(room.position.x, room.position.x + room.width - 1, \
+            room.position.y, room.position.y + room.height - 1, ROOM, i))
+
+    waypoints = []
+    waypoint_halls = []
+    for i, hall in enumerate(hallways):
+        for j, way in enumerate(hall.waypoints):
+            items.append(_Item(way.x, way.x, way.y, way.y, WAYPOINT, i))
+            if j > 0:
+                items.append(_segment_item(hall.waypoints[j - 1], way, SEGMENT, i))
+        waypoints.extend(hall.waypoints)
+        waypoint_halls.extend([i] * len(hall.waypoints))
+    for i in range(0, len(waypoints) - 1):
+        items.append(_segment_item(waypoints[i], waypoints[i + 1], WAYPOINT_PAIR, i))
+
+    overlaps = set()
+    for first, second in _sweep(items):
+        overlap = _check_pair(first, second, rooms, hallways, waypoints, waypoint_halls)
+        if overlap is not None:
+            overlaps.add(overlap)
+    return sorted(overlaps)
+
+def _segment_item(start, end, kind, index) -> _Item:
+    """Returns the rectangle covered by the tiles between start and end.
+    """
+    return _Item(min(start.x, end.x), max(start.x, end.x), min(start.y, end.y), max(start.y, end.y), kind, index)
+
+def _sweep(items: list):
+    """Yields every pair of items whose rectangles intersect. Items are visited in order of their
+    smallest x coordinate, and each is only compared against the items that have not yet ended.
+    """
+    items = sorted(items, key=lambda item: item.x_min)
+    active = []
+    for count, item in enumerate(items):
+        while active and active[0][0] < item.x_min:
+            heapq.heappop(active)
+        for _, _, other in active:
+            if other.y_min <= item.y_max and item.y_min <= other.y_max:
+                yield other, item
+        heapq.heappush(active, (item.x_max, count, item))
+
+def _check_pair(first: _Item, second: _Item, rooms, hallways, waypoints, waypoint_halls):
+    """Given two intersecting items, returns the Overlap they form, or None if they are allowed to
+    intersect.
+    """
+    kinds = {first.kind, second.kind}
+    if kinds == {ROOM}:
+        low, high = sorted((first.index, second.index))
+        if rooms[low] != rooms[high]:
+            return Overlap(ROOMS_INTERSECT, low, high)
+    elif kinds == {ROOM, WAYPOINT}:
+        room, way = (first, second) if first.kind == ROOM else (second, first)
+        return Overlap(HALLWAY_INSIDE_ROOM, way.index, room.index)
+    elif kinds == {SEGMENT}:
+        low, high = sorted((first.index, second.index))
+        if low != high and hallways[low] != hallways[high]:
+            return Overlap(HALLWAYS_INTERSECT, low, high)
+    elif kinds == {ROOM, WAYPOINT_PAIR}:
+        room, pair = (first, second) if first.kind == ROOM else (second, first)
+        if rooms[room.index].is_straddled_by(waypoints[pair.index], waypoints[pair.index + 1]):
+            return Overlap(HALLWAY_STRADDLES_ROOM, waypoint_halls[pair.index], room.index)
+    return None
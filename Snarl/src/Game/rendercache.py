@@ -0,0 +1,96 @@
+"""This file holds the RenderCache class, which keeps the last rendered frame of a level so that
+only the cells that changed since the last render have to be rendered again.
+"""
+
+class RenderCache:
+    """Represents the ASCII frame of a level, as one character per cell. Cells are marked dirty
+    when their contents may have changed, and are only rendered again the next time the frame is
+    read. Every read that finds changed cells starts a new version of the frame, and the cells
+    changed by recent versions are kept so that readers can ask for only what changed.
+    """
+    def __init__(self, width: int, height: int, render_cell):
+        """Creates an empty cache. The frame is rendered in full the first time it is read.
+
+        Arguments:
+            width (int): the width of the level.
+            height (int): the height of the level.
+            render_cell (function): given the index y * width + x of a cell, returns the
+                character that the cell renders as.
+        """
+        self.width = width
+        self.height = height
+        self.render_cell = render_cell
+        self.rows = None
+        self.row_strings = None
+        self.dirty = set()
+        self.version = 0
+        # (version, index) for every cell changed by a version after self.log_start.
+        self.log = []
+        self.log_start = 0
+
+    def mark_dirty(self, index: int):
+        """Marks the cell at the given index as needing to be rendered again.
+        """
+        self.dirty.add(index)
+
+    def frame(self) -> list:
+        """Returns the current frame as a list of rows of characters. The rows belong to the
+        cache and must not be modified.
+        """
+        self._refresh()
+        return self.rows
+
+    def to_string(self) -> str:
+        """Returns the current frame formatted as utils.grid_to_string would format it. Only
+        rows that changed since the last call are formatted again.
+        """
+        self._refresh()
+        for y, row in enumerate(self.rows):
+            if self.row_strings[y] is None:
+                self.row_strings[y] = ''.join(['{:4}'.format(character) for character in row]).rstrip()
+        return '\n'.join(self.row_strings)
+
+    def changes_since(self, version: int):
+        """Returns the cells that changed after the given version of the frame, as a dictionary
+        mapping (x, y) coordinates to their new characters, or None if the given version is too
+        old to be known, in which case the whole frame should be read again. Use self.version
+        after the call as the version to ask from next time.
+        """
+        self._refresh()
+        if version < self.log_start:
+            return None
+        changes = {}
+        for changed_version, index in reversed(self.log):
+            if changed_version <= version:
+                break
+            changes[(index % self.width, index // self.width)] = self.rows[index // self.width][index % self.width]
+        return changes
+
+    def _refresh(self):
+        """Renders the whole frame if it has never been rendered, and the dirty cells otherwise.
+        """
+        if self.rows is None:
+            self.rows = [[self.render_cell(y * self.width + x) for x in range(self.width)] \
+                for y in range(self.height)]
+            self.row_strings = [None] * self.height
+            self.dirty.clear()
+            return
+        if not self.dirty:
+            return
+        changed = []
+        for index in self.dirty:
+            y, x = divmod(index, self.width)
+            character = self.render_cell(index)
+            if self.rows[y][x] != character:
+                self.rows[y][x] = character
+                self.row_strings[y] = None
+                changed.append(index)
+        self.dirty.clear()
+        if changed:
+            self.version += 1
+            self.log.extend((self.version, index) for index in changed)
+            # Once the log holds as many entries as the frame has cells, rereading the frame is
+            # as cheap as replaying the log, so older versions are forgotten.
+            if len(self.log) > self.width * self.height:
+                self.log_start = self.log[len(self.log) // 2][0]
+                self.log = [entry for entry in self.log if entry[0] > self.log_start]
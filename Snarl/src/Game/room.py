@@ -8,7 +8,7 @@ class Room:
     grid, positive width and height, at least one room door on the room's boundary,
     and a list of non-wall tiles inside the room.
     """
-    def __init__(self, position: Tile, width: int, height: int, room_doors: list, open_tiles: list = []):
+    def __init__(self, position: Tile, width: int, height: int, room_doors: list, open_tiles: list = None):
         """Constructs a new room.
 
         Arguments:
@@ -26,7 +26,7 @@ class Room:
         self.width = width
         self.height = height
         self._room_doors = room_doors
-        self._open_tiles = open_tiles
+        self._open_tiles = open_tiles if open_tiles is not None else []
         if not self._is_valid():
             raise ValueError("Invalid room parameters")
 
@@ -112,8 +112,8 @@ class Room:
         y1_min, y1_max = self.position.y, self.position.y + self.height
         y2_min, y2_max = other.position.y, other.position.y + other.height
 
-        xflag = set(range(x1_min, x1_max)).intersection(set(range(x2_min, x2_max))) != set()
-        yflag = set(range(y1_min, y1_max)).intersection(set(range(y2_min, y2_max))) != set()
+        xflag = max(x1_min, x2_min) < min(x1_max, x2_max)
+        yflag = max(y1_min, y2_min) < min(y1_max, y2_max)
         return xflag and yflag
     
     def contains(self, tile: Tile) -> bool:
@@ -0,0 +1,108 @@
+from collections import deque
+
+class RoomGraph:
+    """Represents how the rooms of a level are connected by its hallways. Rooms and hallways are
+    referred to by their index in the level's room and hallway lists. Built once per Level.
+    """
+    def __init__(self, geometry, num_rooms: int, hallways: list):
+        """Builds the graph from the level's geometry, which is used to find the room at each
+        end of every hallway.
+
+        Arguments:
+            geometry (LevelGeometry): the geometry of the level.
+            num_rooms (int): the number of rooms in the level.
+            hallways (list[Hallway]): the hallways of the level.
+        """
+        self._hallway_rooms = tuple((geometry.room_index_at(hall.door1.x, hall.door1.y), \
+            geometry.room_index_at(hall.door2.x, hall.door2.y)) for hall in hallways)
+        # Neighbors are kept in the order of the hallways that connect them, and a room is only its
+        # own neighbor if a hallway connects it to itself.
+        own_neighbor = [False] * num_rooms
+        for room1, room2 in self._hallway_rooms:
+            if room1 is not None and room1 == room2:
+                own_neighbor[room1] = True
+        neighbors = [[] for room in range(num_rooms)]
+        for room1, room2 in self._hallway_rooms:
+            for room in (room1, room2):
+                if room is None:
+                    continue
+                for other in (room1, room2):
+                    if other is not None and other not in neighbors[room] and (other != room or own_neighbor[room]):
+                        neighbors[room].append(other)
+        self._neighbors = tuple(tuple(n) for n in neighbors)
+        self._components = self._find_components()
+        groups = {}
+        for room, component in enumerate(self._components):
+            groups.setdefault(component, []).append(room)
+        self._component_rooms = tuple(tuple(rooms) for rooms in groups.values())
+        self._distances = {}
+
+    def neighbors(self, room: int) -> tuple:
+        """Returns the rooms that are connected to the given room by a single hallway.
+        """
+        return self._neighbors[room]
+
+    def hallway_rooms(self, hallway: int) -> tuple:
+        """Returns the rooms at either end of the given hallway.
+        """
+        return self._hallway_rooms[hallway]
+
+    def component(self, room: int) -> int:
+        """Returns the id of the connected component containing the given room.
+        """
+        return self._components[room]
+
+    def components(self) -> tuple:
+        """Returns the connected components of the graph as tuples of rooms, ordered by their
+        smallest room.
+        """
+        return self._component_rooms
+
+    def component_rooms(self, room: int) -> tuple:
+        """Returns the rooms in the same connected component as the given room.
+        """
+        return self._component_rooms[self._components[room]]
+
+    def distance(self, room1: int, room2: int):
+        """Returns the smallest number of hallways that must be walked through to get from room1
+        to room2, or None if room2 cannot be reached from room1. The distances from a room are
+        computed the first time they are asked for and kept afterwards.
+        """
+        if self._components[room1] != self._components[room2]:
+            return None
+        if room1 not in self._distances:
+            self._distances[room1] = self._breadth_first_distances(room1)
+        return self._distances[room1][room2]
+
+    def _breadth_first_distances(self, start: int) -> dict:
+        """Returns the distance from the start room to every room reachable from it.
+        """
+        distances = {start: 0}
+        queue = deque([start])
+        while queue:
+            room = queue.popleft()
+            for neighbor in self._neighbors[room]:
+                if neighbor not in distances:
+                    distances[neighbor] = distances[room] + 1
+                    queue.append(neighbor)
+        return distances
+
+    def _find_components(self) -> tuple:
+        """Labels every room with the id of its connected component. Ids are numbered in the
+        order of the smallest room of each component.
+        """
+        components = [None] * len(self._neighbors)
+        next_id = 0
+        for start in range(len(self._neighbors)):
+            if components[start] is not None:
+                continue
+            components[start] = next_id
+            queue = deque([start])
+            while queue:
+                room = queue.popleft()
+                for neighbor in self._neighbors[room]:
+                    if components[neighbor] is None:
+                        components[neighbor] = next_id
+                        queue.append(neighbor)
+            next_id += 1
+        return tuple(components)
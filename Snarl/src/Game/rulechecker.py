@@ -1,10 +1,44 @@
 from .occupants import Character, Wall, Block, Zombie, Ghost, Entity, Adversary, Door, Wall
 from .tile import Tile
 from .level import Level
+from .terrain import Terrain
+
+# The (x, y) offsets of the cells a player can move to, which are at most 2 cardinal moves away,
+# row by row.
+PLAYER_REACH = [(dx, dy) for dy in range(-2, 3) for dx in range(-2, 3) if abs(dx) + abs(dy) <= 2]
+# The (x, y) offsets of the cells an adversary can move to, in the order adversaries choose from.
+ADVERSARY_REACH = [(0, 1), (1, 0), (-1, 0), (0, -1)]
 
 class Rulechecker:
     """Provides functions to validate some of the game rules.
     """
+    def legal_moves(self, entity: Entity, current_level: Level) -> list:
+        """ Returns a Tile for every destination the entity may move to on the provided level,
+        without raising for the ones it may not. A player may stay put or move to any open tile
+        within 2 cardinal moves, and an adversary may make a single cardinal move onto a tile
+        that is open to its type. Destinations outside of the level are left out, as is
+        everything if the entity is not on the level.
+        """
+        if isinstance(entity, Character):
+            src = current_level.characters.get(entity)
+            reach = PLAYER_REACH
+        elif isinstance(entity, Adversary):
+            src = current_level.adversaries.get(entity)
+            reach = ADVERSARY_REACH
+        else:
+            return []
+        if src is None:
+            return []
+        moves = []
+        for dx, dy in reach:
+            x, y = src.x + dx, src.y + dy
+            if not current_level.geometry.contains(x, y):
+                continue
+            dest = Tile(x, y)
+            if dx == dy == 0 or self._is_open_tile(current_level.peek_tile(dest), current_level, type(entity)):
+                moves.append(dest)
+        return moves
+
     def is_valid_move(self, entity: Entity, dest: Tile, current_level: Level) -> bool:
         """ Is moving the entity from src to dest a valid move on the provided level?
         """
@@ -22,7 +56,7 @@ class Rulechecker:
             return True
         x_dist = abs(src.x - dest.x)
         y_dist = abs(src.y - dest.y)
-        dest_open = self._is_open_tile(current_level.get_tile(dest), current_level)
+        dest_open = self._is_open_tile(current_level.peek_tile(dest), current_level)
         too_far = x_dist + y_dist > 2 
         if too_far or not dest_open:
             s= "Invalid move: "
@@ -41,7 +75,7 @@ class Rulechecker:
         src = current_level.locate_entity(adversary)
         x_dist = abs(src.x - dest.x)
         y_dist = abs(src.y - dest.y)
-        dest_open = self._is_open_tile(current_level.get_tile(dest), current_level, type(adversary))
+        dest_open = self._is_open_tile(current_level.peek_tile(dest), current_level, type(adversary))
         
         return x_dist + y_dist < 2 and dest_open
 
@@ -73,10 +107,11 @@ class Rulechecker:
         # Adversaries are allowed to move onto player-occupied spaces.
         if entity_type is not None and issubclass(entity_type, Adversary):
             has_player = False
-            has_key = current_level.get_tile(tile).coordinates_equal(current_level.get_level_key())
-            has_exit = current_level.get_tile(tile).coordinates_equal(current_level.get_level_exit())
-            has_door = current_level.get_tile(tile).has_occupant(Door)
-            has_adv = current_level.get_tile(tile).has_adversary()
+            level_tile = current_level.peek_tile(tile)
+            has_key = level_tile.coordinates_equal(current_level.get_level_key())
+            has_exit = level_tile.coordinates_equal(current_level.get_level_exit())
+            has_door = current_level.get_terrain(tile) == Terrain.DOOR
+            has_adv = level_tile.has_adversary()
             if entity_type == Ghost:
                 # Ghosts can move through walls
                 has_block = has_exit or has_key or has_adv
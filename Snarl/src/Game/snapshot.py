@@ -0,0 +1,49 @@
+"""This file holds the snapshots of a Level and of a Gamestate, which record everything about them
+that changes as a game is played, so that they can later be restored to that point.
+
+The geometry of a level never changes once the level is built, so it is never copied. Only the
+stored Tiles that hold occupants are, together with where each entity and object is and the flags
+of the level, which is cheap enough that a search can take thousands of snapshots per turn.
+"""
+
+class LevelSnapshot:
+    """Represents the dynamic layer of a Level at some point of a game. Entities and objects are
+    located by the index of their cell in the level's geometry rather than by Tile, since the
+    Tiles are copied again whenever the snapshot is restored. A snapshot must not be modified.
+    """
+    def __init__(self, tiles: dict, characters: dict, adversaries: dict, completed_characters: list, \
+        object_locations: dict, level_exit_unlocked: bool, unlocked_by, is_completed: bool):
+        """Creates a snapshot of a level.
+
+        Arguments:
+            tiles (dict): copies of the level's Tiles that hold occupants, by cell index.
+            characters (dict): the cell index of each Character on the level.
+            adversaries (dict): the cell index of each Adversary on the level.
+            completed_characters (list): the Characters that have completed the level.
+            object_locations (dict): the cell index of the level key and exit, by their class.
+            level_exit_unlocked (bool): has the level exit been unlocked?
+            unlocked_by (Character): the Character that unlocked the level exit, if any.
+            is_completed (bool): has the level been completed?
+        """
+        self.tiles = tiles
+        self.characters = characters
+        self.adversaries = adversaries
+        self.completed_characters = completed_characters
+        self.object_locations = object_locations
+        self.level_exit_unlocked = level_exit_unlocked
+        self.unlocked_by = unlocked_by
+        self.is_completed = is_completed
+
+class GamestateSnapshot:
+    """Represents a Gamestate at some point of a game: the level being played, the levels left to
+    play, a LevelSnapshot of each of these levels, and the state of the game's random number
+    generator. A snapshot must not be modified.
+    """
+    def __init__(self, current_level, levels: list, level_snapshots: dict, num_levels_completed: int, \
+        characters: list, rng_state: tuple):
+        self.current_level = current_level
+        self.levels = levels
+        self.level_snapshots = level_snapshots
+        self.num_levels_completed = num_levels_completed
+        self.characters = characters
+        self.rng_state = rng_state
@@ -0,0 +1,39 @@
+"""This file holds the terrain codes used by a Level to store its static layout compactly.
+Each cell of a level is stored as a single byte holding one of the Terrain codes below.
+"""
+from enum import IntEnum
+from .occupants import Block, Door, HorizontalWall, VerticalWall
+
+class Terrain(IntEnum):
+    """Represents the static contents of a single cell of a level.
+    """
+    VOID = 0
+    BLOCK = 1
+    HORIZONTAL_WALL = 2
+    VERTICAL_WALL = 3
+    DOOR = 4
+    FLOOR = 5
+
+def terrain_occupants(code: int) -> list:
+    """Given a terrain code, return a new list of the occupants that a Tile with that terrain
+    would hold before anything is placed on it.
+
+    Arguments:
+        code (int): a Terrain code.
+
+    Returns:
+        occupants (list[Occupant]): the static occupants of the terrain. Empty for floors.
+    """
+    if code == Terrain.HORIZONTAL_WALL:
+        return [HorizontalWall()]
+    elif code == Terrain.VERTICAL_WALL:
+        return [VerticalWall()]
+    elif code == Terrain.DOOR:
+        return [Door()]
+    elif code == Terrain.FLOOR:
+        return []
+    else:
+        return [Block()]
+
+# The character used to render each terrain code when nothing else is on the cell, indexed by code.
+TERRAIN_GLYPHS = tuple(terrain_occupants(code)[0].render() if code != Terrain.FLOOR else ' ' for code in Terrain)
@@ -5,7 +5,7 @@ class Tile:
     May be occupied by an Occupant. This class is used both to communicate locations
     and to store actual game state data.
     """
-    def __init__(self, x: int, y: int, occupants: list = []):
+    def __init__(self, x: int, y: int, occupants: list = None):
         """Constructs a new tile, possibly with an occupant.
 
         Arguments:
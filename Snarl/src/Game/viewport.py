@@ -0,0 +1,61 @@
+"""This file holds the Viewport class, a read-only square window onto a level that is used to
+send players their surroundings without copying the level's tiles.
+"""
+from collections.abc import Sequence
+from .occupants import Block
+from .tile import Tile
+
+class Viewport(Sequence):
+    """Represents a square window of tiles onto a level, as a sequence of rows. Tiles are read
+    from the level when they are indexed, so a Viewport always shows the current state of the
+    level, and cells outside of the level read as a new Tile holding a Block. Copy the rows into
+    lists if a snapshot is needed.
+    """
+    def __init__(self, geometry, peek, min_x: int, min_y: int, size: int):
+        """Creates a window of size x size cells whose top left cell is at (min_x, min_y).
+
+        Arguments:
+            geometry (LevelGeometry): the geometry of the level, used to find the level's bounds.
+            peek (function): given x and y coordinates inside of the level, returns the Tile
+                there without storing it.
+            min_x (int): the x coordinate of the left column, which may be outside of the level.
+            min_y (int): the y coordinate of the top row, which may be outside of the level.
+            size (int): the number of rows and columns in the window.
+        """
+        self.geometry = geometry
+        self.peek = peek
+        self.min_x = min_x
+        self.min_y = min_y
+        self.size = size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, row: int):
+        if not 0 <= row < self.size:
+            raise IndexError("Viewport row out of range.")
+        return ViewportRow(self, row)
+
+    def tile_at(self, row: int, col: int) -> Tile:
+        """Returns the tile in the given row and column of this window. A cell outside of the
+        level reads as a new padding Tile every time, so changing one changes no other cell.
+        """
+        if not (0 <= row < self.size and 0 <= col < self.size):
+            raise IndexError("Viewport cell out of range.")
+        x, y = self.min_x + col, self.min_y + row
+        if self.geometry.contains(x, y):
+            return self.peek(x, y)
+        return Tile(0, 0, [Block()])
+
+class ViewportRow(Sequence):
+    """Represents a single row of a Viewport.
+    """
+    def __init__(self, viewport: Viewport, row: int):
+        self.viewport = viewport
+        self.row = row
+
+    def __len__(self) -> int:
+        return self.viewport.size
+
+    def __getitem__(self, col: int) -> Tile:
+        return self.viewport.tile_at(self.row, col)
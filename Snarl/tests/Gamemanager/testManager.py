@@ -124,11 +124,11 @@ for i in range(len(name_list), len(locations)):
     json_new_adversary["type"] = "zombie"
     json_new_adversary["name"] = "zombie"
     json_new_adversary["position"] = locations[i]
-    new_adversary = create_entity_from_json(json_new_adversary)
+    new_adversary = create_entity_from_json(json_new_adversary, len(adversaries))
     adversaries.append(new_adversary)
     level.add_adversary(new_adversary, create_point_from_json(locations[i]))
 
-manager.add_enemies(list(map(lambda adv : EnemyZombie(adv.name, adv.name), adversaries)))
+manager.add_enemies([EnemyZombie(adv.name, adv.name, number) for number, adv in enumerate(adversaries)])
 
 # make moves until we've reached the max number of turns
 for i in range(num_of_turns):
@@ -120,7 +120,7 @@ def get_reachable_rooms(level, tile):
         return get_rooms_from_tile_in_room(level, tile)
 
 # get the level tiles
-tile_in_level = level.get_tile(point)
+tile_in_level = level.peek_tile(point)
 output = {
     "traversable": not tile_in_level.has_block(),
     "object": tile_has_level_key_or_exit(tile_in_level),
@@ -101,6 +101,25 @@ def create_level_from_json(level_json: dict):
     # Put the level key and exit in the rooms
     return Level(rooms, hallways, object_tiles[0], object_tiles[1])
 
+def load_level_jsons(path: str) -> list:
+    """Reads a levels file, returning the number of levels it holds followed by the JSON of each
+    level. Anything between the JSON values that cannot be decoded is skipped.
+    """
+    with open(path) as f:
+        levels_string = f.read()
+    levels_len = len(levels_string)
+    level_jsons = []
+    decoder = json.JSONDecoder()
+    error_index = 0
+    while error_index < levels_len and len(levels_string) > 0:
+        try:
+            leveljson_obj, error_index = decoder.raw_decode(levels_string)
+            level_jsons.append(leveljson_obj)
+            levels_string = levels_string[error_index:]
+        except(json.decoder.JSONDecodeError):
+            levels_string = levels_string[1:]
+    return level_jsons
+
 def create_state_from_json(state_json: dict):
     """ Parses state_json into a Gamestate object. Assume that state_json is of the form:
     {
@@ -123,11 +142,11 @@ def create_state_from_json(state_json: dict):
         players[loc] = entity
 
     adversaries = {}
-    for adversary in state_json["adversaries"]:
+    for number, adversary in enumerate(state_json["adversaries"]):
         # per the milestone, we're assuming all actors in the "adversaries" field are of the "ghost" or
         # "zombie" type and just adding them without verifying the type
         loc = create_point_from_json(adversary["position"])
-        entity = create_entity_from_json(adversary)
+        entity = create_entity_from_json(adversary, number)
         adversaries[loc] = entity
 
     # create the actual Gamestate object and add all the players and adversaries to it
@@ -139,8 +158,9 @@ def create_state_from_json(state_json: dict):
     
     return state
 
-def create_entity_from_json(player_json: dict):
-    """ Parses player_json into an Entity object. Assume that player_json is of the form:
+def create_entity_from_json(player_json: dict, number: int = 0):
+    """ Parses player_json into an Entity object, numbering a zombie or ghost with the given
+    number to tell it apart from the others of its kind. Assume that player_json is of the form:
     {
         "type": (actor-type),
         "name": (string),
@@ -150,9 +170,9 @@ def create_entity_from_json(player_json: dict):
     if player_json["type"] == "player":
         return Character(player_json["name"])
     elif player_json["type"] == "zombie":
-        return Zombie(player_json["name"])
+        return Zombie(player_json["name"], number)
     elif player_json["type"] == "ghost":
-        return Ghost(player_json["name"])
+        return Ghost(player_json["name"], number)
 
 def create_point_from_json(point_json: dict):
     """Given a JSON array with two elements [row, column], output a Tile object with
@@ -251,7 +271,7 @@ def create_dict_from_room(room: Room) -> dict:
     json_room["type"] = "room"
     json_room["origin"] = create_dict_from_point(room.position)
     json_room["bounds"] = {"rows": room.width, "columns": room.height}
-    json_room["layout"] = create_array_from_layout(room.tiles)
+    json_room["layout"] = create_array_from_layout(room.update_tiles())
     return json_room
 
 def create_dict_from_hallway(hall: Hallway) -> dict: